@@ -0,0 +1,29 @@
+package api
+
+import (
+	"net/http"
+	"task4/service"
+
+	"github.com/gin-gonic/gin"
+)
+
+type HealthAPI struct{}
+
+// Get 就绪检查：只 ping 数据库连接，不读写任何表
+func (h *HealthAPI) Get(ctx *gin.Context) {
+	db := service.GetDB()
+	if db == nil {
+		ctx.JSON(http.StatusServiceUnavailable, RespBase{CodeFailed, "database connection is not available"})
+		return
+	}
+	sqlDB, err := db.DB()
+	if err == nil {
+		err = sqlDB.PingContext(ctx.Request.Context())
+	}
+	if err != nil {
+		ctx.JSON(http.StatusServiceUnavailable, RespBase{CodeFailed, err.Error()})
+		return
+	}
+
+	ctx.JSON(http.StatusOK, RespBase{CodeSuccess, MsgSuccess})
+}
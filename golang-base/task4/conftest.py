@@ -0,0 +1,2 @@
+# 把 tests/ 下的API测试套件注册为 pytest 测试项，见 tests/pytest_plugin.py
+pytest_plugins = ["tests.pytest_plugin"]
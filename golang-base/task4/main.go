@@ -23,6 +23,9 @@ func main() {
 
 	r := gin.Default()
 	g := r.Group("/api/v1")
+	{
+		g.GET("/health", new(api.HealthAPI).Get)
+	}
 	{
 		apiUser := new(api.UserAPI)
 		g.POST("/register", apiUser.Create)
@@ -2,21 +2,50 @@
 """
 Python API测试运行器
 提供友好的命令行界面来运行各种API测试
+
+启动时只导入标准库、colorama和轻量的 tests.defaults/metrics/output/token_cache；
+测试套件和压测模块（连同 requests、aiohttp）在选定运行模式后才导入，
+--version 和 --list 不导入任何测试模块。
 """
 
+import time
+
+# 启动计时起点，尽量早于其他导入
+STARTED = time.perf_counter()
+
+import io
+import os
 import sys
 import argparse
+import importlib.util
+from contextlib import redirect_stdout
 from colorama import Fore, Style, init
 
-# 导入测试模块
-from tests.test_user_api import UserAPITest
-from tests.test_post_api import PostAPITest
-from tests.test_comment_api import CommentAPITest
-from tests.test_comprehensive import ComprehensiveAPITest
+from tests import __version__, codec
+from tests.defaults import (
+    DEFAULT_DB_PATH,
+    DEFAULT_LEVELS,
+    ASYNC_CLIENTS,
+    DEFAULT_ASYNC_CLIENT,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READY_TIMEOUT,
+    DEFAULT_REPEATS,
+    DEFAULT_SAMPLE_INTERVAL,
+    DEFAULT_SIZES,
+    DEFAULT_STEP_SECONDS,
+    DEFAULT_THRESHOLD,
+    OPEN_LOOP_TARGETS,
+)
+from tests.metrics import LatencyRegistry, latency_registry, print_latency_report
+from tests.output import OUTPUT_MODES, configure_output, get_output, output_config
+from tests.token_cache import token_cache
 
 # 初始化colorama
 init(autoreset=True)
 
+DEFAULT_BASE_URL = "http://localhost:8000/api/v1"
+
 
 def print_banner():
     """打印程序横幅"""
@@ -41,43 +70,56 @@ def print_banner():
     print(banner)
 
 
-def run_user_tests(auto_cleanup: bool = False):
+def run_user_tests(auto_cleanup: bool = False, base_url: str = DEFAULT_BASE_URL):
     """运行用户API测试"""
+    from tests.test_user_api import UserAPITest
+
     print(f"{Fore.CYAN}启动用户API测试...{Style.RESET_ALL}")
-    test = UserAPITest(auto_cleanup=auto_cleanup)
+    test = UserAPITest(base_url, auto_cleanup=auto_cleanup)
     return test.run_test_suite()
 
 
-def run_post_tests(auto_cleanup: bool = False):
+def run_post_tests(auto_cleanup: bool = False, base_url: str = DEFAULT_BASE_URL):
     """运行文章API测试"""
+    from tests.test_post_api import PostAPITest
+
     print(f"{Fore.CYAN}启动文章API测试...{Style.RESET_ALL}")
-    test = PostAPITest(auto_cleanup=auto_cleanup)
+    test = PostAPITest(base_url, auto_cleanup=auto_cleanup)
     return test.run_test_suite()
 
 
-def run_comment_tests(auto_cleanup: bool = False):
+def run_comment_tests(auto_cleanup: bool = False, base_url: str = DEFAULT_BASE_URL):
     """运行评论API测试"""
+    from tests.test_comment_api import CommentAPITest
+
     print(f"{Fore.CYAN}启动评论API测试...{Style.RESET_ALL}")
-    test = CommentAPITest(auto_cleanup=auto_cleanup)
+    test = CommentAPITest(base_url, auto_cleanup=auto_cleanup)
     return test.run_test_suite()
 
 
-def run_comprehensive_tests(auto_cleanup: bool = False):
+def run_comprehensive_tests(auto_cleanup: bool = False, base_url: str = DEFAULT_BASE_URL):
     """运行综合测试"""
+    from tests.test_comprehensive import ComprehensiveAPITest
+
     print(f"{Fore.CYAN}启动综合测试...{Style.RESET_ALL}")
-    test = ComprehensiveAPITest(auto_cleanup=auto_cleanup)
+    test = ComprehensiveAPITest(base_url, auto_cleanup=auto_cleanup)
     return test.run_test_suite()
 
 
-def run_cleanup_tests():
+def run_cleanup_tests(base_url: str = DEFAULT_BASE_URL):
     """运行删除测试"""
+    from tests.test_user_api import UserAPITest
+    from tests.test_post_api import PostAPITest
+    from tests.test_comment_api import CommentAPITest
+    from tests.test_comprehensive import ComprehensiveAPITest
+
     print(f"{Fore.RED}🗑️  启动删除测试...{Style.RESET_ALL}")
     
     cleanup_tests = [
-        ("用户删除测试", lambda: UserAPITest().run_cleanup_tests()),
-        ("文章删除测试", lambda: PostAPITest().run_cleanup_tests()),
-        ("评论删除测试", lambda: CommentAPITest().run_cleanup_tests()),
-        ("综合删除测试", lambda: ComprehensiveAPITest().run_cleanup_tests())
+        ("用户删除测试", lambda: UserAPITest(base_url).run_cleanup_tests()),
+        ("文章删除测试", lambda: PostAPITest(base_url).run_cleanup_tests()),
+        ("评论删除测试", lambda: CommentAPITest(base_url).run_cleanup_tests()),
+        ("综合删除测试", lambda: ComprehensiveAPITest(base_url).run_cleanup_tests())
     ]
     
     results = []
@@ -123,42 +165,135 @@ def run_cleanup_tests():
         return False
 
 
-def run_all_tests(include_cleanup: bool = False):
-    """运行所有测试"""
-    print(f"{Fore.MAGENTA}🎯 运行完整测试套件...{Style.RESET_ALL}")
-    
-    if include_cleanup:
-        print(f"{Fore.YELLOW}⚠️  注意：将自动清理测试数据{Style.RESET_ALL}")
+# 完整测试套件的执行顺序: (套件标识, 显示名称, 运行函数)
+ALL_SUITES = [
+    ("user", "用户API测试", run_user_tests),
+    ("post", "文章API测试", run_post_tests),
+    ("comment", "评论API测试", run_comment_tests),
+    ("comprehensive", "综合场景测试", run_comprehensive_tests),
+]
+
+
+def _run_suite_in_worker(suite_key: str, auto_cleanup: bool, base_url: str, output_settings: tuple):
+    """在子进程中运行单个测试套件
+
+    套件输出被捕获后整体返回，由主进程按块打印，避免多个套件的日志交错。
+
+    Returns:
+        (是否成功, 捕获的输出, 异常信息或None, 延迟直方图快照, 请求计数快照, 连接统计快照)
+    """
+    from tests.http_pool import connection_stats
+
+    runner = next(func for key, _, func in ALL_SUITES if key == suite_key)
+    latency_registry.reset()
+    buffer = io.StringIO()
+    error = None
+    with redirect_stdout(buffer):
+        # 按主进程的配置重建输出层（后台写线程不会随fork复制）
+        output = configure_output(*output_settings)
+        try:
+            success = bool(runner(auto_cleanup=auto_cleanup, base_url=base_url))
+        except Exception as e:
+            success = False
+            error = str(e)
+        output.flush()
+        # 子进程退出时不会执行atexit，需要显式写回token缓存
+        token_cache.save()
+    return (
+        success, buffer.getvalue(), error, latency_registry.to_dict(), output.snapshot(), connection_stats.to_dict()
+    )
+
+
+def _print_suite_result(test_name: str, success: bool, error: str = None):
+    """打印单个测试模块的执行结果"""
+    if error is not None:
+        print(f"{Fore.RED}💥 {test_name} - 发生异常: {error}{Style.RESET_ALL}")
+    elif success:
+        print(f"{Fore.GREEN}✅ {test_name} - 完成{Style.RESET_ALL}")
     else:
-        print(f"{Fore.BLUE}ℹ️  注意：测试数据不会自动清理，如需清理请单独运行删除测试{Style.RESET_ALL}")
+        print(f"{Fore.RED}❌ {test_name} - 部分失败{Style.RESET_ALL}")
 
-    tests = [
-        ("用户API测试", lambda: run_user_tests(auto_cleanup=include_cleanup)),
-        ("文章API测试", lambda: run_post_tests(auto_cleanup=include_cleanup)),
-        ("评论API测试", lambda: run_comment_tests(auto_cleanup=include_cleanup)),
-        ("综合场景测试", lambda: run_comprehensive_tests(auto_cleanup=include_cleanup)),
-    ]
 
+def _run_suites_serial(include_cleanup: bool, base_url: str):
+    """依次运行所有测试套件"""
     results = []
 
-    for test_name, test_func in tests:
+    for _, test_name, test_func in ALL_SUITES:
         print(f"\n{Fore.YELLOW}{'=' * 60}")
         print(f"开始执行: {test_name}")
         print(f"{'=' * 60}{Style.RESET_ALL}")
 
         try:
-            success = test_func()
+            success = test_func(auto_cleanup=include_cleanup, base_url=base_url)
             results.append((test_name, success))
-
-            if success:
-                print(f"{Fore.GREEN}✅ {test_name} - 完成{Style.RESET_ALL}")
-            else:
-                print(f"{Fore.RED}❌ {test_name} - 部分失败{Style.RESET_ALL}")
-
+            _print_suite_result(test_name, success)
         except Exception as e:
-            print(f"{Fore.RED}💥 {test_name} - 发生异常: {str(e)}{Style.RESET_ALL}")
+            _print_suite_result(test_name, False, str(e))
             results.append((test_name, False))
 
+    return results
+
+
+def _run_suites_parallel(include_cleanup: bool, base_url: str, jobs: int):
+    """使用进程池并行运行所有测试套件，结果按原顺序汇总"""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    from tests.http_pool import ConnectionStats, connection_stats
+
+    print(f"{Fore.BLUE}ℹ️  使用 {jobs} 个工作进程并行执行测试套件{Style.RESET_ALL}")
+    outcomes = {}
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(
+                _run_suite_in_worker, key, include_cleanup, base_url, output_config()
+            ): (key, test_name)
+            for key, test_name, _ in ALL_SUITES
+        }
+
+        # 先完成的套件先输出，每个套件的日志作为一个整体打印
+        for future in as_completed(futures):
+            key, test_name = futures[future]
+            try:
+                success, output, error, latencies, counts, connections = future.result()
+                latency_registry.merge(LatencyRegistry.from_dict(latencies))
+                get_output().merge(counts)
+                connection_stats.merge(ConnectionStats.from_dict(connections))
+            except Exception as e:
+                # 工作进程异常退出（如被信号杀死）
+                success, output, error = False, "", f"工作进程异常退出: {e}"
+
+            print(f"\n{Fore.YELLOW}{'=' * 60}")
+            print(f"执行结果: {test_name}")
+            print(f"{'=' * 60}{Style.RESET_ALL}")
+            if output:
+                print(output, end="" if output.endswith("\n") else "\n")
+            _print_suite_result(test_name, success, error)
+            outcomes[key] = success
+
+    return [(test_name, outcomes.get(key, False)) for key, test_name, _ in ALL_SUITES]
+
+
+def run_all_tests(include_cleanup: bool = False, jobs: int = 1, base_url: str = DEFAULT_BASE_URL):
+    """运行所有测试
+
+    Args:
+        include_cleanup: 是否自动清理测试数据
+        jobs: 并行工作进程数，1表示依次执行
+        base_url: API基础URL
+    """
+    print(f"{Fore.MAGENTA}🎯 运行完整测试套件...{Style.RESET_ALL}")
+    
+    if include_cleanup:
+        print(f"{Fore.YELLOW}⚠️  注意：将自动清理测试数据{Style.RESET_ALL}")
+    else:
+        print(f"{Fore.BLUE}ℹ️  注意：测试数据不会自动清理，如需清理请单独运行删除测试{Style.RESET_ALL}")
+
+    if jobs > 1:
+        results = _run_suites_parallel(include_cleanup, base_url, min(jobs, len(ALL_SUITES)))
+    else:
+        results = _run_suites_serial(include_cleanup, base_url)
+
     # 打印最终报告
     print(f"\n{Fore.CYAN}{'=' * 60}")
     print("📊 测试执行报告")
@@ -173,6 +308,8 @@ def run_all_tests(include_cleanup: bool = False):
         print(f"  {status_icon} {status_color}{test_name}{Style.RESET_ALL}")
 
     print(f"\n📈 总计: {passed_tests}/{total_tests} 测试模块通过")
+    get_output().print_summary()
+    print_latency_report()
 
     if passed_tests == total_tests:
         print(f"{Fore.GREEN}🎉 所有测试模块执行完成！{Style.RESET_ALL}")
@@ -184,17 +321,220 @@ def run_all_tests(include_cleanup: bool = False):
         return False
 
 
-def check_dependencies():
-    """检查依赖"""
+def _load_scenario(path: str):
+    """编译场景文件，失败时打印原因并返回None"""
+    from tests.scenario import ScenarioError, load_scenario
+
     try:
-        import requests
-        import colorama
+        return load_scenario(path)
+    except (OSError, ScenarioError, RuntimeError) as e:
+        print(f"{Fore.RED}❌ 无法加载场景: {str(e)}{Style.RESET_ALL}")
+        return None
 
-        return True
-    except ImportError as e:
-        print(f"{Fore.RED}❌ 缺少依赖: {str(e)}")
+
+def run_scenario_mode(path: str, auto_cleanup: bool = False, base_url: str = DEFAULT_BASE_URL):
+    """运行声明式场景：执行一轮并逐步输出"""
+    from tests.scenario import ScenarioAPITest
+
+    plan = _load_scenario(path)
+    if plan is None:
+        return False
+    print(f"{Fore.CYAN}启动场景 {plan.name} ({plan.path})...{Style.RESET_ALL}")
+    return ScenarioAPITest(plan, base_url, auto_cleanup=auto_cleanup).run_test_suite()
+
+
+def run_load_mode(
+    users: int,
+    duration: float,
+    base_url: str = DEFAULT_BASE_URL,
+    workers: int = 1,
+    scenario: str = None,
+    engine: str = "threads",
+    client: str = DEFAULT_ASYNC_CLIENT,
+):
+    """运行压测模式：以多个虚拟用户并发重放综合测试流程或声明式场景
+
+    Args:
+        workers: 工作进程数，大于1时虚拟用户分散到多个进程，突破单个Python进程的CPU瓶颈
+        scenario: 场景文件，为None时重放综合测试流程
+        engine: threads（每个虚拟用户一个线程）或 async（协程，只用于场景，client 选择异步HTTP客户端）
+    """
+    from tests.loadgen import load_test_passed, print_load_report, run_distributed_load_test, run_load_test
+
+    plan = None
+    if scenario:
+        plan = _load_scenario(scenario)
+        if plan is None:
+            return False
+
+    if engine == "async":
+        from tests.scenario import run_async_load_test
+
+        result = run_async_load_test(plan, base_url, users, duration, client=client)
+        if result is None:
+            return False
+    elif workers > 1:
+        result = run_distributed_load_test(base_url, users, duration, workers, plan=plan)
+    else:
+        result = run_load_test(base_url, users, duration, plan=plan)
+    print_load_report(result)
+    print_latency_report()
+    return load_test_passed(result)
+
+
+def run_soak_mode(
+    hours: float,
+    users: int,
+    interval: float = DEFAULT_SAMPLE_INTERVAL,
+    server_pid: int = None,
+    base_url: str = DEFAULT_BASE_URL,
+):
+    """运行长稳测试：持续重放综合测试流程并监控延迟和服务器资源的变化趋势"""
+    from tests.loadgen import load_test_passed, print_load_report
+    from tests.soak import SoakTest, print_soak_report
+
+    soak = SoakTest(base_url, hours, users, interval=interval, server_pid=server_pid)
+    issues = soak.run()
+    print_soak_report(soak, issues)
+    print_load_report(soak.result)
+    print_latency_report()
+    return not issues and load_test_passed(soak.result)
+
+
+def run_auth_storm_mode(levels, step: float, base_url: str = DEFAULT_BASE_URL):
+    """运行登录/注册风暴基准：逐级增加并发，找出 bcrypt 路径的饱和拐点"""
+    from tests.auth_storm import AuthStormBenchmark, print_storm_report, storm_passed
+
+    benchmark = AuthStormBenchmark(base_url, levels=levels, step=step)
+    print(f"{Fore.MAGENTA}🔐 开始登录/注册风暴基准 (批次: {benchmark.run_tag}){Style.RESET_ALL}")
+    try:
+        if not benchmark.prepare():
+            return False
+        results = benchmark.run()
+    finally:
+        benchmark.cleanup()
+    print_storm_report(results)
+    print_latency_report()
+    return storm_passed(results)
+
+
+def parse_levels(text: str):
+    """解析逗号分隔的并发级别列表"""
+    try:
+        levels = [int(part) for part in text.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的并发级别列表: {text}")
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError("并发级别必须是大于等于1的整数")
+    return levels
+
+
+def run_payload_sweep_mode(sizes, repeats: int, base_url: str = DEFAULT_BASE_URL):
+    """运行请求体大小扫描：找出文章/评论内容开始被拒绝或明显变慢的大小"""
+    from tests.payload_sweep import PayloadSweep, print_sweep_report, sweep_passed
+
+    results = PayloadSweep(base_url, sizes=sizes, repeats=repeats).run()
+    if results is None:
+        return False
+    print_sweep_report(results)
+    print_latency_report()
+    return sweep_passed(results)
+
+
+def parse_sizes(text: str):
+    """解析逗号分隔的字节数列表，支持 K/M 后缀（按1000计），例如 100,10K,1M"""
+    sizes = []
+    for part in filter(None, (p.strip().upper().rstrip("B") for p in text.split(","))):
+        factor = {"K": 1_000, "M": 1_000_000}.get(part[-1], 1)
+        try:
+            sizes.append(int(float(part[:-1] if factor > 1 else part) * factor))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"无效的大小: {part}")
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError("大小必须是正数")
+    return sizes
+
+
+def run_open_loop_mode(
+    target: str,
+    rate: float,
+    duration: float,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    base_url: str = DEFAULT_BASE_URL,
+    client: str = DEFAULT_ASYNC_CLIENT,
+):
+    """运行开环压测：以恒定到达率请求单个接口"""
+    from tests.open_loop import OpenLoopLoadTest, open_loop_passed, print_open_loop_report
+
+    test = OpenLoopLoadTest(
+        base_url, target=target, rate=rate, duration=duration, max_in_flight=max_in_flight, client=client
+    )
+    result = test.run()
+    if result is None:
+        return False
+    print_open_loop_report(result)
+    print_latency_report()
+    return open_loop_passed(result)
+
+
+def finish(success: bool, print_summary: bool = True):
+    """输出请求汇总、写完事件文件后以对应退出码退出"""
+    output = get_output()
+    if print_summary:
+        output.print_summary()
+    output.close()
+    if "tests.http_pool" in sys.modules:
+        from tests.http_pool import print_connection_report
+
+        print_connection_report(request_seconds=latency_registry.combined().total / 1_000_000)
+    from tests.cassette import cassette
+
+    if cassette.mode == "record":
+        count = cassette.save()
+        if count is None:
+            success = False
+        else:
+            print(f"{Fore.BLUE}ℹ️  已录制 {count} 个请求到磁带: {cassette.path}{Style.RESET_ALL}")
+    elif cassette.replaying:
+        print(
+            f"{Fore.BLUE}ℹ️  从磁带回放 {cassette.replayed} 个请求"
+            f"（其中 {cassette.fallbacks} 个按路由匹配）{Style.RESET_ALL}"
+        )
+    sys.exit(0 if success else 1)
+
+
+def check_dependencies():
+    """检查依赖是否已安装（只查找模块，不导入）"""
+    missing = [name for name in ("requests", "colorama") if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"{Fore.RED}❌ 缺少依赖: {', '.join(missing)}")
         print(f"{Fore.YELLOW}请运行: uv sync{Style.RESET_ALL}")
         return False
+    return True
+
+
+# 命令行可选的运行模式: (参数, 说明)，供 --list 使用
+RUN_MODES = [
+    ("--all", "运行所有测试套件（--jobs N 并行）"),
+    ("--user", "用户API测试"),
+    ("--post", "文章API测试"),
+    ("--comment", "评论API测试"),
+    ("--comprehensive", "综合场景测试"),
+    ("--cleanup", "删除测试"),
+    ("--scenario FILE", "声明式场景（JSON/YAML），与 --load 一起使用时压测该场景"),
+    ("--load", "闭环压测：虚拟用户并发重放综合测试流程"),
+    ("--open-loop", "开环压测：以恒定速率请求单个接口"),
+    ("--auth-storm", "登录/注册风暴基准"),
+    ("--payload-sweep", "请求体大小扫描"),
+    ("--soak HOURS", "长稳测试"),
+]
+
+
+def print_run_modes():
+    """打印可选的运行模式"""
+    print(f"{Fore.CYAN}运行模式:{Style.RESET_ALL}")
+    for flag, description in RUN_MODES:
+        print(f"  {flag:<16}{description}")
 
 
 def main():
@@ -212,10 +552,27 @@ def main():
   python run_tests.py --comprehensive # 仅运行综合测试
   python run_tests.py --cleanup       # 仅运行删除测试
   python run_tests.py --all --auto-cleanup    # 运行所有测试并自动清理数据
+  python run_tests.py --all --jobs 4  # 使用4个进程并行运行所有测试
+  python run_tests.py --load --users 20 --duration 60  # 20个虚拟用户压测60秒
+  python run_tests.py --load --users 64 --workers 4    # 64个虚拟用户分散到4个工作进程
+  python run_tests.py --scenario blog_mix              # 执行一轮 tests/scenarios/blog_mix.json 场景
+  python run_tests.py --load --scenario my.yaml --engine async --http-client raw  # 以协程压测自定义场景
+  python run_tests.py --open-loop --rate 2000 --duration 30  # 以2000 req/s的恒定速率请求 GET /post/:id
+  python run_tests.py --auth-storm --storm-levels 1,4,16,64  # 登录/注册并发阶梯，找出bcrypt饱和拐点
+  python run_tests.py --payload-sweep --sweep-sizes 1K,100K,1M,10M  # 文章/评论内容大小扫描
+  python run_tests.py --soak 4 --users 5  # 5个虚拟用户长稳测试4小时，监控延迟和服务器内存/fd趋势
+  python run_tests.py --all --output verbose  # 打印每个请求和响应的详细内容
+  python run_tests.py --all --events events.jsonl  # 请求事件写入JSON Lines文件
+  python run_tests.py --all --fake    # 使用进程内替身服务器运行（无需Go服务器和MySQL）
+  python run_tests.py --all --record suite.cassette.gz  # 录制所有请求和响应
+  python run_tests.py --all --replay suite.cassette.gz  # 从磁带回放，不访问网络
+  python run_tests.py --all --compare-baseline  # 与历史基准比较，p95或吞吐量回退超过20%时失败
   python run_tests.py --base-url http://localhost:8080/api/v1  # 自定义API地址
         """,
     )
 
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    parser.add_argument("--list", action="store_true", help="列出可选的测试套件和运行模式后退出")
     parser.add_argument("--all", action="store_true", help="运行所有测试")
     parser.add_argument("--user", action="store_true", help="运行用户API测试")
     parser.add_argument("--post", action="store_true", help="运行文章API测试")
@@ -223,42 +580,383 @@ def main():
     parser.add_argument("--comprehensive", action="store_true", help="运行综合测试")
     parser.add_argument("--cleanup", action="store_true", help="运行删除测试")
     parser.add_argument("--auto-cleanup", action="store_true", help="测试后自动清理数据（与其他测试选项一起使用）")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="并行运行测试套件的进程数（与--all一起使用，默认: 1）",
+    )
+    parser.add_argument("--load", action="store_true", help="压测模式：以多个虚拟用户并发重放综合测试流程")
+    parser.add_argument("--users", type=int, default=10, metavar="N", help="压测虚拟用户数（默认: 10）")
+    parser.add_argument(
+        "--duration", type=float, default=60, metavar="T", help="压测持续时间，单位秒（默认: 60）"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="压测工作进程数，虚拟用户均分到各进程，结果合并后计算全局分位数（默认: 1）",
+    )
+    parser.add_argument(
+        "--scenario",
+        metavar="FILE",
+        help="声明式场景文件（JSON，安装PyYAML后也支持YAML），或 tests/scenarios/ 中的场景名；"
+        "单独使用时执行一轮，与 --load 一起使用时压测该场景",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("threads", "async"),
+        default="threads",
+        help="场景压测引擎: threads 每个虚拟用户一个线程（默认，可配合 --workers），"
+        "async 所有虚拟用户作为协程在一个事件循环中运行（使用 --http-client 选择的客户端）",
+    )
+    parser.add_argument(
+        "--auth-storm",
+        action="store_true",
+        help="登录/注册风暴基准：逐级增加 POST /login 和 POST /register 的并发，报告吞吐量、延迟曲线和饱和拐点",
+    )
+    parser.add_argument(
+        "--storm-levels",
+        type=parse_levels,
+        default=list(DEFAULT_LEVELS),
+        metavar="N,N,...",
+        help=f"风暴基准的并发级别（默认: {','.join(map(str, DEFAULT_LEVELS))}）",
+    )
+    parser.add_argument(
+        "--storm-step",
+        type=float,
+        default=DEFAULT_STEP_SECONDS,
+        metavar="S",
+        help=f"风暴基准每个并发级别的持续时间，单位秒（默认: {DEFAULT_STEP_SECONDS}）",
+    )
+    parser.add_argument(
+        "--payload-sweep",
+        action="store_true",
+        help="请求体大小扫描：以不同大小的内容请求 POST /post、PUT /post 和 POST /comment，找出开始失败或变慢的大小",
+    )
+    parser.add_argument(
+        "--sweep-sizes",
+        type=parse_sizes,
+        default=list(DEFAULT_SIZES),
+        metavar="SIZE,...",
+        help="扫描的内容大小，支持K/M后缀（默认: 100B 到 10MB，按 1-3-10 递增）",
+    )
+    parser.add_argument(
+        "--sweep-repeats",
+        type=int,
+        default=DEFAULT_REPEATS,
+        metavar="N",
+        help=f"每个大小、每个接口的请求次数（默认: {DEFAULT_REPEATS}）",
+    )
+    parser.add_argument(
+        "--soak",
+        type=float,
+        metavar="HOURS",
+        help="长稳测试模式：以 --users 个虚拟用户持续运行指定小时数，检测延迟、服务器RSS和fd的持续增长",
+    )
+    parser.add_argument(
+        "--soak-interval",
+        type=float,
+        default=DEFAULT_SAMPLE_INTERVAL,
+        metavar="S",
+        help=f"长稳测试的采样间隔，单位秒（默认: {DEFAULT_SAMPLE_INTERVAL}）",
+    )
+    parser.add_argument(
+        "--server-pid",
+        type=int,
+        metavar="PID",
+        help="长稳测试监控的服务器进程ID（默认按 --base-url 的端口查找本机监听进程）",
+    )
+    parser.add_argument(
+        "--open-loop",
+        action="store_true",
+        help="开环压测模式：以恒定速率请求单个接口，延迟从预定发送时刻计算（需要异步后端）",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=100, metavar="R", help="开环压测的目标速率，单位请求/秒（默认: 100）"
+    )
+    parser.add_argument(
+        "--target",
+        choices=sorted(OPEN_LOOP_TARGETS),
+        default="get_post",
+        help="开环压测的目标接口（默认: get_post）",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=DEFAULT_MAX_IN_FLIGHT,
+        metavar="N",
+        help=f"开环压测的最大在途请求数，超出时丢弃并计数（默认: {DEFAULT_MAX_IN_FLIGHT}）",
+    )
+    parser.add_argument(
+        "--http-client",
+        choices=ASYNC_CLIENTS,
+        default=DEFAULT_ASYNC_CLIENT,
+        help="开环压测和 --engine async 使用的异步HTTP客户端: aiohttp（默认），或 raw（基于asyncio streams的轻量keep-alive客户端，"
+        "每个请求的客户端开销更小，无需额外依赖）",
+    )
+    parser.add_argument(
+        "--output",
+        choices=OUTPUT_MODES,
+        default="summary",
+        help="控制台输出模式: summary 只打印失败请求和汇总（默认），verbose 打印每个请求和响应的详细内容",
+    )
+    parser.add_argument(
+        "--json-codec",
+        choices=("auto",) + codec.CODECS,
+        metavar="NAME",
+        help=f"JSON编解码实现: auto, {', '.join(codec.CODECS)}（默认: auto，即已安装的第一个，当前为 {codec.name}）",
+    )
+    parser.add_argument("--events", metavar="FILE", help="把每个请求事件以JSON Lines格式写入文件（后台线程写入）")
     parser.add_argument(
         "--base-url",
-        default="http://localhost:8000/api/v1",
-        help="API基础URL (默认: http://localhost:8000/api/v1)",
+        default=DEFAULT_BASE_URL,
+        help=f"API基础URL (默认: {DEFAULT_BASE_URL})",
+    )
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="启动进程内的替身服务器（内存存储，无需Go服务器和MySQL），测试将指向它",
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", metavar="FILE", help="录制模式：把所有请求和响应写入磁带文件")
+    cassette_group.add_argument("--replay", metavar="FILE", help="回放模式：从磁带文件返回响应，不访问网络")
+    parser.add_argument(
+        "--compare-baseline",
+        action="store_true",
+        help="与基准结果库中的历史结果比较，任一接口的p95延迟或吞吐量回退超过阈值时运行失败",
+    )
+    parser.add_argument(
+        "--regression-threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        metavar="R",
+        help=f"回退阈值，0.2表示p95升高或吞吐量下降超过20%%（默认: {DEFAULT_THRESHOLD}）",
+    )
+    parser.add_argument(
+        "--baseline-db",
+        default=DEFAULT_DB_PATH,
+        metavar="FILE",
+        help="基准结果库（SQLite）路径，每次运行的接口统计都会写入（默认: 项目目录下的 benchmark_results.sqlite）",
+    )
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=DEFAULT_READY_TIMEOUT,
+        metavar="S",
+        help=f"等待服务器就绪（GET /health）的最长时间，单位秒，0表示只探测一次（默认: {DEFAULT_READY_TIMEOUT}）",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        metavar="N",
+        help=f"每个主机保留的HTTP连接数，所有测试套件共享（默认: {DEFAULT_POOL_SIZE}，压测模式下不少于虚拟用户数）",
+    )
+    parser.add_argument(
+        "--pool-block",
+        action="store_true",
+        help="连接数达到 --pool-size 时等待空闲连接，而不是临时新建连接（限制每个主机的最大连接数）",
+    )
+    parser.add_argument(
+        "--no-keep-alive",
+        action="store_true",
+        help="每个请求都新建连接（Connection: close），用于对比握手开销",
     )
     parser.add_argument("--no-banner", action="store_true", help="不显示横幅")
+    parser.add_argument("--no-token-cache", action="store_true", help="不使用JWT token缓存，每次都重新登录")
 
     args = parser.parse_args()
 
+    if args.list:
+        print_run_modes()
+        return
+
+    if args.jobs < 1:
+        parser.error("--jobs 必须大于等于 1")
+    if args.users < 1:
+        parser.error("--users 必须大于等于 1")
+    if args.workers < 1:
+        parser.error("--workers 必须大于等于 1")
+    if args.duration <= 0:
+        parser.error("--duration 必须大于 0")
+    if args.soak is not None and args.soak <= 0:
+        parser.error("--soak 必须大于 0")
+    if args.sweep_repeats < 1:
+        parser.error("--sweep-repeats 必须大于等于 1")
+    if args.storm_step <= 0:
+        parser.error("--storm-step 必须大于 0")
+    if args.soak_interval <= 0:
+        parser.error("--soak-interval 必须大于 0")
+    if args.rate <= 0:
+        parser.error("--rate 必须大于 0")
+    if args.max_in_flight < 1:
+        parser.error("--max-in-flight 必须大于等于 1")
+    if args.pool_size is not None and args.pool_size < 1:
+        parser.error("--pool-size 必须大于等于 1")
+    if args.ready_timeout < 0:
+        parser.error("--ready-timeout 不能小于 0")
+    if args.regression_threshold <= 0:
+        parser.error("--regression-threshold 必须大于 0")
+    if args.engine == "async" and not (args.load and args.scenario):
+        parser.error("--engine async 只用于场景压测（--load --scenario）")
+    if args.engine == "async" and args.workers > 1:
+        parser.error("--engine async 在单个进程中运行，不能与 --workers 一起使用")
+    if args.scenario and (args.soak or args.open_loop or args.auth_storm or args.payload_sweep):
+        parser.error("--scenario 只能单独使用或与 --load 一起使用")
+    if args.compare_baseline and args.replay:
+        parser.error("--compare-baseline 不能与 --replay 一起使用（回放的延迟没有意义）")
+    if (args.record or args.replay) and (
+        args.jobs > 1 or args.load or args.open_loop or args.soak or args.auth_storm or args.payload_sweep
+    ):
+        parser.error("--record/--replay 只用于功能测试套件，不能与 --jobs 或压测/基准模式一起使用")
+
     # 检查依赖
     if not check_dependencies():
         sys.exit(1)
+    if args.json_codec:
+        try:
+            codec.use(args.json_codec)
+        except RuntimeError as e:
+            print(f"{Fore.RED}❌ {str(e)}{Style.RESET_ALL}")
+            sys.exit(1)
+        # 工作进程（--jobs、--workers）从环境变量继承同一实现
+        os.environ[codec.CODEC_ENV] = args.json_codec
+    if args.pool_size is not None or args.pool_block or args.no_keep_alive or args.load or args.soak:
+        from tests import http_pool
+
+        pool_size = args.pool_size
+        if pool_size is None:
+            # 闭环压测每个虚拟用户一个线程，连接池小于线程数时多出的连接用完即丢弃
+            pool_size = max(DEFAULT_POOL_SIZE, args.users) if args.load or args.soak else DEFAULT_POOL_SIZE
+        http_pool.configure(pool_size, block=args.pool_block, keep_alive=not args.no_keep_alive)
+
+    try:
+        configure_output(args.output, args.events)
+    except OSError as e:
+        print(f"{Fore.RED}❌ 无法打开事件文件: {str(e)}{Style.RESET_ALL}")
+        sys.exit(1)
+    if args.fake:
+        from tests.fake_server import start_fake_server
+
+        fake_server = start_fake_server()
+        args.base_url = fake_server.base_url
+        print(f"{Fore.BLUE}ℹ️  使用替身服务器: {args.base_url}{Style.RESET_ALL}")
+    token_cache.enabled = not args.no_token_cache
+    if args.record or args.replay:
+        from tests.cassette import cassette
+
+        # token缓存命中与否会改变登录请求的顺序，录制和回放时一律重新登录
+        token_cache.enabled = False
+        try:
+            cassette.start("record" if args.record else "replay", args.record or args.replay)
+        except (OSError, ValueError) as e:
+            action = "写入" if args.record else "读取"
+            print(f"{Fore.RED}❌ 无法{action}磁带文件: {str(e)}{Style.RESET_ALL}")
+            sys.exit(1)
 
     # 显示横幅
     if not args.no_banner:
         print_banner()
 
+    selected = any(
+        (
+            args.all, args.user, args.post, args.comment, args.comprehensive, args.load,
+            args.auth_storm, args.payload_sweep, args.soak, args.open_loop, args.cleanup, args.scenario,
+        )
+    )
+    if not args.replay:
+        from tests.readiness import readiness_probe
+
+        # 整个运行只探测一次，结果由各测试套件和工作进程共享
+        readiness_probe.timeout = args.ready_timeout
+        if selected and not readiness_probe.wait_until_ready(args.base_url):
+            print(f"{Fore.RED}❌ 服务器未就绪: {args.base_url}，请先启动服务器: go run main.go{Style.RESET_ALL}")
+            sys.exit(1)
+
     # 如果指定了命令行参数，直接执行对应测试
+    mode = None
+    started = time.perf_counter()
+    if not args.no_banner or args.output == "verbose":
+        # 测试模块在各运行函数中导入，这里只统计解释器启动后到开始运行前的固定开销
+        print(f"{Fore.BLUE}ℹ️  启动耗时: {(started - STARTED) * 1000:.0f}ms, JSON编解码: {codec.name}{Style.RESET_ALL}")
     if args.all:
-        success = run_all_tests(include_cleanup=args.auto_cleanup)
-        sys.exit(0 if success else 1)
+        mode = f"all:jobs={args.jobs}" if args.jobs > 1 else "all"
+        success = run_all_tests(
+            include_cleanup=args.auto_cleanup, jobs=args.jobs, base_url=args.base_url
+        )
     elif args.user:
-        success = run_user_tests(auto_cleanup=args.auto_cleanup)
-        sys.exit(0 if success else 1)
+        mode = "user"
+        success = run_user_tests(auto_cleanup=args.auto_cleanup, base_url=args.base_url)
     elif args.post:
-        success = run_post_tests(auto_cleanup=args.auto_cleanup)
-        sys.exit(0 if success else 1)
+        mode = "post"
+        success = run_post_tests(auto_cleanup=args.auto_cleanup, base_url=args.base_url)
     elif args.comment:
-        success = run_comment_tests(auto_cleanup=args.auto_cleanup)
-        sys.exit(0 if success else 1)
+        mode = "comment"
+        success = run_comment_tests(auto_cleanup=args.auto_cleanup, base_url=args.base_url)
     elif args.comprehensive:
-        success = run_comprehensive_tests(auto_cleanup=args.auto_cleanup)
-        sys.exit(0 if success else 1)
+        mode = "comprehensive"
+        success = run_comprehensive_tests(auto_cleanup=args.auto_cleanup, base_url=args.base_url)
+    elif args.load:
+        mode = f"load:users={args.users}"
+        if args.workers > 1:
+            mode += f":workers={args.workers}"
+        if args.scenario:
+            mode += f":scenario={os.path.splitext(os.path.basename(args.scenario))[0]}"
+        if args.engine == "async":
+            mode += f":engine=async:client={args.http_client}"
+        success = run_load_mode(
+            args.users,
+            args.duration,
+            base_url=args.base_url,
+            workers=args.workers,
+            scenario=args.scenario,
+            engine=args.engine,
+            client=args.http_client,
+        )
+    elif args.scenario:
+        mode = f"scenario:{os.path.splitext(os.path.basename(args.scenario))[0]}"
+        success = run_scenario_mode(args.scenario, auto_cleanup=args.auto_cleanup, base_url=args.base_url)
+    elif args.auth_storm:
+        mode = "auth-storm:levels=" + ",".join(map(str, sorted(set(args.storm_levels))))
+        success = run_auth_storm_mode(args.storm_levels, args.storm_step, base_url=args.base_url)
+    elif args.payload_sweep:
+        mode = "payload-sweep"
+        success = run_payload_sweep_mode(args.sweep_sizes, args.sweep_repeats, base_url=args.base_url)
+    elif args.soak:
+        mode = f"soak:users={args.users}"
+        success = run_soak_mode(
+            args.soak, args.users, args.soak_interval, args.server_pid, base_url=args.base_url
+        )
+    elif args.open_loop:
+        mode = f"open-loop:{args.target}:rate={args.rate:g}"
+        if args.http_client != DEFAULT_ASYNC_CLIENT:
+            mode += f":client={args.http_client}"
+        success = run_open_loop_mode(
+            args.target, args.rate, args.duration, args.max_in_flight, base_url=args.base_url, client=args.http_client
+        )
     elif args.cleanup:
-        success = run_cleanup_tests()
-        sys.exit(0 if success else 1)
+        mode = "cleanup"
+        success = run_cleanup_tests(base_url=args.base_url)
+
+    if mode is not None:
+        if not args.replay:
+            from tests.baseline import record_and_compare
+
+            # 替身服务器每次使用随机端口，按 "fake" 归为同一目标
+            success &= record_and_compare(
+                latency_registry,
+                mode,
+                "fake" if args.fake else args.base_url,
+                time.perf_counter() - started,
+                success,
+                compare=args.compare_baseline,
+                threshold=args.regression_threshold,
+                path=args.baseline_db,
+            )
+        # --all 的报告中已经输出了请求汇总
+        finish(success, print_summary=not args.all)
 
     # 否则显示交互式菜单
     while True:
@@ -280,17 +978,17 @@ def main():
                 print(f"{Fore.GREEN}👋 再见！{Style.RESET_ALL}")
                 break
             elif choice == "1":
-                run_user_tests()
+                run_user_tests(auto_cleanup=args.auto_cleanup, base_url=args.base_url)
             elif choice == "2":
-                run_post_tests()
+                run_post_tests(auto_cleanup=args.auto_cleanup, base_url=args.base_url)
             elif choice == "3":
-                run_comment_tests()
+                run_comment_tests(auto_cleanup=args.auto_cleanup, base_url=args.base_url)
             elif choice == "4":
-                run_comprehensive_tests()
+                run_comprehensive_tests(auto_cleanup=args.auto_cleanup, base_url=args.base_url)
             elif choice == "5":
-                run_all_tests()
+                run_all_tests(include_cleanup=args.auto_cleanup, jobs=args.jobs, base_url=args.base_url)
             elif choice == "6":
-                run_cleanup_tests()
+                run_cleanup_tests(base_url=args.base_url)
             else:
                 print(f"{Fore.RED}❌ 无效选择，请输入 0-6{Style.RESET_ALL}")
 
@@ -1 +1,3 @@
 # Test package for blog API
+
+__version__ = "0.1.0"
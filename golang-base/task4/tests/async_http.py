@@ -0,0 +1,71 @@
+"""
+异步HTTP后端
+基于aiohttp的可选客户端，使单个进程可以同时发出大量并发请求
+
+aiohttp 为可选依赖，安装方式: uv sync --extra async
+aiohttp 导入耗时较长，只在第一次创建会话时导入，同步测试不需要付出这部分启动开销。
+"""
+
+import asyncio
+import importlib.util
+from typing import Any, Dict, Optional, Union
+
+from . import codec
+from .response import BufferedResponse
+
+aiohttp = None  # 第一次创建会话时导入
+
+
+# 单个会话允许的最大并发连接数
+DEFAULT_CONNECTION_LIMIT = 100
+
+
+def is_available() -> bool:
+    """异步后端是否可用（是否已安装aiohttp），不会导入aiohttp"""
+    return aiohttp is not None or importlib.util.find_spec("aiohttp") is not None
+
+
+def _import_aiohttp():
+    global aiohttp
+    if aiohttp is None:
+        try:
+            import aiohttp as module
+        except ImportError:
+            raise RuntimeError("异步后端需要安装 aiohttp，请运行: uv sync --extra async")
+        aiohttp = module
+    return aiohttp
+
+
+def create_session(limit: int = DEFAULT_CONNECTION_LIMIT) -> "aiohttp.ClientSession":
+    """创建aiohttp会话，必须在运行中的事件循环内调用"""
+    _import_aiohttp()
+    connector = aiohttp.TCPConnector(limit=limit)
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def send(
+    session: "aiohttp.ClientSession",
+    method: str,
+    url: str,
+    data: Union[Dict[Any, Any], bytes, None] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> BufferedResponse:
+    """发送请求并完整读取响应体，data 以JSON编码（bytes 视为已编码的请求体）
+
+    Raises:
+        ConnectionError: 网络层错误（连接失败、超时等）
+    """
+    request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+    body = None
+    if data is not None:
+        body = data if type(data) is bytes else codec.dumps(data)
+        headers = {"Content-Type": "application/json", **(headers or {})}
+    try:
+        async with session.request(
+            method, url, data=body, headers=headers, timeout=request_timeout
+        ) as resp:
+            content = await resp.read()
+            return BufferedResponse(resp.status, content, dict(resp.headers), url)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise ConnectionError(f"{method} {url}: {e}") from e
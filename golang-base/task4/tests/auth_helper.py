@@ -4,6 +4,8 @@ JWT认证助手模块
 """
 
 from .base_test import BaseAPITest
+from .schema import LoginResult, parse_response
+from .token_cache import token_cache
 
 
 class AuthenticatedAPITest(BaseAPITest):
@@ -13,6 +15,8 @@ class AuthenticatedAPITest(BaseAPITest):
         super().__init__(base_url, auto_cleanup)
         self.test_user_id = None
         self.test_user_password = "testpass123"
+        # 调用方提供的已登录用户 {"id": ..., "token": ...}，设置后不再注册新用户（如pytest插件的会话级用户）
+        self.preset_user = None
 
     def setup_authenticated_user(self, username: str = "authuser", password: str = None):
         """创建测试用户并登录获取JWT token"""
@@ -21,6 +25,12 @@ class AuthenticatedAPITest(BaseAPITest):
 
         self.print_step(0, f"设置认证用户: {username}")
 
+        if self.preset_user:
+            self.test_user_id = self.preset_user["id"]
+            self.set_jwt_token(self.preset_user["token"])
+            self.print_info(f"使用已登录的用户ID: {self.test_user_id}")
+            return self.test_user_id
+
         # 创建用户
         user_data = {
             "username": username,
@@ -56,10 +66,10 @@ class AuthenticatedAPITest(BaseAPITest):
 
                 if login_response.status_code == 200:
                     try:
-                        data = login_response.json()
-                        token = data.get("data", {}).get("token")
+                        token = parse_response(login_response).entity(LoginResult).token
                         if token:
                             self.set_jwt_token(token)
+                            token_cache.put(self.base_url, user_id, token)
                             self.print_success("认证设置完成，已获取JWT token")
                             return user_id
                         else:
@@ -0,0 +1,221 @@
+"""
+登录/注册风暴基准
+UserAPI.Create 和 UserAPI.Login 都以 bcrypt DefaultCost 计算密码哈希，是服务器上CPU开销最大的接口。
+这里以逐级增加的并发数持续请求 POST /login 和 POST /register，报告每一级的吞吐量和延迟曲线，
+并找出服务器饱和的拐点，用于评估Pod规格和 bcrypt cost 的取舍。
+
+拐点取 "吞吐量 / 平均延迟"（Kleinrock power）最大的并发级别：
+在此之前增加并发主要提升吞吐量，之后增加的并发只会在服务器上排队、拉长延迟。
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+from colorama import Fore, Style
+
+from . import codec
+from .defaults import DEFAULT_LEVELS, DEFAULT_STEP_SECONDS
+from .metrics import LatencyHistogram, latency_registry
+
+
+STORM_PASSWORD = "storm123456"
+
+# 准备和清理用户时的并发数
+SETUP_CONCURRENCY = 8
+
+
+class LevelResult:
+    """某个接口在某个并发级别下的结果"""
+
+    def __init__(self, endpoint: str, concurrency: int):
+        self.endpoint = endpoint
+        self.concurrency = concurrency
+        self.requests = 0
+        self.errors = 0
+        self.elapsed = 0.0
+        self.latency = LatencyHistogram()
+
+    @property
+    def throughput(self) -> float:
+        """成功请求数/秒"""
+        return (self.requests - self.errors) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def power(self) -> float:
+        """吞吐量与平均延迟之比"""
+        return self.throughput / self.latency.mean if self.latency.mean else 0.0
+
+
+def find_knee(levels: List[LevelResult]) -> Optional[LevelResult]:
+    """吞吐量/平均延迟最大的级别即为饱和拐点"""
+    candidates = [level for level in levels if level.throughput > 0]
+    return max(candidates, key=lambda level: level.power) if candidates else None
+
+
+class AuthStormBenchmark:
+    """登录/注册风暴：每个并发级别持续 step 秒"""
+
+    def __init__(self, base_url: str, levels=DEFAULT_LEVELS, step: float = DEFAULT_STEP_SECONDS):
+        self.base_url = base_url
+        self.levels = sorted(set(levels))
+        self.step = step
+        self.run_tag = uuid.uuid4().hex[:6]
+        self.pool: List[int] = []  # 登录测试使用的用户ID，每个并发线程一个
+        self.created: List[int] = []  # 本次创建的所有用户ID，结束后删除
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sequence = 0
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update({"Content-Type": "application/json", "Accept": "application/json"})
+        return session
+
+    def _next_username(self) -> str:
+        with self._lock:
+            self._sequence += 1
+            return f"storm_{self.run_tag}_{self._sequence}"
+
+    def _register(self) -> Optional[int]:
+        username = self._next_username()
+        try:
+            response = self._session().post(
+                f"{self.base_url}/register",
+                data=codec.dumps({"username": username, "password": STORM_PASSWORD, "email": f"{username}@example.com"}),
+                timeout=60,
+            )
+            if response.status_code != 200:
+                return None
+            user_id = codec.loads(response.content)["data"]["id"]
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError):
+            return None
+        with self._lock:
+            self.created.append(user_id)
+        return user_id
+
+    def _login(self, user_id: int) -> bool:
+        try:
+            response = self._session().post(
+                f"{self.base_url}/login", data=codec.dumps({"id": user_id, "password": STORM_PASSWORD}), timeout=60
+            )
+        except requests.exceptions.RequestException:
+            return False
+        return response.status_code == 200
+
+    def prepare(self) -> bool:
+        """注册登录测试所需的用户（数量等于最高并发级别）"""
+        count = self.levels[-1]
+        print(f"{Fore.YELLOW}📋 准备 {count} 个登录用户{Style.RESET_ALL}")
+        with ThreadPoolExecutor(max_workers=min(SETUP_CONCURRENCY, count)) as executor:
+            self.pool = [user_id for user_id in executor.map(lambda _: self._register(), range(count)) if user_id]
+        if len(self.pool) < count:
+            print(f"{Fore.RED}❌ 只创建了 {len(self.pool)}/{count} 个用户{Style.RESET_ALL}")
+            return False
+        return True
+
+    def _run_level(self, endpoint: str, concurrency: int) -> LevelResult:
+        """以 concurrency 个线程持续请求 step 秒"""
+        result = LevelResult(endpoint, concurrency)
+        deadline = time.monotonic() + self.step
+
+        def worker(slot: int):
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                ok = self._login(self.pool[slot]) if endpoint == "/login" else bool(self._register())
+                elapsed = time.perf_counter() - start
+                latency_registry.record("POST", endpoint, elapsed)
+                with self._lock:
+                    result.requests += 1
+                    result.latency.record(elapsed)
+                    if not ok:
+                        result.errors += 1
+                        latency_registry.record_error("POST", endpoint)
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result.elapsed = time.monotonic() - start
+
+        color = Fore.RED if result.errors else Fore.GREEN
+        print(
+            f"  {color}POST {endpoint:<10}{Style.RESET_ALL} 并发 {concurrency:>4}: "
+            f"{result.throughput:>8.1f} 次/s, p50 {result.latency.percentile(50) * 1000:>7.1f}ms, "
+            f"p99 {result.latency.percentile(99) * 1000:>7.1f}ms, 错误 {result.errors}"
+        )
+        return result
+
+    def run(self) -> Dict[str, List[LevelResult]]:
+        """依次对 /login 和 /register 运行并发阶梯"""
+        results = {}
+        for endpoint in ("/login", "/register"):
+            print(f"\n{Fore.YELLOW}📋 POST {endpoint} 并发阶梯: {self.levels}, 每级 {self.step:g} 秒{Style.RESET_ALL}")
+            results[endpoint] = [self._run_level(endpoint, level) for level in self.levels]
+        return results
+
+    def cleanup(self):
+        """删除本次创建的所有用户（删除接口只要求任一有效token）"""
+        if not self.created:
+            return
+        try:
+            response = self._session().post(
+                f"{self.base_url}/login", json={"id": self.created[0], "password": STORM_PASSWORD}, timeout=60
+            )
+            token = response.json()["data"]["token"]
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError):
+            print(f"{Fore.YELLOW}⚠️  无法登录，跳过清理 {len(self.created)} 个用户{Style.RESET_ALL}")
+            return
+
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def delete(user_id: int) -> bool:
+            try:
+                return self._session().delete(
+                    f"{self.base_url}/user/{user_id}", headers=headers, timeout=60
+                ).status_code == 200
+            except requests.exceptions.RequestException:
+                return False
+
+        # 用于登录的用户最后删除，保证token一直有效
+        user_ids = self.created[1:] + self.created[:1]
+        with ThreadPoolExecutor(max_workers=SETUP_CONCURRENCY) as executor:
+            deleted = sum(executor.map(delete, user_ids))
+        print(f"{Fore.BLUE}ℹ️  已清理 {deleted}/{len(user_ids)} 个压测用户{Style.RESET_ALL}")
+
+
+def print_storm_report(results: Dict[str, List[LevelResult]]):
+    """打印每个接口的吞吐量/延迟曲线和饱和拐点"""
+    print(f"\n{Fore.CYAN}{'=' * 70}")
+    print("📊 登录/注册风暴报告")
+    print(f"{'=' * 70}{Style.RESET_ALL}")
+
+    for endpoint, levels in results.items():
+        knee = find_knee(levels)
+        peak = max(levels, key=lambda level: level.throughput)
+        print(f"\n{Fore.YELLOW}  POST {endpoint}{Style.RESET_ALL}")
+        print(f"  {'并发':>4}{'吞吐(次/s)':>12}{'p50':>10}{'p90':>10}{'p99':>10}{'错误':>6}")
+        for level in levels:
+            marker = f"  {Fore.MAGENTA}← 拐点{Style.RESET_ALL}" if level is knee else ""
+            print(
+                f"  {level.concurrency:>6}{level.throughput:>12.1f}"
+                f"{level.latency.percentile(50) * 1000:>8.1f}ms{level.latency.percentile(90) * 1000:>8.1f}ms"
+                f"{level.latency.percentile(99) * 1000:>8.1f}ms{level.errors:>8}{marker}"
+            )
+        if knee:
+            print(
+                f"  拐点: 并发 {knee.concurrency}, {knee.throughput:.1f} 次/s, "
+                f"平均延迟 {knee.latency.mean * 1000:.1f}ms；峰值吞吐 {peak.throughput:.1f} 次/s (并发 {peak.concurrency})"
+            )
+
+
+def storm_passed(results: Dict[str, List[LevelResult]]) -> bool:
+    """所有级别都没有错误"""
+    return all(level.errors == 0 for levels in results.values() for level in levels)
@@ -3,17 +3,38 @@
 """
 
 import requests
-import json
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple, Union
 from colorama import Fore, Style, init
 
+from . import async_http, codec, http_pool, raw_http
+from .metrics import latency_registry, template_route
+from .output import get_output
+from .token_cache import token_cache
+from .response import BufferedResponse
+from .cassette import CassetteAdapter, cassette
+from .readiness import readiness_probe
+from .schema import LoginResult, SchemaError, parse_response
+
 # 初始化colorama
 init(autoreset=True)
 
+# 异步后端: 名称 -> 模块，两者接口相同（is_available / create_session / send）
+ASYNC_CLIENT_MODULES = {"aiohttp": async_http, "raw": raw_http}
+
 
 class BaseAPITest:
     """API测试基类"""
 
+    # 测试套件的执行步骤（方法名），按依赖顺序排列：后面的步骤使用前面步骤创建的数据。
+    # run_test_suite 和 pytest 插件都按这个顺序执行
+    SETUP_STEP: Optional[str] = None  # 准备测试数据，返回False表示失败
+    TEST_STEPS: Tuple[str, ...] = ()
+    CLEANUP_STEP: Optional[str] = None  # 清理本套件创建的数据
+    # 断言了服务器尚未实现的行为的步骤: 方法名 -> 原因，pytest 插件把这些步骤标记为 xfail
+    KNOWN_ISSUES: Dict[str, str] = {}
+
     def __init__(self, base_url: str = "http://localhost:8000/api/v1", auto_cleanup: bool = True):
         self.base_url = base_url
         self.auto_cleanup = auto_cleanup  # 控制是否自动清理测试数据
@@ -21,7 +42,21 @@ class BaseAPITest:
         self.session.headers.update(
             {"Content-Type": "application/json", "Accept": "application/json"}
         )
+        if cassette.active:
+            # 录制/回放模式：所有同步请求经过磁带适配器
+            adapter = CassetteAdapter(cassette)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+        else:
+            # 同一进程内的所有测试套件共享连接池
+            http_pool.mount(self.session)
         self.jwt_token = None  # 存储JWT token
+        self._async_session = None  # 异步后端会话，首次使用时在事件循环中创建
+        self.async_connection_limit = async_http.DEFAULT_CONNECTION_LIMIT  # 异步后端最大并发连接数
+        self.async_client = "aiohttp"  # 异步后端，见 ASYNC_CLIENT_MODULES
+        self.request_count = 0  # 已发送的请求数
+        self.failed_request_count = 0  # 状态码不符合期望的请求数
+        self._count_lock = threading.Lock()  # 多线程并发调用 make_request 时保护计数
 
     def print_test_header(self, title: str):
         """打印测试标题"""
@@ -60,8 +95,16 @@ class BaseAPITest:
         if "Authorization" in self.session.headers:
             del self.session.headers["Authorization"]
 
+    def use_cached_token(self, user_id: int, username: str) -> Optional[str]:
+        """如果缓存中有该用户未过期的token，直接设置并返回（用户名须与token的声明一致）"""
+        token = token_cache.get(self.base_url, user_id, username)
+        if token:
+            self.set_jwt_token(token)
+            self.print_info(f"使用缓存的JWT token (用户ID: {user_id})")
+        return token
+
     def login_and_get_token(self, user_id: int, password: str) -> Optional[str]:
-        """登录并获取JWT token"""
+        """登录并获取JWT token，同时写入token缓存；总是请求服务器，密码错误时返回None"""
         login_data = {"id": user_id, "password": password}
         
         # 临时清除token进行登录
@@ -69,12 +112,12 @@ class BaseAPITest:
         self.clear_jwt_token()
         
         try:
-            response = self.session.post(f"{self.base_url}/login", json=login_data)
+            response = self.session.post(f"{self.base_url}/login", data=codec.dumps(login_data))
             if response.status_code == 200:
-                data = response.json()
-                token = data.get("data", {}).get("token")
+                token = parse_response(response).entity(LoginResult).token
                 if token:
                     self.set_jwt_token(token)
+                    token_cache.put(self.base_url, user_id, token)
                     self.print_success(f"登录成功，获取到JWT token")
                     return token
                 else:
@@ -90,14 +133,49 @@ class BaseAPITest:
         
         return None
 
+    async def login_and_get_token_async(self, user_id: int, password: str) -> Optional[str]:
+        """login_and_get_token 的异步版本"""
+        login_data = {"id": user_id, "password": password}
+
+        # 临时清除token进行登录
+        temp_token = self.jwt_token
+        self.clear_jwt_token()
+
+        try:
+            session = await self._get_async_session()
+            response = await self._async_client_module().send(
+                session, "POST", f"{self.base_url}/login",
+                data=login_data, headers=dict(self.session.headers),
+            )
+            if response.status_code == 200:
+                token = parse_response(response).entity(LoginResult).token
+                if token:
+                    self.set_jwt_token(token)
+                    token_cache.put(self.base_url, user_id, token)
+                    self.print_success(f"登录成功，获取到JWT token")
+                    return token
+                else:
+                    self.print_error("登录响应中未找到token")
+            else:
+                self.print_error(f"登录失败，状态码: {response.status_code}")
+        except Exception as e:
+            self.print_error(f"登录过程中发生异常: {str(e)}")
+        finally:
+            # 如果登录失败，恢复之前的token
+            if not self.jwt_token and temp_token:
+                self.set_jwt_token(temp_token)
+
+        return None
+
     def make_request(
         self,
         method: str,
         endpoint: str,
-        data: Optional[Dict[Any, Any]] = None,
+        data: Union[Dict[Any, Any], bytes, None] = None,
         expected_status: int = 200,
         description: str = "",
         require_auth: bool = True,
+        token: Optional[str] = None,
     ) -> requests.Response:
         """
         发送HTTP请求并处理响应
@@ -105,10 +183,11 @@ class BaseAPITest:
         Args:
             method: HTTP方法 (GET, POST, PUT, DELETE)
             endpoint: API端点
-            data: 请求数据
+            data: 请求数据；bytes 视为已编码的JSON请求体（见 request_template.py），直接发送
             expected_status: 期望的状态码
             description: 请求描述
             require_auth: 是否需要认证（对于register和login设为False）
+            token: 仅本次请求使用的JWT token，不修改会话状态，可在多线程中以不同身份并发请求
 
         Returns:
             requests.Response对象
@@ -116,100 +195,191 @@ class BaseAPITest:
         url = f"{self.base_url}{endpoint}"
 
         # 检查是否需要认证但没有token
-        if require_auth and not self.jwt_token:
+        if require_auth and not (token or self.jwt_token):
             self.print_warning(f"需要认证的请求但未设置JWT token: {method.upper()} {endpoint}")
 
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        # 会话已设置 Content-Type: application/json，请求体由 codec 预先编码
+        body = data if data is None or type(data) is bytes else codec.dumps(data)
+
         try:
+            start = time.perf_counter()
             if method.upper() == "GET":
-                response = self.session.get(url)
+                response = self.session.get(url, headers=headers)
             elif method.upper() == "POST":
-                response = self.session.post(url, json=data)
+                response = self.session.post(url, data=body, headers=headers)
             elif method.upper() == "PUT":
-                response = self.session.put(url, json=data)
+                response = self.session.put(url, data=body, headers=headers)
             elif method.upper() == "DELETE":
-                response = self.session.delete(url)
+                response = self.session.delete(url, headers=headers)
             else:
                 raise ValueError(f"不支持的HTTP方法: {method}")
+            elapsed = time.perf_counter() - start
+            latency_registry.record(method, endpoint, elapsed)
 
-            # 打印请求信息
-            print(f"🌐 {method.upper()} {url}")
-            if data:
-                print(f"📤 请求数据: {json.dumps(data, ensure_ascii=False, indent=2)}")
+            self._report_response(
+                method, endpoint, url, data, response, expected_status, description, elapsed, token
+            )
+            return response
 
-            # 打印响应信息
-            print(f"📈 状态码: {response.status_code}")
+        except requests.exceptions.RequestException as e:
+            with self._count_lock:
+                self.request_count += 1
+                self.failed_request_count += 1
+            latency_registry.record_error(method, endpoint)
+            self.print_error(f"请求异常: {str(e)}")
+            raise
 
-            # 尝试解析JSON响应
-            try:
-                response_data = response.json()
-                print(
-                    f"📥 响应数据: {json.dumps(response_data, ensure_ascii=False, indent=2)}"
-                )
-            except json.JSONDecodeError:
-                print(f"📥 响应数据: {response.text}")
+    def _report_response(
+        self,
+        method: str,
+        endpoint: str,
+        url: str,
+        data: Union[Dict[Any, Any], bytes, None],
+        response,
+        expected_status: int,
+        description: str,
+        elapsed: float,
+        token: Optional[str] = None,
+    ):
+        """检查状态码并把请求事件交给输出层，同步和异步后端共用
 
-            # 检查状态码
-            if response.status_code == expected_status:
-                if description:
-                    self.print_success(f"{description} - 成功")
-                else:
-                    self.print_success("请求成功")
-            else:
-                if description:
-                    self.print_error(
-                        f"{description} - 失败 (期望状态码: {expected_status}, 实际: {response.status_code})"
-                    )
-                else:
-                    self.print_error(
-                        f"请求失败 (期望状态码: {expected_status}, 实际: {response.status_code})"
-                    )
+        这里只组装事件，不做JSON格式化和终端输出，避免拖慢请求路径。
+        """
+        ok = response.status_code == expected_status
+        with self._count_lock:
+            self.request_count += 1
+            if not ok:
+                self.failed_request_count += 1
+        if not ok:
+            latency_registry.record_error(method, endpoint)
 
-            return response
+        route = template_route(endpoint)
+        if ok and method.upper() == "DELETE" and route == "/user/:id":
+            # 用户已删除，其token不再需要缓存
+            token_cache.evict(self.base_url, endpoint.rsplit("/", 1)[-1])
+        elif response.status_code == 401 and expected_status != 401 and (token or self.jwt_token):
+            # 服务器拒绝了当前token（例如缓存的token已失效）
+            token_cache.evict_token(self.base_url, token or self.jwt_token)
 
-        except requests.exceptions.RequestException as e:
+        get_output().emit(
+            {
+                "ts": time.time(),
+                "method": method.upper(),
+                "url": url,
+                "route": route,
+                "request": data,
+                "status": response.status_code,
+                "expected": expected_status,
+                "ok": ok,
+                "latency_ms": round(elapsed * 1000, 3),
+                "description": description,
+                "response": response.content,
+            }
+        )
+
+    def _async_client_module(self):
+        return ASYNC_CLIENT_MODULES[self.async_client]
+
+    async def _get_async_session(self):
+        """获取（必要时创建）异步后端会话"""
+        if self._async_session is None or self._async_session.closed:
+            self._async_session = self._async_client_module().create_session(self.async_connection_limit)
+        return self._async_session
+
+    async def close_async_session(self):
+        """关闭异步后端会话，使用完异步接口后应调用"""
+        if self._async_session is not None:
+            await self._async_session.close()
+            self._async_session = None
+
+    async def make_request_async(
+        self,
+        method: str,
+        endpoint: str,
+        data: Union[Dict[Any, Any], bytes, None] = None,
+        expected_status: int = 200,
+        description: str = "",
+        require_auth: bool = True,
+        token: Optional[str] = None,
+    ) -> BufferedResponse:
+        """
+        make_request 的异步版本，可在同一事件循环中并发大量请求；
+        后端由 self.async_client 选择（aiohttp 或轻量的 raw 客户端）
+
+        参数与状态码检查逻辑和 make_request 完全一致。
+        请求头（包括JWT token）取自发送时刻的 self.session.headers，传入 token 时以其为准。
+
+        Returns:
+            BufferedResponse对象
+        """
+        url = f"{self.base_url}{endpoint}"
+
+        if require_auth and not (token or self.jwt_token):
+            self.print_warning(f"需要认证的请求但未设置JWT token: {method.upper()} {endpoint}")
+
+        if method.upper() not in ("GET", "POST", "PUT", "DELETE"):
+            raise ValueError(f"不支持的HTTP方法: {method}")
+
+        body = data if method.upper() in ("POST", "PUT") else None
+        headers = dict(self.session.headers)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        try:
+            start = time.perf_counter()
+            if cassette.replaying:
+                response = cassette.buffered_response(method, url, body)
+            else:
+                session = await self._get_async_session()
+                response = await self._async_client_module().send(
+                    session, method.upper(), url, data=body, headers=headers
+                )
+                if cassette.active:
+                    cassette.record(
+                        method, url, body, response.status_code,
+                        response.headers.get("Content-Type"), response.content,
+                    )
+            elapsed = time.perf_counter() - start
+            latency_registry.record(method, endpoint, elapsed)
+        except (ConnectionError, requests.exceptions.ConnectionError) as e:
+            with self._count_lock:
+                self.request_count += 1
+                self.failed_request_count += 1
+            latency_registry.record_error(method, endpoint)
             self.print_error(f"请求异常: {str(e)}")
             raise
 
+        self._report_response(
+            method, endpoint, url, data, response, expected_status, description, elapsed, token
+        )
+        return response
+
     def check_server_status(self) -> bool:
-        """检查服务器是否运行"""
-        try:
-            # 使用register endpoint检查服务器状态，因为它不需要认证
-            response = self.session.post(f"{self.base_url}/register", 
-                                       json={"username": "test_connection"}, 
-                                       timeout=5)
-            # 任何响应都表明服务器在运行，即使是错误响应
-            return True
-        except requests.exceptions.RequestException:
-            return False
+        """检查服务器是否就绪（每个进程只探测一次，见 readiness.py）"""
+        if cassette.replaying:
+            return True  # 回放时不访问网络
+        return readiness_probe.wait_until_ready(self.base_url)
 
     def extract_id_from_response(self, response: requests.Response) -> Optional[int]:
-        """从响应中提取ID"""
+        """从响应中提取 data.id（响应体只解析一次，见 schema.parse_response）"""
         try:
-            data = response.json()
-            if "data" in data:
-                # 尝试多种可能的ID字段名
-                for id_field in ["id", "ID", "Id"]:
-                    if id_field in data["data"]:
-                        return data["data"][id_field]
-        except (json.JSONDecodeError, KeyError):
-            pass
-        return None
+            return parse_response(response).id
+        except SchemaError:
+            return None
 
     def assert_response_success(self, response: requests.Response, message: str = ""):
-        """断言响应成功"""
+        """断言响应成功（code 为 CodeSuccess）"""
         try:
-            data = response.json()
-            if data.get("code") == 0:  # 假设0表示成功
-                self.print_success(message or "响应成功")
-                return True
-            else:
-                self.print_error(
-                    f"{message or '响应失败'}: {data.get('msg', '未知错误')}"
-                )
-                return False
-        except json.JSONDecodeError:
-            self.print_error(f"{message or '响应失败'}: 无法解析JSON响应")
+            envelope = parse_response(response)
+        except SchemaError as e:
+            self.print_error(f"{message or '响应失败'}: {e}")
             return False
+        if envelope.ok:
+            self.print_success(message or "响应成功")
+            return True
+        self.print_error(f"{message or '响应失败'}: {envelope.msg or '未知错误'}")
+        return False
 
     def run_cleanup_tests(self):
         """运行清理测试 - 子类可以选择实现"""
@@ -0,0 +1,230 @@
+"""
+基准结果库
+每次运行把各接口的延迟分位数、吞吐量和错误数写入本地SQLite文件，并标记git提交和主机名；
+--compare-baseline 时与同一主机、同一运行模式、同一目标的历史结果比较，发现性能回退。
+"""
+
+import socket
+import sqlite3
+import statistics
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+from colorama import Fore, Style
+
+from .defaults import DEFAULT_DB_PATH, DEFAULT_THRESHOLD, PROJECT_DIR
+from .metrics import LatencyRegistry
+
+
+# 基线取最近几次运行各项指标的中位数，减少单次运行的抖动
+BASELINE_WINDOW = 5
+
+# 请求数少于该值的接口分位数不稳定，不参与比较
+MIN_SAMPLES = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    git_commit TEXT,
+    host TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    target TEXT NOT NULL,
+    elapsed REAL NOT NULL,
+    success INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS route_stats (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    route TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    p50_ms REAL NOT NULL,
+    p90_ms REAL NOT NULL,
+    p95_ms REAL NOT NULL,
+    p99_ms REAL NOT NULL,
+    max_ms REAL NOT NULL,
+    throughput REAL NOT NULL,
+    PRIMARY KEY (run_id, route)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_lookup ON runs (host, mode, target, id);
+"""
+
+
+def git_commit() -> Optional[str]:
+    """当前代码的git提交（有未提交修改时带 -dirty 后缀）"""
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=PROJECT_DIR,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def route_stats(registry: LatencyRegistry, elapsed: float) -> Dict[str, dict]:
+    """从延迟注册表生成每个接口的统计，吞吐量按本次运行的墙钟时长计算"""
+    stats = registry.summary()
+    for entry in stats.values():
+        entry["throughput"] = entry["count"] / elapsed if elapsed > 0 else 0.0
+    return stats
+
+
+class BaselineStore:
+    """SQLite 基准结果库"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, mode: str, target: str, elapsed: float, success: bool, stats: Dict[str, dict]) -> int:
+        """写入一次运行的结果，返回运行ID"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (created_at, git_commit, host, mode, target, elapsed, success) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), git_commit(), socket.gethostname(), mode, target, elapsed, int(success)),
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO route_stats (run_id, route, count, errors, p50_ms, p90_ms, p95_ms, "
+                "p99_ms, max_ms, throughput) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id, route, s["count"], s["errors"], s["p50_ms"], s["p90_ms"],
+                        s["p95_ms"], s["p99_ms"], s["max_ms"], s["throughput"],
+                    )
+                    for route, s in stats.items()
+                ],
+            )
+        return run_id
+
+    def baseline(self, mode: str, target: str, window: int = BASELINE_WINDOW) -> Dict[str, dict]:
+        """同一主机、模式和目标最近 window 次成功运行中，每个接口 p95 和吞吐量的中位数"""
+        run_ids = [
+            row["id"]
+            for row in self.conn.execute(
+                "SELECT id FROM runs WHERE host = ? AND mode = ? AND target = ? AND success = 1 "
+                "ORDER BY id DESC LIMIT ?",
+                (socket.gethostname(), mode, target, window),
+            )
+        ]
+        if not run_ids:
+            return {}
+
+        samples: Dict[str, Dict[str, List[float]]] = {}
+        placeholders = ",".join("?" * len(run_ids))
+        for row in self.conn.execute(
+            f"SELECT route, count, p95_ms, throughput FROM route_stats WHERE run_id IN ({placeholders})",
+            run_ids,
+        ):
+            if row["count"] < MIN_SAMPLES:
+                continue
+            route = samples.setdefault(row["route"], {"p95_ms": [], "throughput": []})
+            route["p95_ms"].append(row["p95_ms"])
+            route["throughput"].append(row["throughput"])
+
+        return {
+            route: {
+                "runs": len(values["p95_ms"]),
+                "p95_ms": statistics.median(values["p95_ms"]),
+                "throughput": statistics.median(values["throughput"]),
+            }
+            for route, values in samples.items()
+        }
+
+
+def find_regressions(current: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[dict]:
+    """比较本次结果和基线，返回所有接口的比较结果（regressed 标记是否回退）"""
+    rows = []
+    for route, base in sorted(baseline.items()):
+        now = current.get(route)
+        if not now or now["count"] < MIN_SAMPLES:
+            continue
+        p95_change = now["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        throughput_change = now["throughput"] / base["throughput"] - 1 if base["throughput"] else 0.0
+        rows.append(
+            {
+                "route": route,
+                "base_p95_ms": base["p95_ms"],
+                "p95_ms": now["p95_ms"],
+                "p95_change": p95_change,
+                "base_throughput": base["throughput"],
+                "throughput": now["throughput"],
+                "throughput_change": throughput_change,
+                "regressed": p95_change > threshold or throughput_change < -threshold,
+            }
+        )
+    return rows
+
+
+def print_comparison(rows: List[dict], threshold: float):
+    """打印与基线的比较结果"""
+    print(f"\n{Fore.CYAN}📉 基线比较 (回退阈值: {threshold:.1%}){Style.RESET_ALL}")
+    print(f"  {'接口':<24}{'p95 基线':>10}{'p95 本次':>10}{'变化':>9}{'吞吐 基线':>10}{'吞吐 本次':>10}{'变化':>9}")
+    for row in rows:
+        color = Fore.RED if row["regressed"] else Fore.GREEN
+        print(
+            f"  {color}{row['route']:<26}{Style.RESET_ALL}"
+            f"{row['base_p95_ms']:>12.1f}{row['p95_ms']:>12.1f}{row['p95_change']:>+11.1%}"
+            f"{row['base_throughput']:>12.1f}{row['throughput']:>12.1f}{row['throughput_change']:>+11.1%}"
+        )
+
+
+def record_and_compare(
+    registry: LatencyRegistry,
+    mode: str,
+    target: str,
+    elapsed: float,
+    success: bool,
+    compare: bool = False,
+    threshold: float = DEFAULT_THRESHOLD,
+    path: str = DEFAULT_DB_PATH,
+) -> bool:
+    """记录本次运行结果；compare 为True时先与历史基线比较
+
+    Returns:
+        没有接口回退时返回True（未比较时总是True）
+    """
+    stats = route_stats(registry, elapsed)
+    if not stats:
+        return True
+
+    try:
+        store = BaselineStore(path)
+    except sqlite3.Error as e:
+        print(f"{Fore.YELLOW}⚠️  无法打开基准结果库 {path}: {str(e)}{Style.RESET_ALL}")
+        return not compare
+
+    passed = True
+    try:
+        if compare:
+            baseline = store.baseline(mode, target)
+            if not baseline:
+                print(f"{Fore.YELLOW}⚠️  没有可比较的基线，本次结果将作为基线{Style.RESET_ALL}")
+            else:
+                rows = find_regressions(stats, baseline, threshold)
+                print_comparison(rows, threshold)
+                regressed = [row["route"] for row in rows if row["regressed"]]
+                if regressed:
+                    passed = False
+                    print(f"{Fore.RED}❌ 性能回退: {', '.join(regressed)}{Style.RESET_ALL}")
+                else:
+                    print(f"{Fore.GREEN}✅ 没有接口超过回退阈值{Style.RESET_ALL}")
+        # 失败或未通过回退检查的运行不参与之后的基线
+        run_id = store.record_run(mode, target, elapsed, success and passed, stats)
+        print(f"{Fore.BLUE}ℹ️  基准结果已记录 (运行ID: {run_id}, 结果库: {path}){Style.RESET_ALL}")
+    except sqlite3.Error as e:
+        print(f"{Fore.YELLOW}⚠️  写入基准结果库失败: {str(e)}{Style.RESET_ALL}")
+    finally:
+        store.close()
+    return passed
@@ -0,0 +1,272 @@
+"""
+请求录制/回放（磁带）
+录制模式把 requests.Session 发出的每个请求和响应写入压缩的磁带文件，
+回放模式直接从磁带返回响应，不访问网络，可以在毫秒级重跑整个测试套件。
+
+磁带按 "方法 路由模板 请求哈希" 建立索引。服务器分配的ID（用户、文章、评论）
+每次运行都不同，计算哈希前会把请求路径和请求体中的ID替换为它在本次运行中
+首次出现的序号，因此录制时的ID和回放时的ID可以一一对应。
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from colorama import Fore, Style
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .response import BufferedResponse
+
+
+CASSETTE_MODES = ("record", "replay")
+CASSETTE_VERSION = 1
+
+# 请求体和响应中表示服务器分配ID的字段（与 extract_id_from_response 读取的字段一致）
+ID_FIELDS = {"id", "ID", "Id", "user_id", "post_id"}
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """回放时磁带中没有匹配的记录"""
+
+
+class IdMap:
+    """把服务器分配的ID映射为首次出现的序号"""
+
+    def __init__(self):
+        self._ordinals: Dict[int, int] = {}
+
+    def learn(self, value):
+        if isinstance(value, int) and not isinstance(value, bool) and value not in self._ordinals:
+            self._ordinals[value] = len(self._ordinals) + 1
+
+    def learn_response(self, node):
+        """从响应JSON中登记所有ID字段"""
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in ID_FIELDS:
+                    self.learn(value)
+                else:
+                    self.learn_response(value)
+        elif isinstance(node, list):
+            for item in node:
+                self.learn_response(item)
+
+    def normalize(self, value):
+        """已登记的ID替换为 "#序号"，其他值（不存在的ID、非法ID）保持原样"""
+        if isinstance(value, int) and value in self._ordinals:
+            return f"#{self._ordinals[value]}"
+        return value
+
+    def normalize_path(self, path: str) -> str:
+        return "/".join(
+            str(self.normalize(int(s))) if s.isdigit() else s for s in path.split("/")
+        )
+
+    def normalize_body(self, node):
+        if isinstance(node, dict):
+            return {
+                key: self.normalize(value) if key in ID_FIELDS else self.normalize_body(value)
+                for key, value in node.items()
+            }
+        if isinstance(node, list):
+            return [self.normalize_body(item) for item in node]
+        return node
+
+
+def _route(path: str) -> str:
+    return "/".join(":id" if s.isdigit() else s for s in path.split("/"))
+
+
+def _parse_body(body):
+    """请求体统一解析为JSON对象，无法解析时保留原始文本"""
+    if body is None or isinstance(body, (dict, list)):
+        return body
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body
+
+
+class Cassette:
+    """进程内的磁带，线程安全"""
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.path: Optional[str] = None
+        self._lock = threading.Lock()
+        self._ids = IdMap()
+        self._entries = []
+        self._by_key: Dict[str, deque] = {}
+        self._by_route: Dict[str, deque] = {}
+        self._used = set()
+        self.replayed = 0
+        self.fallbacks = 0
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not None
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def start(self, mode: str, path: str):
+        """进入录制或回放模式"""
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"不支持的磁带模式: {mode}")
+        if mode == "replay":
+            self.path = path
+            self._load()
+        else:
+            # 磁带在运行结束时才写出，开始前先确认路径可写，避免跑完整个套件后才失败
+            existed = os.path.exists(path)
+            with open(path, "ab"):
+                pass
+            if not existed:
+                os.remove(path)
+            self.path = path
+        self.mode = mode
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"不支持的磁带版本: {data.get('version')}")
+        self._entries = data["entries"]
+        for index, entry in enumerate(self._entries):
+            self._by_key.setdefault(entry["key"], deque()).append(index)
+            self._by_route.setdefault(entry["key"].rsplit(" ", 1)[0], deque()).append(index)
+
+    def _key(self, method: str, url: str, body) -> str:
+        """计算索引键，必须在登记本次响应中的ID之前调用"""
+        path = urlsplit(url).path
+        canonical = json.dumps(
+            [self._ids.normalize_path(path), self._ids.normalize_body(_parse_body(body))],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        digest = hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+        return f"{method.upper()} {_route(path)} {digest}"
+
+    def _learn(self, content: bytes):
+        try:
+            self._ids.learn_response(json.loads(content))
+        except ValueError:
+            pass
+
+    def record(self, method: str, url: str, body, status: int, content_type: Optional[str], content: bytes):
+        """录制一次请求和响应"""
+        with self._lock:
+            key = self._key(method, url, body)
+            self._entries.append(
+                {
+                    "key": key,
+                    "status": status,
+                    "content_type": content_type,
+                    "body": content.decode("utf-8", errors="replace"),
+                }
+            )
+            self._learn(content)
+
+    def lookup(self, method: str, url: str, body) -> dict:
+        """按录制顺序取出匹配的记录
+
+        请求哈希不匹配时（例如测试代码修改了请求体）退回到同一路由上下一条未使用的记录。
+        """
+        with self._lock:
+            key = self._key(method, url, body)
+            index = self._next(self._by_key.get(key))
+            if index is None:
+                index = self._next(self._by_route.get(key.rsplit(" ", 1)[0]))
+                if index is None:
+                    raise CassetteMiss(f"回放磁带中没有匹配的记录: {method.upper()} {url}")
+                self.fallbacks += 1
+            self._used.add(index)
+            self.replayed += 1
+
+            entry = self._entries[index]
+            content = entry["body"].encode("utf-8")
+            self._learn(content)
+            return {"status": entry["status"], "content_type": entry["content_type"], "content": content}
+
+    def _next(self, indices: Optional[deque]) -> Optional[int]:
+        while indices:
+            index = indices.popleft()
+            if index not in self._used:
+                return index
+        return None
+
+    def buffered_response(self, method: str, url: str, body) -> BufferedResponse:
+        """回放为 BufferedResponse（异步后端使用）"""
+        entry = self.lookup(method, url, body)
+        headers = {"Content-Type": entry["content_type"]} if entry["content_type"] else {}
+        return BufferedResponse(entry["status"], entry["content"], headers=headers, url=url)
+
+    def save(self) -> Optional[int]:
+        """写出录制的磁带，返回记录条数；写入失败时打印错误并返回None"""
+        if self.mode != "record":
+            return 0
+        with self._lock:
+            try:
+                with gzip.open(self.path, "wt", encoding="utf-8") as f:
+                    json.dump(
+                        {"version": CASSETTE_VERSION, "entries": self._entries},
+                        f,
+                        ensure_ascii=False,
+                        separators=(",", ":"),
+                    )
+            except OSError as e:
+                print(f"{Fore.RED}❌ 无法写入磁带文件: {str(e)}{Style.RESET_ALL}")
+                return None
+            return len(self._entries)
+
+
+class CassetteAdapter(HTTPAdapter):
+    """挂载到 requests.Session 上的传输适配器
+
+    make_request 和 login_and_get_token 都经过 Session 发送请求，
+    在适配器层录制/回放可以覆盖所有同步请求。
+    """
+
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        if self.cassette.replaying:
+            entry = self.cassette.lookup(request.method, request.url, request.body)
+            response = requests.Response()
+            response.status_code = entry["status"]
+            response._content = entry["content"]
+            response.headers = CaseInsensitiveDict(
+                {"Content-Type": entry["content_type"]} if entry["content_type"] else {}
+            )
+            response.encoding = "utf-8"
+            response.url = request.url
+            response.request = request
+            response.connection = self
+            return response
+
+        response = super().send(request, **kwargs)
+        self.cassette.record(
+            request.method,
+            request.url,
+            request.body,
+            response.status_code,
+            response.headers.get("Content-Type"),
+            response.content,
+        )
+        return response
+
+
+# 进程内共享的磁带实例
+cassette = Cassette()
@@ -0,0 +1,120 @@
+"""
+JSON编解码
+按 orjson → msgspec → 标准库 json 的顺序选用已安装的实现，请求编码、响应解码和报告输出共用：
+
+- dumps(obj):        紧凑的UTF-8字节串，中文等非ASCII字符原样输出（等价于 ensure_ascii=False）
+- loads(data):       接受 bytes 或 str，输入不是合法JSON时抛出 ValueError
+- dumps_pretty(obj): 2空格缩进的字符串，用于详细输出和测试报告
+
+三种实现的输出只有空白上的差异，服务器和录制文件（按解析后的请求体匹配）都不受影响。
+orjson / msgspec 为可选依赖，安装方式: uv pip install orjson（或 msgspec）
+环境变量 BLOG_API_JSON_CODEC（run_tests.py --json-codec）可以指定实现，子进程继承同一设置；
+环境变量指定的实现不可用时退回自动选择并警告，命令行的 --json-codec 指定不可用的实现时报错退出。
+调用方通过模块属性使用（from . import codec; codec.dumps(...)），use() 切换实现后立即生效。
+"""
+
+import importlib.util
+import json
+import os
+import sys
+from typing import Any, Callable, List, Optional
+
+# 自动选择时的优先顺序
+CODECS = ("orjson", "msgspec", "json")
+
+CODEC_ENV = "BLOG_API_JSON_CODEC"
+
+# 当前使用的实现名称，由 use() 设置
+name = "json"
+
+
+def _json_dumps(obj: Any, default: Optional[Callable] = None) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default).encode("utf-8")
+
+
+def _json_dumps_pretty(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+dumps = _json_dumps
+loads = json.loads
+dumps_pretty = _json_dumps_pretty
+
+
+def _load_orjson():
+    import orjson
+
+    # 与标准库一致，允许 int 等非字符串的键
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any, default: Optional[Callable] = None) -> bytes:
+        return orjson.dumps(obj, default=default, option=options)
+
+    def dumps_pretty(obj: Any) -> str:
+        return orjson.dumps(obj, option=options | orjson.OPT_INDENT_2).decode("utf-8")
+
+    # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+    return dumps, orjson.loads, dumps_pretty
+
+
+def _load_msgspec():
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj: Any, default: Optional[Callable] = None) -> bytes:
+        if default is None:
+            return encoder.encode(obj)
+        return msgspec.json.encode(obj, enc_hook=default)
+
+    def loads(data):
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps_pretty(obj: Any) -> str:
+        return msgspec.json.format(encoder.encode(obj), indent=2).decode("utf-8")
+
+    return dumps, loads, dumps_pretty
+
+
+_LOADERS = {
+    "orjson": _load_orjson,
+    "msgspec": _load_msgspec,
+    "json": lambda: (_json_dumps, json.loads, _json_dumps_pretty),
+}
+
+
+def available() -> List[str]:
+    """已安装的实现，按优先顺序排列（不会导入它们）"""
+    return [codec for codec in CODECS if codec == "json" or importlib.util.find_spec(codec) is not None]
+
+
+def use(codec: str = "auto") -> str:
+    """切换实现，auto 表示选用第一个已安装的实现；返回实际使用的实现名称"""
+    global name, dumps, loads, dumps_pretty
+    if codec == "auto":
+        codec = available()[0]
+    if codec not in _LOADERS:
+        raise ValueError(f"未知的JSON实现: {codec}（可选: auto, {', '.join(CODECS)}）")
+    try:
+        dumps, loads, dumps_pretty = _LOADERS[codec]()
+    except ImportError:
+        raise RuntimeError(f"JSON实现 {codec} 未安装，请运行: uv pip install {codec}")
+    name = codec
+    return name
+
+
+def _use_from_env():
+    """按环境变量选择实现；变量中的实现不可用时（例如遗留的导出设置）退回 auto，导入本模块不会失败"""
+    codec = os.environ.get(CODEC_ENV, "auto")
+    try:
+        use(codec)
+    except (ValueError, RuntimeError) as e:
+        print(f"⚠️  环境变量 {CODEC_ENV}={codec} 不可用，改为自动选择: {str(e)}", file=sys.stderr)
+        use("auto")
+
+
+_use_from_env()
@@ -0,0 +1,57 @@
+"""
+命令行默认值
+run_tests.py 构建参数解析器时只导入这个模块（仅依赖标准库），
+各测试模块（以及它们依赖的 requests/aiohttp）在选定运行模式后才导入。
+"""
+
+import os
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---- 登录/注册风暴 (auth_storm) ----
+DEFAULT_LEVELS = (1, 2, 4, 8, 16, 32, 64)
+DEFAULT_STEP_SECONDS = 10
+
+# ---- 请求体大小扫描 (payload_sweep) ----
+# 100B 到 10MB，按 1-3-10 递增
+DEFAULT_SIZES = (
+    100, 300, 1_000, 3_000, 10_000, 30_000, 100_000, 300_000, 1_000_000, 3_000_000, 10_000_000,
+)
+# 每个大小、每个接口的请求次数
+DEFAULT_REPEATS = 5
+
+# ---- 长稳测试 (soak) ----
+# 默认采样间隔（秒）
+DEFAULT_SAMPLE_INTERVAL = 60
+
+# ---- 开环压测 (open_loop) ----
+# 可选的压测目标: 目标名 -> (路由模板, 说明)
+OPEN_LOOP_TARGETS = {
+    "get_post": ("/post/{post_id}", "获取文章"),
+    "get_user": ("/user/{user_id}", "获取用户"),
+    "get_comment": ("/comment/{comment_id}", "获取评论"),
+}
+# 默认的最大在途请求数，达到上限时新请求被丢弃并计数
+DEFAULT_MAX_IN_FLIGHT = 1000
+# 异步HTTP客户端: aiohttp（async_http）或基于asyncio streams的轻量客户端（raw_http）
+ASYNC_CLIENTS = ("aiohttp", "raw")
+DEFAULT_ASYNC_CLIENT = "aiohttp"
+
+# ---- 声明式场景 (scenario) ----
+# --scenario 只给名称时在这里查找场景文件
+SCENARIO_DIR = os.path.join(PROJECT_DIR, "tests", "scenarios")
+
+# ---- 基准结果库 (baseline) ----
+# 默认结果库位于项目根目录（*.sqlite 已加入 .gitignore）
+DEFAULT_DB_PATH = os.path.join(PROJECT_DIR, "benchmark_results.sqlite")
+# 默认回退阈值：p95 延迟升高或吞吐量下降超过 20% 视为回退
+DEFAULT_THRESHOLD = 0.2
+
+# ---- HTTP连接池 (http_pool) ----
+# 每个主机保留的连接数，与 requests 的默认值相同
+DEFAULT_POOL_SIZE = 10
+
+# ---- 服务器就绪检查 (readiness) ----
+# 等待服务器就绪的最长时间（秒）
+DEFAULT_READY_TIMEOUT = 5
@@ -0,0 +1,616 @@
+"""
+博客API的进程内替身服务器
+实现与 main.go 相同的 /api/v1 路由、api.go 中的 Resp{code,msg,data} 响应格式，
+以及与 middleware.JWTAuth 一致的JWT认证语义，数据保存在内存字典中。
+
+用于不依赖Go服务器和MySQL容器的快速测试，也可以单独衡量测试工具自身的开销:
+    python -m tests.fake_server --port 8000
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+
+# 与 api/user.go、middleware/middleware.go 中一致的签名密钥
+JWT_SECRET = b"mock secrect key"
+# 与 Login 接口一致的 token 有效期
+TOKEN_TTL = 24 * 3600
+
+CODE_SUCCESS = 0
+CODE_FAILED = 1
+
+# 带唯一索引的字符串字段在MySQL中为 varchar(191)
+MAX_INDEXED_STRING = 191
+
+# go-playground/validator 的 email 校验的简化版本
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+ZERO_TIME = "0001-01-01T00:00:00Z"
+
+
+class APIError(Exception):
+    """处理请求时返回的错误响应"""
+
+    def __init__(self, status: int, msg: str):
+        super().__init__(msg)
+        self.status = status
+        self.msg = msg
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def sign_token(user_id: int, username: str, now: Optional[float] = None) -> str:
+    """生成HS256签名的JWT，声明与 UserAPI.Login 相同"""
+    now = int(now if now is not None else time.time())
+    header = {"alg": "HS256", "typ": "JWT"}
+    claims = {"exp": now + TOKEN_TTL, "iat": now, "id": user_id, "username": username}
+    signing_input = (
+        _b64url(json.dumps(header, separators=(",", ":")).encode())
+        + "."
+        + _b64url(json.dumps(claims, separators=(",", ":"), ensure_ascii=False).encode())
+    )
+    signature = hmac.new(JWT_SECRET, signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64url(signature)}"
+
+
+def verify_token(auth_header: str) -> dict:
+    """按 middleware.JWTAuth 的规则校验 Authorization 头，返回JWT声明"""
+    if not auth_header:
+        raise APIError(401, "Authorization header is required")
+
+    parts = auth_header.split(" ")
+    if len(parts) != 2 or parts[0] != "Bearer":
+        raise APIError(401, "Invalid authorization header format")
+
+    segments = parts[1].split(".")
+    if len(segments) != 3:
+        raise APIError(401, "Invalid token: token contains an invalid number of segments")
+    try:
+        header = json.loads(_b64url_decode(segments[0]))
+        claims = json.loads(_b64url_decode(segments[1]))
+        signature = _b64url_decode(segments[2])
+    except (ValueError, UnicodeDecodeError):
+        raise APIError(401, "Invalid token: illegal base64 data")
+
+    if header.get("alg") != "HS256":
+        raise APIError(401, f"Invalid token: unexpected signing method: {header.get('alg')}")
+    expected = hmac.new(
+        JWT_SECRET, f"{segments[0]}.{segments[1]}".encode(), hashlib.sha256
+    ).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise APIError(401, "Invalid token: signature is invalid")
+
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)) and time.time() > exp:
+        raise APIError(401, "Invalid token: Token is expired")
+    return claims
+
+
+def hash_password(password: str) -> str:
+    """密码摘要（替身服务器不模拟bcrypt的计算开销）"""
+    salt = os.urandom(8).hex()
+    digest = hashlib.sha256(f"{salt}:{password}".encode()).hexdigest()
+    return f"$fake${salt}${digest}"
+
+
+def check_password(hashed: str, password: str) -> bool:
+    try:
+        _, _, salt, digest = hashed.split("$")
+    except ValueError:
+        return False
+    return hmac.compare_digest(
+        digest, hashlib.sha256(f"{salt}:{password}".encode()).hexdigest()
+    )
+
+
+def _now() -> str:
+    """与Go time.Time的JSON格式一致的本地时间"""
+    return datetime.now().astimezone().isoformat()
+
+
+def _common(record: Optional[dict] = None) -> dict:
+    """CommonModel 字段"""
+    if record is None:
+        return {"id": 0, "created_at": ZERO_TIME, "updated_at": ZERO_TIME, "deleted_at": None}
+    return {
+        "id": record["id"],
+        "created_at": record["created_at"],
+        "updated_at": record["updated_at"],
+        "deleted_at": record["deleted_at"],
+    }
+
+
+def _omit_empty(data: dict, fields) -> dict:
+    """模拟 json:",omitempty"：零值字段不输出"""
+    for field in fields:
+        if not data.get(field):
+            data.pop(field, None)
+    return data
+
+
+class FakeBlogStore:
+    """内存数据存储，语义对应 service 包中基于GORM的实现（软删除、外键约束等）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables = {"users": {}, "posts": {}, "comments": {}}
+        self.next_ids = {"users": 1, "posts": 1, "comments": 1}
+
+    def _insert(self, table: str, fields: dict) -> dict:
+        now = _now()
+        record = {
+            "id": self.next_ids[table],
+            "created_at": now,
+            "updated_at": now,
+            "deleted_at": None,
+        }
+        record.update(fields)
+        self.tables[table][record["id"]] = record
+        self.next_ids[table] += 1
+        return record
+
+    def get(self, table: str, record_id: int) -> Optional[dict]:
+        """对应 db.First：软删除的记录查不到"""
+        record = self.tables[table].get(record_id)
+        if record is None or record["deleted_at"] is not None:
+            return None
+        return record
+
+    def delete(self, table: str, record_id: int):
+        """对应 db.Delete：软删除，记录不存在时也不报错"""
+        record = self.tables[table].get(record_id)
+        if record is not None and record["deleted_at"] is None:
+            record["deleted_at"] = _now()
+
+    def update(self, table: str, record_id: int, fields: dict) -> Optional[dict]:
+        """对应 db.Model(&u).Updates(u) 后再 First：只更新非零值字段"""
+        record = self.get(table, record_id)
+        if record is None:
+            return None
+        changes = {k: v for k, v in fields.items() if v}
+        if changes:
+            record.update(changes)
+            record["updated_at"] = _now()
+        return record
+
+    def _check_unique(self, field: str, value: str, exclude_id: int = 0):
+        # 唯一索引对软删除的记录同样生效
+        for record in self.tables["users"].values():
+            if record[field] == value and record["id"] != exclude_id:
+                raise APIError(
+                    400, f"Error 1062 (23000): Duplicate entry '{value}' for key 'users.uni_users_{field}'"
+                )
+
+    def _check_length(self, field: str, value: str):
+        if len(value) > MAX_INDEXED_STRING:
+            raise APIError(400, f"Error 1406 (22001): Data too long for column '{field}' at row 1")
+
+    def _check_foreign_key(self, table: str, record_id: int, constraint: str):
+        # 外键只检查记录是否存在，软删除的记录仍然满足约束
+        if record_id not in self.tables[table]:
+            raise APIError(
+                400,
+                "Error 1452 (23000): Cannot add or update a child row: "
+                f"a foreign key constraint fails (`{constraint}`)",
+            )
+
+    def create_user(self, username: str, password: str, email: str) -> dict:
+        with self.lock:
+            self._check_length("username", username)
+            self._check_length("email", email)
+            self._check_unique("username", username)
+            self._check_unique("email", email)
+            return self._insert(
+                "users",
+                {"username": username, "password": hash_password(password), "email": email},
+            )
+
+    def update_user(self, user_id: int, username: str, password: str, email: str) -> Optional[dict]:
+        with self.lock:
+            if username:
+                self._check_length("username", username)
+                self._check_unique("username", username, exclude_id=user_id)
+            if email:
+                self._check_length("email", email)
+                self._check_unique("email", email, exclude_id=user_id)
+            fields = {"username": username, "email": email}
+            if password:
+                fields["password"] = hash_password(password)
+            return self.update("users", user_id, fields)
+
+    def create_post(self, title: str, content: str, user_id: int) -> dict:
+        with self.lock:
+            self._check_foreign_key("users", user_id, "fk_posts_user")
+            return self._insert("posts", {"title": title, "content": content, "user_id": user_id})
+
+    def create_comment(self, content: str, user_id: int, post_id: int) -> dict:
+        with self.lock:
+            self._check_foreign_key("users", user_id, "fk_comments_user")
+            self._check_foreign_key("posts", post_id, "fk_comments_post")
+            return self._insert(
+                "comments", {"content": content, "user_id": user_id, "post_id": post_id}
+            )
+
+
+def user_json(record: Optional[dict], user_id: int = 0) -> dict:
+    """model.User 的JSON表示"""
+    data = _common(record)
+    if record is None:
+        data["id"] = user_id
+        return data
+    data.update(
+        {"username": record["username"], "password": record["password"], "email": record["email"]}
+    )
+    return _omit_empty(data, ("username", "password", "email"))
+
+
+def post_json(record: Optional[dict], post_id: int = 0) -> dict:
+    """model.Post 的JSON表示（未预加载关联的 User）"""
+    data = _common(record)
+    if record is None:
+        data["id"] = post_id
+    else:
+        data.update(
+            {"title": record["title"], "content": record["content"], "user_id": record["user_id"]}
+        )
+        _omit_empty(data, ("title", "content", "user_id"))
+    data["user"] = user_json(None)
+    return data
+
+
+def comment_json(record: Optional[dict], comment_id: int = 0) -> dict:
+    """model.Comment 的JSON表示（未预加载关联的 User / Post）"""
+    data = _common(record)
+    if record is None:
+        data["id"] = comment_id
+        data["user"] = user_json(None)
+        data["post"] = post_json(None)
+        return data
+    data.update({"content": record["content"], "user_id": record["user_id"]})
+    _omit_empty(data, ("content", "user_id"))
+    data["user"] = user_json(None)
+    if record["post_id"]:
+        data["post_id"] = record["post_id"]
+    data["post"] = post_json(None)
+    return data
+
+
+def _bind(body: dict, fields: dict, required=()) -> dict:
+    """模拟 ShouldBindJSON：类型检查 + binding:"required" 校验"""
+    values = {}
+    for name, kind in fields.items():
+        value = body.get(name)
+        if value is None:
+            value = "" if kind is str else 0
+        if kind is int:
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0 or value != int(value):
+                raise APIError(
+                    400, f"json: cannot unmarshal {type(value).__name__} into Go struct field .{name} of type uint"
+                )
+            value = int(value)
+        elif not isinstance(value, str):
+            raise APIError(
+                400, f"json: cannot unmarshal {type(value).__name__} into Go struct field .{name} of type string"
+            )
+        values[name] = value
+
+    for name in required:
+        if not values[name]:
+            raise APIError(
+                400, f"Key: '{name}' Error:Field validation for '{name}' failed on the 'required' tag"
+            )
+    return values
+
+
+def _validate_email(values: dict, status: int = 400):
+    """model.User.Email 的 binding:"email" 校验"""
+    if not EMAIL_RE.match(values["email"]):
+        raise APIError(
+            status, "Key: 'User.Email' Error:Field validation for 'Email' failed on the 'email' tag"
+        )
+
+
+class FakeBlogHandler(BaseHTTPRequestHandler):
+    """路由与 main.go 保持一致"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeBlogAPI/1.0"
+    # 响应头和响应体分两次写出，关闭 Nagle 以免与客户端的延迟ACK叠加出约40ms的等待
+    disable_nagle_algorithm = True
+    prefix = "/api/v1"
+
+    # (方法, 路由) -> (处理函数名, 是否需要JWT认证)
+    routes = {
+        ("GET", "/health"): ("health", False),
+        ("POST", "/register"): ("register", False),
+        ("POST", "/login"): ("login", False),
+        ("GET", "/user/:id"): ("get_user", True),
+        ("DELETE", "/user/:id"): ("delete_user", True),
+        ("PUT", "/user"): ("update_user", True),
+        ("POST", "/post"): ("create_post", True),
+        ("DELETE", "/post/:id"): ("delete_post", True),
+        ("PUT", "/post"): ("update_post", True),
+        ("GET", "/post/:id"): ("get_post", True),
+        ("POST", "/comment"): ("create_comment", True),
+        ("DELETE", "/comment/:id"): ("delete_comment", True),
+        ("PUT", "/comment"): ("update_comment", True),
+        ("GET", "/comment/:id"): ("get_comment", True),
+    }
+
+    @property
+    def store(self) -> FakeBlogStore:
+        return self.server.store
+
+    def log_message(self, format, *args):
+        if getattr(self.server, "verbose", False):
+            super().log_message(format, *args)
+
+    # 绑定请求体失败时返回500而不是400的处理函数（与 UserAPI.Update 一致）
+    bind_error_500 = {"update_user"}
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send_raw(status, body, "application/json; charset=utf-8")
+
+    def _send_raw(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _resolve(self, method: str) -> Tuple[Optional[str], bool, Optional[str]]:
+        """匹配路由，返回 (处理函数名, 是否需要认证, 路径参数)"""
+        path = self.path.split("?", 1)[0]
+        if not path.startswith(self.prefix):
+            return None, False, None
+        path = path[len(self.prefix):]
+
+        route = self.routes.get((method, path))
+        if route:
+            return route[0], route[1], None
+
+        segments = path.strip("/").split("/")
+        if len(segments) == 2:
+            route = self.routes.get((method, f"/{segments[0]}/:id"))
+            if route:
+                return route[0], route[1], segments[1]
+        return None, False, None
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else None
+        except (ValueError, UnicodeDecodeError):
+            raise APIError(400, "invalid character in JSON body")
+        if body is None:
+            raise APIError(400, "EOF")
+        if not isinstance(body, dict):
+            raise APIError(400, "json: cannot unmarshal array into Go value of type struct")
+        return body
+
+    def _dispatch(self, method: str):
+        handler_name, require_auth, raw_id = self._resolve(method)
+        if handler_name is None:
+            # 请求体必须读完，否则keep-alive连接上的下一个请求会错位
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self._send_raw(404, b"404 page not found", "text/plain")
+            return
+
+        try:
+            if require_auth:
+                verify_token(self.headers.get("Authorization", ""))
+            args = []
+            if raw_id is not None:
+                args.append(self._validate_uri_id(raw_id))
+            if method in ("POST", "PUT"):
+                try:
+                    args.append(self._read_json())
+                except APIError as e:
+                    if handler_name in self.bind_error_500:
+                        raise APIError(500, e.msg)
+                    raise
+            status, data = getattr(self, handler_name)(*args)
+            payload = {"code": CODE_SUCCESS, "msg": "success"}
+            if data is not None:
+                payload["data"] = data
+            self._send(status, payload)
+        except APIError as e:
+            self._send(e.status, {"code": CODE_FAILED, "msg": e.msg})
+
+    def _validate_uri_id(self, raw_id: str) -> int:
+        """对应 middleware.ValidateUriID"""
+        try:
+            value = int(raw_id)
+        except ValueError:
+            raise APIError(400, f'strconv.Atoi: parsing "{raw_id}": invalid syntax')
+        if value <= 0:
+            raise APIError(400, "id should greater than 0")
+        return value
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    # ---- HealthAPI ----
+
+    def health(self):
+        # 内存存储始终可用，对应 HealthAPI.Get 的数据库 ping 成功
+        return 200, None
+
+    # ---- UserAPI ----
+
+    def register(self, body: dict):
+        values = _bind(body, {"username": str, "password": str, "email": str})
+        _validate_email(values)
+        record = self.store.create_user(values["username"], values["password"], values["email"])
+        return 200, user_json(record)
+
+    def login(self, body: dict):
+        values = _bind(body, {"id": int, "password": str}, required=("id", "password"))
+        record = self.store.get("users", values["id"])
+        if record is None:
+            raise APIError(500, "get user failed")
+        if not check_password(record["password"], values["password"]):
+            raise APIError(401, "Invalid username or password")
+        token = sign_token(record["id"], record["username"])
+        return 200, {"user": user_json(record), "token": token}
+
+    def get_user(self, user_id: int):
+        record = self.store.get("users", user_id)
+        if record is None:
+            raise APIError(500, "query user failed")
+        return 200, user_json(record)
+
+    def delete_user(self, user_id: int):
+        self.store.delete("users", user_id)
+        return 200, user_json(None, user_id)
+
+    def update_user(self, body: dict):
+        try:
+            values = _bind(body, {"id": int, "username": str, "password": str, "email": str})
+            _validate_email(values, status=500)
+        except APIError as e:
+            # UserAPI.Update 的绑定错误返回500
+            raise APIError(500, e.msg)
+        if not values["id"]:
+            raise APIError(500, "WHERE conditions required")
+        record = self.store.update_user(
+            values["id"], values["username"], values["password"], values["email"]
+        )
+        if record is None:
+            raise APIError(500, "record not found")
+        return 200, user_json(record)
+
+    # ---- PostAPI ----
+
+    def create_post(self, body: dict):
+        values = _bind(
+            body,
+            {"title": str, "content": str, "user_id": int},
+            required=("title", "content", "user_id"),
+        )
+        record = self.store.create_post(values["title"], values["content"], values["user_id"])
+        return 200, post_json(record)
+
+    def get_post(self, post_id: int):
+        record = self.store.get("posts", post_id)
+        if record is None:
+            raise APIError(500, "query post failed")
+        return 200, post_json(record)
+
+    def delete_post(self, post_id: int):
+        self.store.delete("posts", post_id)
+        return 200, post_json(None, post_id)
+
+    def update_post(self, body: dict):
+        values = _bind(body, {"id": int, "title": str, "content": str}, required=("id",))
+        with self.store.lock:
+            record = self.store.update(
+                "posts", values["id"], {"title": values["title"], "content": values["content"]}
+            )
+        if record is None:
+            raise APIError(500, "record not found")
+        return 200, post_json(record)
+
+    # ---- CommentAPI ----
+
+    def create_comment(self, body: dict):
+        values = _bind(
+            body,
+            {"content": str, "user_id": int, "post_id": int},
+            required=("content", "user_id", "post_id"),
+        )
+        record = self.store.create_comment(values["content"], values["user_id"], values["post_id"])
+        return 200, comment_json(record)
+
+    def get_comment(self, comment_id: int):
+        record = self.store.get("comments", comment_id)
+        if record is None:
+            raise APIError(500, "query comment failed")
+        return 200, comment_json(record)
+
+    def delete_comment(self, comment_id: int):
+        self.store.delete("comments", comment_id)
+        return 200, comment_json(None, comment_id)
+
+    def update_comment(self, body: dict):
+        values = _bind(body, {"id": int, "content": str}, required=("id",))
+        with self.store.lock:
+            record = self.store.update("comments", values["id"], {"content": values["content"]})
+        if record is None:
+            raise APIError(500, "record not found")
+        return 200, comment_json(record)
+
+
+class FakeBlogServer(ThreadingHTTPServer):
+    """每个连接一个线程的替身服务器"""
+
+    daemon_threads = True
+    # 默认的 listen 队列只有5，高并发建连时会触发秒级的SYN重传
+    request_queue_size = 1024
+
+    def __init__(self, address=("127.0.0.1", 0), verbose: bool = False):
+        super().__init__(address, FakeBlogHandler)
+        self.store = FakeBlogStore()
+        self.verbose = verbose
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{FakeBlogHandler.prefix}"
+
+
+def start_fake_server(host: str = "127.0.0.1", port: int = 0) -> FakeBlogServer:
+    """在后台线程中启动替身服务器，port为0时自动选择空闲端口"""
+    server = FakeBlogServer((host, port))
+    thread = threading.Thread(target=server.serve_forever, name="fake-blog-api", daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="博客API替身服务器（内存存储）")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址 (默认: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="监听端口 (默认: 8000)")
+    parser.add_argument("--verbose", action="store_true", help="打印访问日志")
+    args = parser.parse_args()
+
+    server = FakeBlogServer((args.host, args.port), verbose=args.verbose)
+    print(f"替身服务器已启动: {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
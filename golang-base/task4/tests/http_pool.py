@@ -0,0 +1,262 @@
+"""
+HTTP连接池
+同一进程内所有测试套件的 requests.Session 挂载同一个传输适配器，共享按主机划分的连接池；
+压测中每轮迭代新建的测试套件实例也复用已建立的keep-alive连接，而不是每轮重新握手。
+
+连接池参数（run_tests.py --pool-size / --pool-block / --no-keep-alive）：
+- pool_size:  每个主机保留的空闲连接数（urllib3 的 maxsize）
+- block:      连接数达到 pool_size 时等待空闲连接，而不是临时新建（用完即丢弃）连接，
+              即每个主机的最大连接数
+- keep_alive: 为False时每个请求带 Connection: close，每次都新建连接（用于对比握手开销）
+
+连接统计按进程记录，工作进程的统计随结果返回并合并：请求数、新建/复用的连接数、建立连接的耗时分布，
+以及连接池已满被丢弃的连接数。新建连接占比高或连接耗时占比高，说明延迟毛刺来自TCP/keep-alive抖动，
+而不是Gin处理函数。
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+import requests
+from colorama import Fore, Style
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .defaults import DEFAULT_POOL_SIZE
+from .metrics import LatencyHistogram
+
+# 连接池参数 "pool_size:block:keep_alive"，工作进程从环境变量继承
+HTTP_POOL_ENV = "BLOG_API_HTTP_POOL"
+
+
+class PoolConfig:
+    """连接池参数"""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, block: bool = False, keep_alive: bool = True):
+        self.pool_size = pool_size
+        self.block = block
+        self.keep_alive = keep_alive
+
+    def to_env(self) -> str:
+        return f"{self.pool_size}:{int(self.block)}:{int(self.keep_alive)}"
+
+    @classmethod
+    def from_env(cls, value: str) -> "PoolConfig":
+        pool_size, block, keep_alive = value.split(":")
+        return cls(int(pool_size), block == "1", keep_alive == "1")
+
+
+class ConnectionStats:
+    """连接复用统计，线程安全，可以跨进程合并"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connect_errors = 0
+        self.discarded = 0  # 连接池已满、用完即关闭的连接
+        self.connect = LatencyHistogram()  # 每次新建连接的耗时
+
+    @property
+    def new_connections(self) -> int:
+        return self.connect.count
+
+    @property
+    def reused(self) -> int:
+        return max(0, self.requests - self.connect.count - self.connect_errors)
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connect(self, seconds: float):
+        with self._lock:
+            self.connect.record(seconds)
+
+    def record_connect_error(self):
+        with self._lock:
+            self.connect_errors += 1
+
+    def record_discard(self):
+        with self._lock:
+            self.discarded += 1
+
+    def merge(self, other: "ConnectionStats"):
+        with self._lock:
+            self.requests += other.requests
+            self.connect_errors += other.connect_errors
+            self.discarded += other.discarded
+            self.connect.merge(other.connect)
+
+    def reset(self):
+        with self._lock:
+            self.requests = self.connect_errors = self.discarded = 0
+            self.connect = LatencyHistogram()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connect_errors": self.connect_errors,
+                "discarded": self.discarded,
+                "connect": self.connect.to_dict(),
+            }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ConnectionStats":
+        stats = cls()
+        stats.requests = data["requests"]
+        stats.connect_errors = data["connect_errors"]
+        stats.discarded = data["discarded"]
+        stats.connect = LatencyHistogram.from_dict(data["connect"])
+        return stats
+
+
+# 进程内全局统计
+connection_stats = ConnectionStats()
+
+
+class _TimedConnectMixin:
+    """统计新建连接的次数和耗时（DNS + TCP握手，HTTPS还包括TLS握手）"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        except Exception:
+            connection_stats.record_connect_error()
+            raise
+        connection_stats.record_connect(time.perf_counter() - start)
+
+
+class TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+
+class _CountingPoolMixin:
+    """统计连接池已满时被丢弃的连接"""
+
+    def _put_conn(self, conn):
+        if conn is not None and self.pool is not None and self.pool.full():
+            connection_stats.record_discard()
+        super()._put_conn(conn)
+
+
+class TimedHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """按 PoolConfig 创建连接池并记录连接统计的传输适配器"""
+
+    def __init__(self, config: PoolConfig):
+        self.config = config
+        super().__init__(pool_maxsize=config.pool_size, pool_block=config.block)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        connection_stats.record_request()
+        return super().send(request, **kwargs)
+
+    def close(self):
+        """共享的适配器不随单个Session关闭，由 close_shared_adapter 统一关闭"""
+
+
+config = PoolConfig.from_env(os.environ[HTTP_POOL_ENV]) if os.environ.get(HTTP_POOL_ENV) else PoolConfig()
+
+_adapter: Optional[PooledAdapter] = None
+_adapter_lock = threading.Lock()
+
+
+def configure(pool_size: int = DEFAULT_POOL_SIZE, block: bool = False, keep_alive: bool = True):
+    """设置连接池参数（在创建任何测试套件之前调用），工作进程继承同一设置"""
+    global config
+    close_shared_adapter()
+    config = PoolConfig(pool_size, block, keep_alive)
+    os.environ[HTTP_POOL_ENV] = config.to_env()
+
+
+def shared_adapter() -> PooledAdapter:
+    """获取（必要时创建）进程内共享的适配器"""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is None:
+            _adapter = PooledAdapter(config)
+        return _adapter
+
+
+def close_shared_adapter():
+    """关闭共享适配器的所有连接"""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is not None:
+            HTTPAdapter.close(_adapter)
+            _adapter = None
+
+
+def mount(session: requests.Session):
+    """让 session 使用共享的连接池"""
+    adapter = shared_adapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not config.keep_alive:
+        session.headers["Connection"] = "close"
+
+
+def _after_fork_in_child():
+    # 子进程不能与父进程共用继承来的socket，丢弃适配器（不关闭连接）并重新统计
+    global _adapter, _adapter_lock
+    _adapter = None
+    _adapter_lock = threading.Lock()
+    connection_stats._lock = threading.Lock()
+    connection_stats.reset()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def print_connection_report(stats: ConnectionStats = None, request_seconds: float = 0.0):
+    """打印连接复用情况
+
+    Args:
+        request_seconds: 同期所有请求的总耗时（秒），用于计算建立连接的耗时占比
+    """
+    stats = stats or connection_stats
+    if not stats.requests:
+        return
+
+    connect = stats.connect
+    reuse_rate = stats.reused / stats.requests
+    color = Fore.GREEN if reuse_rate >= 0.9 else Fore.YELLOW
+    print(f"\n{Fore.CYAN}🔌 连接统计{Style.RESET_ALL} (连接池: 每主机 {config.pool_size} 个连接"
+          f"{', 阻塞等待' if config.block else ''}{', keep-alive' if config.keep_alive else ', 无keep-alive'})")
+    print(
+        f"  请求数: {stats.requests}   新建连接: {stats.new_connections}   "
+        f"复用: {color}{stats.reused} ({reuse_rate:.1%}){Style.RESET_ALL}   "
+        f"连接失败: {stats.connect_errors}   池满丢弃: {stats.discarded}"
+    )
+    if connect.count:
+        connect_seconds = connect.total / 1_000_000
+        share = f"，占请求总耗时 {connect_seconds / request_seconds:.1%}" if request_seconds else ""
+        print(
+            f"  建立连接耗时: p50 {connect.percentile(50) * 1000:.2f}ms, p99 {connect.percentile(99) * 1000:.2f}ms, "
+            f"max {(connect.max or 0) / 1000:.2f}ms, 合计 {connect_seconds:.3f}s{share}"
+        )
+    if stats.discarded:
+        print(f"  {Fore.YELLOW}⚠️  有连接因连接池已满被丢弃，并发线程数超过 --pool-size 时会反复新建连接{Style.RESET_ALL}")
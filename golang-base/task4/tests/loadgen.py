@@ -0,0 +1,347 @@
+"""
+压测模块
+以多个并发虚拟用户重放 ComprehensiveAPITest 的业务流程（或声明式场景，见 scenario.py），
+统计每个步骤的吞吐量和错误率
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, List, Optional
+
+from colorama import Fore, Style
+
+from .http_pool import ConnectionStats, connection_stats
+from .metrics import LatencyRegistry, latency_registry
+from .output import configure_output, get_output, output_config
+from .test_comprehensive import ComprehensiveAPITest
+from .token_cache import token_cache
+
+
+# 每轮迭代依次执行的步骤: (步骤名, ComprehensiveAPITest 方法名)
+LOAD_STEPS = [
+    ("register", "create_test_users"),
+    ("login", "test_user_authentication"),
+    ("create_blog_posts", "create_blog_posts"),
+    ("simulate_user_interactions", "simulate_user_interactions"),
+    ("test_content_updates", "test_content_updates"),
+    ("test_data_retrieval", "test_data_retrieval"),
+]
+
+# 每轮结束后的清理步骤，单独统计，避免压测数据堆积
+CLEANUP_STEP = "cleanup"
+
+
+class StepStats:
+    """单个步骤的统计数据"""
+
+    def __init__(self):
+        self.count = 0  # 执行次数
+        self.errors = 0  # 失败次数
+        self.requests = 0  # 该步骤发出的请求数
+        self.failed_requests = 0  # 状态码不符合期望的请求数
+        self.total_time = 0.0  # 累计耗时（秒）
+
+    def record(self, elapsed: float, ok: bool, requests: int, failed_requests: int):
+        """记录一次步骤执行"""
+        self.count += 1
+        self.total_time += elapsed
+        self.requests += requests
+        self.failed_requests += failed_requests
+        if not ok:
+            self.errors += 1
+
+    def merge(self, other: "StepStats"):
+        """合并另一份统计数据"""
+        self.count += other.count
+        self.errors += other.errors
+        self.requests += other.requests
+        self.failed_requests += other.failed_requests
+        self.total_time += other.total_time
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StepStats":
+        stats = cls()
+        vars(stats).update(data)
+        return stats
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.count if self.count else 0.0
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+
+class LoadTestResult:
+    """一次压测的汇总结果"""
+
+    def __init__(self, users: int, duration: float, step_names: Optional[List[str]] = None):
+        """
+        Args:
+            step_names: 报告中的步骤（按顺序），默认为综合测试流程的 LOAD_STEPS 和清理步骤
+        """
+        self.users = users
+        self.duration = duration  # 计划时长（秒）
+        self.elapsed = 0.0  # 实际墙钟时长（秒）
+        self.iterations = 0  # 完成的流程迭代次数
+        if step_names is None:
+            step_names = [name for name, _ in LOAD_STEPS] + [CLEANUP_STEP]
+        self.steps: Dict[str, StepStats] = {name: StepStats() for name in step_names}
+
+    def merge(self, other: "LoadTestResult"):
+        """合并另一份结果（来自其他虚拟用户）"""
+        self.iterations += other.iterations
+        for name, stats in other.steps.items():
+            self.steps.setdefault(name, StepStats()).merge(stats)
+
+    def to_dict(self) -> dict:
+        """导出为可序列化的字典（用于从工作进程返回）"""
+        return {
+            "users": self.users,
+            "duration": self.duration,
+            "elapsed": self.elapsed,
+            "iterations": self.iterations,
+            "steps": {name: stats.to_dict() for name, stats in self.steps.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LoadTestResult":
+        result = cls(data["users"], data["duration"])
+        result.elapsed = data["elapsed"]
+        result.iterations = data["iterations"]
+        result.steps = {name: StepStats.from_dict(stats) for name, stats in data["steps"].items()}
+        return result
+
+    @property
+    def total_requests(self) -> int:
+        return sum(stats.requests for stats in self.steps.values())
+
+    @property
+    def total_failed_requests(self) -> int:
+        return sum(stats.failed_requests for stats in self.steps.values())
+
+
+def comprehensive_flow(base_url: str, suffix: str):
+    """综合测试流程的一轮迭代: (测试实例, [(步骤名, 可调用对象), ...], 清理函数)"""
+    test = ComprehensiveAPITest(base_url, auto_cleanup=True, username_suffix=suffix)
+    return test, [(step_name, getattr(test, method_name)) for step_name, method_name in LOAD_STEPS], test.cleanup_test_data
+
+
+class VirtualUser:
+    """虚拟用户：在截止时间前反复执行完整业务流程"""
+
+    def __init__(self, vu_id: int, run_tag: str, base_url: str, duration: float, plan=None):
+        """
+        Args:
+            plan: 编译后的场景（scenario.ScenarioPlan），为None时执行综合测试流程
+        """
+        self.vu_id = vu_id
+        self.run_tag = run_tag
+        self.base_url = base_url
+        self.flow = comprehensive_flow if plan is None else plan.load_flow
+        self.result = LoadTestResult(users=1, duration=duration, step_names=plan.step_names if plan else None)
+
+    def _run_step(self, test, step_name: str, func) -> bool:
+        """执行单个步骤并记录统计，返回步骤是否成功"""
+        requests_before = test.request_count
+        failed_before = test.failed_request_count
+        start = time.perf_counter()
+        try:
+            # 部分步骤没有返回值（None），只有明确返回False才视为失败
+            ok = func() is not False
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+
+        failed = test.failed_request_count - failed_before
+        ok = ok and failed == 0
+        self.result.steps[step_name].record(
+            elapsed, ok, test.request_count - requests_before, failed
+        )
+        return ok
+
+    def run_iteration(self, iteration: int):
+        """执行一轮完整流程，每轮使用唯一的用户名"""
+        suffix = f"_{self.run_tag}_{self.vu_id}_{iteration}"
+        test, steps, cleanup = self.flow(self.base_url, suffix)
+
+        for step_name, func in steps:
+            # 后续步骤依赖前面步骤创建的数据，任一步骤失败则结束本轮
+            if not self._run_step(test, step_name, func):
+                break
+
+        self._run_step(test, CLEANUP_STEP, cleanup)
+        self.result.iterations += 1
+
+    def run(self, deadline: float):
+        """在截止时间前循环执行，已开始的迭代会完整执行完"""
+        iteration = 0
+        while time.monotonic() < deadline:
+            self.run_iteration(iteration)
+            iteration += 1
+
+
+def run_load_test(
+    base_url: str,
+    users: int,
+    duration: float,
+    run_tag: Optional[str] = None,
+    first_vu: int = 0,
+    plan=None,
+) -> LoadTestResult:
+    """以 users 个并发虚拟用户运行 duration 秒的压测
+
+    压测期间各虚拟用户的逐请求日志会被丢弃，只输出最终报告。
+
+    Args:
+        run_tag: 批次标识，多进程压测时由协调进程统一指定
+        first_vu: 第一个虚拟用户的编号，多进程压测时保证各进程的用户名不冲突
+        plan: 编译后的场景，为None时重放综合测试流程
+    """
+    run_tag = run_tag or uuid.uuid4().hex[:6]
+    virtual_users = [
+        VirtualUser(i, run_tag, base_url, duration, plan) for i in range(first_vu, first_vu + users)
+    ]
+    result = LoadTestResult(users, duration, step_names=plan.step_names if plan else None)
+
+    scenario = f"场景 {plan.name}, " if plan else ""
+    print(
+        f"{Fore.MAGENTA}🚀 开始压测: {scenario}{users} 个虚拟用户, 持续 {duration:g} 秒 (批次: {run_tag}){Style.RESET_ALL}"
+    )
+    sys.stdout.flush()
+
+    start = time.monotonic()
+    deadline = start + duration
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        threads = [
+            threading.Thread(target=vu.run, args=(deadline,), name=f"vu-{vu.vu_id}", daemon=True)
+            for vu in virtual_users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    result.elapsed = time.monotonic() - start
+
+    for vu in virtual_users:
+        result.merge(vu.result)
+    return result
+
+
+def _run_load_worker(
+    base_url: str,
+    users: int,
+    duration: float,
+    run_tag: str,
+    first_vu: int,
+    output_settings: tuple,
+    scenario_path: Optional[str] = None,
+):
+    """在工作进程中运行一部分虚拟用户
+
+    Args:
+        scenario_path: 场景文件，工作进程自己编译（编译后的计划包含闭包，不能跨进程传递）
+
+    Returns:
+        (压测结果, 延迟直方图快照, 请求计数快照, 连接统计快照)，均为可序列化的字典
+    """
+    latency_registry.reset()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        # 按协调进程的配置重建输出层（后台写线程不会随fork复制）
+        output = configure_output(*output_settings)
+        plan = None
+        if scenario_path:
+            from .scenario import load_scenario
+
+            plan = load_scenario(scenario_path)
+        result = run_load_test(base_url, users, duration, run_tag=run_tag, first_vu=first_vu, plan=plan)
+        output.flush()
+        # 子进程退出时不会执行atexit，需要显式写回token缓存
+        token_cache.save()
+    return result.to_dict(), latency_registry.to_dict(), output.snapshot(), connection_stats.to_dict()
+
+
+def run_distributed_load_test(
+    base_url: str, users: int, duration: float, workers: int, plan=None
+) -> LoadTestResult:
+    """把虚拟用户分配到 workers 个本地工作进程并发压测
+
+    每个工作进程返回完整的直方图和计数，协调进程合并后计算的是全局精确分位数，
+    而不是各进程分位数的平均值。
+
+    Args:
+        plan: 编译后的场景，各工作进程按 plan.path 重新编译
+    """
+    workers = min(workers, users)
+    run_tag = uuid.uuid4().hex[:6]
+    # 虚拟用户尽量均分，前 users % workers 个进程多分一个
+    shares = [users // workers + (1 if i < users % workers else 0) for i in range(workers)]
+
+    scenario = f"场景 {plan.name}, " if plan else ""
+    print(
+        f"{Fore.MAGENTA}🚀 开始压测: {scenario}{users} 个虚拟用户, {workers} 个工作进程, "
+        f"持续 {duration:g} 秒 (批次: {run_tag}){Style.RESET_ALL}"
+    )
+    sys.stdout.flush()
+
+    result = LoadTestResult(users, duration, step_names=plan.step_names if plan else None)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _run_load_worker, base_url, share, duration, run_tag, sum(shares[:i]), output_config(),
+                plan.path if plan else None,
+            )
+            for i, share in enumerate(shares)
+        ]
+        for future in futures:
+            worker_result, latencies, counts, connections = future.result()
+            partial = LoadTestResult.from_dict(worker_result)
+            result.merge(partial)
+            result.elapsed = max(result.elapsed, partial.elapsed)
+            latency_registry.merge(LatencyRegistry.from_dict(latencies))
+            get_output().merge(counts)
+            connection_stats.merge(ConnectionStats.from_dict(connections))
+    return result
+
+
+def print_load_report(result: LoadTestResult):
+    """打印压测报告：每个步骤的吞吐量和错误率"""
+    elapsed = result.elapsed or 1e-9
+
+    print(f"\n{Fore.CYAN}{'=' * 78}")
+    print("📊 压测报告")
+    print(f"{'=' * 78}{Style.RESET_ALL}")
+    print(
+        f"  虚拟用户: {result.users}   实际时长: {result.elapsed:.1f}s   "
+        f"完成迭代: {result.iterations}"
+    )
+    print(
+        f"  总请求数: {result.total_requests}   "
+        f"请求吞吐: {result.total_requests / elapsed:.1f} req/s   "
+        f"失败请求: {result.total_failed_requests}"
+    )
+
+    header = f"  {'步骤':<28}{'次数':>8}{'错误':>8}{'错误率':>9}{'吞吐(次/s)':>12}{'平均耗时':>11}{'请求数':>9}"
+    print(f"\n{Fore.YELLOW}{header}{Style.RESET_ALL}")
+    for name, stats in result.steps.items():
+        color = Fore.RED if stats.errors else Fore.GREEN
+        print(
+            f"  {color}{name:<28}{Style.RESET_ALL}{stats.count:>8}{stats.errors:>8}"
+            f"{stats.error_rate:>9.1%}{stats.count / elapsed:>12.2f}"
+            f"{stats.avg_time * 1000:>9.1f}ms{stats.requests:>9}"
+        )
+
+
+def load_test_passed(result: LoadTestResult) -> bool:
+    """压测是否无错误完成"""
+    return result.iterations > 0 and all(stats.errors == 0 for stats in result.steps.values())
+
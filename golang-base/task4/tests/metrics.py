@@ -0,0 +1,209 @@
+"""
+延迟统计模块
+以对数分桶直方图记录每个接口（方法 + 路由模板）的请求延迟
+"""
+
+import functools
+import math
+import threading
+from typing import Dict, Optional
+
+from colorama import Fore, Style
+
+
+# 带路径参数的路由前缀（与 main.go 中的 /user/:id、/post/:id、/comment/:id 对应）
+PARAM_ROUTES = {"user", "post", "comment"}
+
+
+@functools.lru_cache(maxsize=4096)
+def template_route(endpoint: str) -> str:
+    """把具体路径转换为路由模板，例如 /post/123 -> /post/:id"""
+    path = endpoint.split("?", 1)[0]
+    segments = path.strip("/").split("/")
+    if len(segments) == 2 and segments[0] in PARAM_ROUTES:
+        return f"/{segments[0]}/:id"
+    return "/" + "/".join(":id" if s.isdigit() else s for s in segments)
+
+
+class LatencyHistogram:
+    """对数分桶的延迟直方图
+
+    以微秒为单位记录，相邻桶的边界相差 GROWTH 倍，分位数的相对误差不超过约2%。
+    桶以稀疏字典存储，1µs 到 100s 的范围最多约470个桶；两个直方图可以直接合并。
+    """
+
+    GROWTH = 1.04
+    _LOG_GROWTH = math.log(GROWTH)
+
+    __slots__ = ("buckets", "count", "total", "min", "max", "errors")
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0  # 微秒总和
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self.errors = 0  # 状态码不符合期望或请求异常的次数
+
+    def record(self, seconds: float):
+        """记录一次延迟（秒）"""
+        micros = max(1, int(seconds * 1_000_000))
+        index = int(math.log(micros) / self._LOG_GROWTH)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += micros
+        if self.min is None or micros < self.min:
+            self.min = micros
+        if self.max is None or micros > self.max:
+            self.max = micros
+
+    def merge(self, other: "LatencyHistogram"):
+        """合并另一个直方图"""
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.errors += other.errors
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def percentile(self, p: float) -> float:
+        """返回第p百分位的延迟（秒），p取值0-100"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # 取桶的几何中点，并限制在实际观测的最小/最大值之间
+                micros = self.GROWTH ** (index + 0.5)
+                return min(max(micros, self.min), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        """平均延迟（秒）"""
+        return self.total / self.count / 1_000_000 if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        """导出为可序列化的字典（用于跨进程传递）"""
+        return {
+            "buckets": self.buckets,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "errors": self.errors,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        """从 to_dict 的结果还原"""
+        histogram = cls()
+        histogram.buckets = {int(k): v for k, v in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        histogram.errors = data.get("errors", 0)
+        return histogram
+
+
+class LatencyRegistry:
+    """按 "方法 路由模板" 汇总的延迟直方图集合，线程安全"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def _histogram(self, method: str, endpoint: str) -> LatencyHistogram:
+        key = f"{method.upper()} {template_route(endpoint)}"
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        return histogram
+
+    def record(self, method: str, endpoint: str, seconds: float):
+        """记录一次请求延迟"""
+        with self._lock:
+            self._histogram(method, endpoint).record(seconds)
+
+    def record_error(self, method: str, endpoint: str):
+        """记录一次失败的请求（状态码不符合期望或请求异常）"""
+        with self._lock:
+            self._histogram(method, endpoint).errors += 1
+
+    def merge(self, other: "LatencyRegistry"):
+        """合并另一个注册表"""
+        with self._lock:
+            for key, histogram in other.histograms.items():
+                self.histograms.setdefault(key, LatencyHistogram()).merge(histogram)
+
+    def reset(self):
+        """清空所有数据"""
+        with self._lock:
+            self.histograms.clear()
+
+    def drain(self) -> "LatencyRegistry":
+        """取出当前所有数据并清空，用于按时间窗口统计"""
+        drained = LatencyRegistry()
+        with self._lock:
+            drained.histograms, self.histograms = self.histograms, {}
+        return drained
+
+    def combined(self) -> LatencyHistogram:
+        """所有接口合并后的直方图"""
+        total = LatencyHistogram()
+        with self._lock:
+            for histogram in self.histograms.values():
+                total.merge(histogram)
+        return total
+
+    def summary(self) -> Dict[str, dict]:
+        """每个路由的统计摘要（毫秒）"""
+        with self._lock:
+            return {
+                key: {
+                    "count": h.count,
+                    "errors": h.errors,
+                    "p50_ms": round(h.percentile(50) * 1000, 2),
+                    "p90_ms": round(h.percentile(90) * 1000, 2),
+                    "p95_ms": round(h.percentile(95) * 1000, 2),
+                    "p99_ms": round(h.percentile(99) * 1000, 2),
+                    "max_ms": round((h.max or 0) / 1000, 2),
+                }
+                for key, h in sorted(self.histograms.items())
+            }
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {key: h.to_dict() for key, h in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyRegistry":
+        registry = cls()
+        registry.histograms = {key: LatencyHistogram.from_dict(h) for key, h in data.items()}
+        return registry
+
+
+# 进程内全局注册表，所有 make_request 调用都记录到这里
+latency_registry = LatencyRegistry()
+
+
+def print_latency_report(registry: LatencyRegistry = None):
+    """打印每个接口的延迟分位数"""
+    summary = (registry or latency_registry).summary()
+    if not summary:
+        return
+
+    print(f"\n{Fore.CYAN}⏱️  接口延迟统计{Style.RESET_ALL}")
+    print(f"  {'接口':<24}{'次数':>6}{'p50':>11}{'p90':>11}{'p99':>11}{'max':>11}")
+    for key, stats in summary.items():
+        print(
+            f"  {key:<26}{stats['count']:>8}"
+            f"{stats['p50_ms']:>9.1f}ms{stats['p90_ms']:>9.1f}ms"
+            f"{stats['p99_ms']:>9.1f}ms{stats['max_ms']:>9.1f}ms"
+        )
@@ -0,0 +1,236 @@
+"""
+开环压测模块
+以固定的目标速率发出请求（恒定到达率），不受服务器响应快慢的影响
+
+闭环的虚拟用户在服务器卡顿时会少发请求，卡顿期间本该发出的请求没有被计时，
+尾延迟因此被低估（coordinated omission）。这里每个请求都有预定的发送时刻，
+延迟从预定时刻开始计算：调度器落后、连接池排队或服务器卡顿造成的等待都会计入。
+"""
+
+import asyncio
+import uuid
+from typing import Optional
+
+from colorama import Fore, Style
+
+from .base_test import BaseAPITest
+from .defaults import DEFAULT_ASYNC_CLIENT, DEFAULT_MAX_IN_FLIGHT, OPEN_LOOP_TARGETS
+from .metrics import LatencyHistogram, LatencyRegistry, latency_registry
+
+
+class OpenLoopResult:
+    """一次开环压测的结果"""
+
+    def __init__(self, target: str, rate: float, duration: float):
+        self.target = target
+        self.rate = rate  # 目标速率（请求/秒）
+        self.duration = duration  # 计划时长（秒）
+        self.elapsed = 0.0  # 从开始到最后一个请求完成的墙钟时长（秒）
+        self.scheduled = 0  # 按计划应发出的请求数
+        self.sent = 0  # 实际发出的请求数
+        self.completed = 0  # 状态码符合期望的请求数
+        self.errors = 0  # 状态码不符合期望或请求异常的请求数
+        self.dropped = 0  # 因在途请求达到上限而丢弃的请求数
+        self.in_flight = 0
+        self.max_in_flight = 0  # 观测到的最大在途请求数
+        self.max_schedule_lag = 0.0  # 调度器相对预定发送时刻的最大落后（秒）
+        self.latency = LatencyHistogram()  # 从预定发送时刻到完成（已校正）
+        self.service_time = LatencyHistogram()  # 从实际发送到完成（未校正）
+        self.routes = LatencyRegistry()  # 按路由记录的已校正延迟，丢弃的请求计为错误
+
+
+class OpenLoopLoadTest(BaseAPITest):
+    """开环压测：准备一组测试数据，然后以恒定速率请求目标接口"""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000/api/v1",
+        target: str = "get_post",
+        rate: float = 100,
+        duration: float = 10,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        client: str = DEFAULT_ASYNC_CLIENT,
+    ):
+        super().__init__(base_url, auto_cleanup=True)
+        if target not in OPEN_LOOP_TARGETS:
+            raise ValueError(f"不支持的压测目标: {target}")
+        self.target = target
+        self.rate = rate
+        self.duration = duration
+        self.max_in_flight = max_in_flight
+        # 连接数与在途上限一致，超出连接池的请求在客户端排队，排队时间计入校正后的延迟
+        self.async_connection_limit = max_in_flight
+        self.async_client = client
+        self.fixture = {}
+
+    def setup_fixture(self) -> bool:
+        """创建压测使用的用户、文章和评论"""
+        username = f"openloop_{uuid.uuid4().hex[:8]}"
+        password = "openloop123"
+        response = self.make_request(
+            "POST",
+            "/register",
+            data={"username": username, "password": password, "email": f"{username}@example.com"},
+            description="注册压测用户",
+            require_auth=False,
+        )
+        user_id = self.extract_id_from_response(response)
+        if not user_id or not self.login_and_get_token(user_id, password):
+            return False
+
+        response = self.make_request(
+            "POST",
+            "/post",
+            data={"title": "开环压测文章", "content": "用于开环压测的文章内容", "user_id": user_id},
+            description="创建压测文章",
+        )
+        post_id = self.extract_id_from_response(response)
+        if not post_id:
+            return False
+
+        response = self.make_request(
+            "POST",
+            "/comment",
+            data={"content": "用于开环压测的评论", "user_id": user_id, "post_id": post_id},
+            description="创建压测评论",
+        )
+        comment_id = self.extract_id_from_response(response)
+        if not comment_id:
+            return False
+
+        self.fixture = {"user_id": user_id, "post_id": post_id, "comment_id": comment_id}
+        return True
+
+    def cleanup_fixture(self):
+        """删除压测数据"""
+        for kind in ("comment", "post", "user"):
+            record_id = self.fixture.get(f"{kind}_id")
+            if record_id:
+                self.make_request("DELETE", f"/{kind}/{record_id}", description=f"删除压测数据 {kind}")
+
+    async def _fire(self, result: OpenLoopResult, endpoint: str, description: str, intended: float):
+        """发出一个请求，延迟从预定发送时刻 intended 开始计算"""
+        loop = asyncio.get_running_loop()
+        sent_at = loop.time()
+        try:
+            response = await self.make_request_async("GET", endpoint, description=description)
+            ok = response.status_code == 200
+        except Exception:
+            ok = False
+        finally:
+            result.in_flight -= 1
+
+        done_at = loop.time()
+        result.latency.record(done_at - intended)
+        result.service_time.record(done_at - sent_at)
+        result.routes.record("GET", endpoint, done_at - intended)
+        if ok:
+            result.completed += 1
+        else:
+            result.errors += 1
+            result.routes.record_error("GET", endpoint)
+
+    async def _schedule(self, result: OpenLoopResult):
+        """按恒定间隔调度请求；调度器落后时立即补发，并保留每个请求原本的预定时刻"""
+        loop = asyncio.get_running_loop()
+        route, description = OPEN_LOOP_TARGETS[self.target]
+        endpoint = route.format(**self.fixture)
+        interval = 1.0 / self.rate
+        total = int(self.rate * self.duration)
+        tasks = set()
+        # 压测期间 make_request_async 向全局注册表记录的是服务时间，结束后换成已校正的延迟
+        fixture_latencies = latency_registry.drain()
+
+        start = loop.time()
+        for i in range(total):
+            intended = start + i * interval
+            delay = intended - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                result.max_schedule_lag = max(result.max_schedule_lag, -delay)
+
+            result.scheduled += 1
+            if result.in_flight >= self.max_in_flight:
+                result.dropped += 1
+                result.routes.record_error("GET", endpoint)
+                continue
+
+            # 在途计数在调度时增加，避免任务尚未开始运行时超出上限
+            result.sent += 1
+            result.in_flight += 1
+            result.max_in_flight = max(result.max_in_flight, result.in_flight)
+            task = asyncio.create_task(self._fire(result, endpoint, description, intended))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        result.elapsed = loop.time() - start
+        await self.close_async_session()
+
+        latency_registry.drain()
+        latency_registry.merge(fixture_latencies)
+        latency_registry.merge(result.routes)
+
+    def run(self) -> Optional[OpenLoopResult]:
+        """准备数据、运行开环压测并清理，准备失败时返回None"""
+        if not self._async_client_module().is_available():
+            self.print_error("aiohttp 客户端需要安装可选依赖，请运行: uv sync --extra async，或使用 --http-client raw")
+            return None
+        if not self.check_server_status():
+            self.print_error("服务器未运行！请先启动服务器: go run main.go")
+            return None
+        if not self.setup_fixture():
+            self.print_error("准备压测数据失败")
+            self.cleanup_fixture()
+            return None
+
+        result = OpenLoopResult(self.target, self.rate, self.duration)
+        print(
+            f"{Fore.MAGENTA}🚀 开始开环压测: {OPEN_LOOP_TARGETS[self.target][1]} "
+            f"{self.rate:g} req/s, 持续 {self.duration:g} 秒, 最大在途 {self.max_in_flight}, "
+            f"客户端 {self.async_client}{Style.RESET_ALL}"
+        )
+        try:
+            asyncio.run(self._schedule(result))
+        finally:
+            self.cleanup_fixture()
+        return result
+
+
+def print_open_loop_report(result: OpenLoopResult):
+    """打印开环压测报告：校正后的延迟分位数与各计数器"""
+    elapsed = result.elapsed or 1e-9
+
+    print(f"\n{Fore.CYAN}{'=' * 70}")
+    print("📊 开环压测报告")
+    print(f"{'=' * 70}{Style.RESET_ALL}")
+    print(
+        f"  目标速率: {result.rate:g} req/s   实际发送速率: {result.sent / elapsed:.1f} req/s   "
+        f"完成吞吐: {result.completed / elapsed:.1f} req/s"
+    )
+    print(
+        f"  计划: {result.scheduled}   发送: {result.sent}   成功: {result.completed}   "
+        f"错误: {result.errors}   丢弃: {result.dropped}"
+    )
+    print(
+        f"  最大在途请求: {result.max_in_flight}   "
+        f"调度器最大落后: {result.max_schedule_lag * 1000:.1f}ms"
+    )
+
+    print(f"\n{Fore.YELLOW}  {'延迟':<20}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}{Style.RESET_ALL}")
+    rows = [("从预定时刻(已校正)", result.latency), ("服务时间(未校正)", result.service_time)]
+    for label, histogram in rows:
+        # 中文字符在终端中占两列，按显示宽度补齐
+        width = sum(1 if c.isascii() else 2 for c in label)
+        padding = " " * max(0, 22 - width)
+        cells = "".join(
+            f"{histogram.percentile(p) * 1000:>8.1f}ms" for p in (50, 90, 99, 99.9)
+        )
+        print(f"  {label}{padding}{cells}{(histogram.max or 0) / 1000:>8.1f}ms")
+
+
+def open_loop_passed(result: Optional[OpenLoopResult]) -> bool:
+    """压测是否没有错误和丢弃"""
+    return result is not None and result.sent > 0 and result.errors == 0 and result.dropped == 0
@@ -0,0 +1,252 @@
+"""
+请求输出层
+make_request 只负责生成请求事件，格式化和终端/文件I/O由可插拔的输出端完成：
+
+- summary: 只打印失败的请求，结束时输出汇总（默认）
+- verbose: 原有的详细模式，打印每个请求和响应的完整JSON
+- jsonl:   结构化事件写入JSON Lines文件，序列化和写盘在后台线程完成
+"""
+
+import os
+import queue
+import sys
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+from colorama import Fore, Style
+
+from . import codec
+
+
+OUTPUT_MODES = ("summary", "verbose")
+
+
+class EventSink:
+    """输出端基类，emit 在请求线程中调用，必须尽量轻量"""
+
+    def emit(self, event: dict):
+        raise NotImplementedError
+
+    def flush(self):
+        """等待已提交的事件全部输出"""
+
+    def close(self):
+        """关闭输出端"""
+        self.flush()
+
+
+def _describe_result(event: dict) -> str:
+    """生成与原有日志一致的结果描述"""
+    description = event["description"]
+    if event["ok"]:
+        return f"{description} - 成功" if description else "请求成功"
+    expectation = f"期望状态码: {event['expected']}, 实际: {event['status']}"
+    return f"{description} - 失败 ({expectation})" if description else f"请求失败 ({expectation})"
+
+
+class VerboseConsoleSink(EventSink):
+    """详细模式：打印每个请求和响应的完整内容"""
+
+    def emit(self, event: dict):
+        print(f"🌐 {event['method']} {event['url']}")
+        request = event["request"]
+        if request:
+            if type(request) is bytes:
+                request = codec.loads(request)  # 预编码的请求体（request_template.py）
+            print(f"📤 请求数据: {codec.dumps_pretty(request)}")
+
+        print(f"📈 状态码: {event['status']}")
+
+        try:
+            print(f"📥 响应数据: {codec.dumps_pretty(codec.loads(event['response']))}")
+        except ValueError:
+            print(f"📥 响应数据: {event['response'].decode('utf-8', errors='replace')}")
+
+        if event["ok"]:
+            print(f"{Fore.GREEN}✅ {_describe_result(event)}{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.RED}❌ {_describe_result(event)}{Style.RESET_ALL}")
+
+
+class SummaryConsoleSink(EventSink):
+    """汇总模式：成功的请求不输出，失败的请求只打印一行"""
+
+    def emit(self, event: dict):
+        if not event["ok"]:
+            print(
+                f"{Fore.RED}❌ {event['method']} {event['url']} - "
+                f"{_describe_result(event)}{Style.RESET_ALL}"
+            )
+
+
+class JsonLinesSink(EventSink):
+    """JSON Lines 事件文件，由后台线程批量序列化并写入
+
+    每批事件通过一次 os.write 追加写入（O_APPEND），多个进程可以安全地写同一个文件。
+    """
+
+    BATCH_SIZE = 512
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self.skipped = 0  # 无法序列化或写入失败而跳过的事件数
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._drain, name="jsonl-writer", daemon=True)
+        self._writer.start()
+
+    def emit(self, event: dict):
+        self._queue.put(event)
+
+    def _serialize(self, event: dict) -> bytes:
+        record = dict(event)
+        record["response"] = event["response"].decode("utf-8", errors="replace")
+        if type(event["request"]) is bytes:
+            record["request"] = codec.loads(event["request"])
+        return codec.dumps(record, default=str)
+
+    def _drain(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            try:
+                self._write_batch([event for event in batch if event is not None])
+            finally:
+                # 无论写入是否成功都要标记完成，否则 flush 会一直等待
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_batch(self, events: List[dict]):
+        """序列化并写入一批事件；无法序列化或写入失败的事件跳过并计数，写线程不会因此退出"""
+        lines = []
+        for event in events:
+            try:
+                lines.append(self._serialize(event))
+            except Exception as e:
+                self._skip(1, f"无法序列化的事件 {event.get('method')} {event.get('url')}: {str(e)}")
+        if not lines:
+            return
+        try:
+            os.write(self._fd, b"\n".join(lines) + b"\n")
+        except OSError as e:
+            self._skip(len(lines), f"写入失败: {str(e)}")
+
+    def _skip(self, count: int, reason: str):
+        self.skipped += count
+        print(
+            f"{Fore.YELLOW}⚠️  事件文件 {self.path} 跳过 {count} 个事件（{reason}）{Style.RESET_ALL}",
+            file=sys.stderr,
+        )
+
+    def flush(self):
+        # 写线程意外退出时不再等待，避免整个运行卡住
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks and self._writer.is_alive():
+                self._queue.all_tasks_done.wait(0.1)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class RequestOutput:
+    """输出层入口：统计请求结果并分发给各输出端"""
+
+    def __init__(self, sinks: List[EventSink]):
+        self.sinks = sinks
+        self._lock = threading.Lock()
+        self.total = 0
+        self.failed = 0
+        self.status_counts: Counter = Counter()
+
+    def emit(self, event: dict):
+        with self._lock:
+            self.total += 1
+            self.status_counts[event["status"]] += 1
+            if not event["ok"]:
+                self.failed += 1
+        for sink in self.sinks:
+            sink.emit(event)
+
+    def snapshot(self) -> Dict:
+        """导出计数（用于跨进程汇总）"""
+        with self._lock:
+            return {
+                "total": self.total,
+                "failed": self.failed,
+                "status_counts": dict(self.status_counts),
+            }
+
+    def merge(self, snapshot: Dict):
+        """合并其他进程的计数"""
+        with self._lock:
+            self.total += snapshot["total"]
+            self.failed += snapshot["failed"]
+            self.status_counts.update(snapshot["status_counts"])
+
+    def print_summary(self):
+        """打印请求汇总"""
+        if not self.total:
+            return
+        statuses = ", ".join(f"{code}: {n}" for code, n in sorted(self.status_counts.items()))
+        color = Fore.RED if self.failed else Fore.GREEN
+        print(
+            f"\n🌐 请求汇总: 共 {self.total} 个请求, "
+            f"{color}{self.failed} 个不符合期望{Style.RESET_ALL} (状态码分布: {statuses})"
+        )
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+_output = RequestOutput([SummaryConsoleSink()])
+_config = ("summary", None)
+
+
+def get_output() -> RequestOutput:
+    """获取当前进程的输出层"""
+    return _output
+
+
+def output_config() -> tuple:
+    """当前输出层的配置 (mode, events_path)，用于在子进程中重建相同的输出层"""
+    return _config
+
+
+def configure_output(mode: str = "summary", events_path: Optional[str] = None) -> RequestOutput:
+    """配置当前进程的输出层
+
+    Args:
+        mode: 控制台输出模式，summary 或 verbose
+        events_path: JSON Lines 事件文件路径，为None时不写文件
+    """
+    global _output, _config
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"不支持的输出模式: {mode}")
+
+    sinks: List[EventSink] = [VerboseConsoleSink() if mode == "verbose" else SummaryConsoleSink()]
+    if events_path:
+        sinks.append(JsonLinesSink(events_path))
+
+    _output.close()
+    _output = RequestOutput(sinks)
+    _config = (mode, events_path)
+    return _output
@@ -0,0 +1,268 @@
+"""
+请求体大小扫描
+以 100B 到 10MB 的 content 依次请求 POST /post、PUT /post 和 POST /comment，
+记录每个大小的延迟和吞吐量（MB/s），找出服务器或MySQL开始拒绝请求（max_allowed_packet、
+列长度等）或明显变慢的大小。
+
+content 是中英文混排的markdown文本，按UTF-8字节数截取到目标大小；请求体预先编码，
+计时不包含客户端的JSON序列化开销。请求经过 make_request 发送，计入请求汇总、--events 和 --record；
+每个大小的延迟以 "POST /post@1MB" 的形式记入延迟注册表，基准结果库可以按大小分别比较。
+"""
+
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import requests
+from colorama import Fore, Style
+
+from . import codec
+from .base_test import BaseAPITest
+from .defaults import DEFAULT_REPEATS, DEFAULT_SIZES
+from .metrics import LatencyHistogram, LatencyRegistry, latency_registry
+
+
+# 扫描的接口: 名称 -> (方法, 路由)
+SWEEP_ENDPOINTS = {
+    "create_post": ("POST", "/post"),
+    "update_post": ("PUT", "/post"),
+    "create_comment": ("POST", "/comment"),
+}
+
+# 吞吐量(MB/s)低于之前各大小峰值的 1/SLOWDOWN_RATIO 时视为明显变慢
+SLOWDOWN_RATIO = 2.0
+
+MARKDOWN_CHUNK = """## 性能测试段落
+
+用户经常粘贴很长的markdown文档，其中包含中文、English text、`inline code` 和代码块：
+
+```go
+func handler(c *gin.Context) { c.JSON(200, gin.H{"ok": true}) }
+```
+
+- 列表项一：数据库写入
+- 列表项二：JSON 编解码
+
+"""
+
+
+def format_size(size: int) -> str:
+    """把字节数格式化为 100B / 3KB / 10MB"""
+    for unit, factor in (("MB", 1_000_000), ("KB", 1_000)):
+        if size >= factor:
+            return f"{size / factor:g}{unit}"
+    return f"{size}B"
+
+
+def make_content(size: int) -> str:
+    """生成UTF-8编码后恰好为 size 字节的markdown文本"""
+    chunk = MARKDOWN_CHUNK.encode("utf-8")
+    raw = (chunk * (size // len(chunk) + 1))[:size]
+    # 截断处可能切开多字节字符，去掉残缺部分后用ASCII补齐
+    text = raw.decode("utf-8", errors="ignore")
+    return text + "." * (size - len(text.encode("utf-8")))
+
+
+class SizeResult:
+    """某个接口在某个请求体大小下的结果"""
+
+    def __init__(self, endpoint: str, size: int):
+        self.endpoint = endpoint
+        self.size = size  # content 的字节数
+        self.body_size = 0  # 整个请求体的字节数
+        self.requests = 0
+        self.errors = 0
+        self.error_message = ""  # 第一个失败请求的状态码和错误信息
+        self.latency = LatencyHistogram()
+
+    @property
+    def throughput_mb(self) -> float:
+        """按中位延迟计算的上传吞吐量（MB/s）"""
+        p50 = self.latency.percentile(50)
+        return self.body_size / p50 / 1_000_000 if p50 and self.errors < self.requests else 0.0
+
+
+def find_limits(results: List[SizeResult]) -> Dict[str, Optional[SizeResult]]:
+    """找出第一个出现失败的大小，以及第一个吞吐量明显低于之前峰值的大小"""
+    rejected = next((r for r in results if r.errors), None)
+    slowdown = None
+    peak = 0.0
+    for result in results:
+        if result.errors:
+            break
+        if peak and result.throughput_mb < peak / SLOWDOWN_RATIO:
+            slowdown = result
+            break
+        peak = max(peak, result.throughput_mb)
+    return {"rejected": rejected, "slowdown": slowdown}
+
+
+class PayloadSweep(BaseAPITest):
+    """请求体大小扫描：准备用户和文章，然后按大小依次请求各接口"""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000/api/v1",
+        sizes=DEFAULT_SIZES,
+        repeats: int = DEFAULT_REPEATS,
+    ):
+        super().__init__(base_url, auto_cleanup=True)
+        self.sizes = sorted(set(sizes))
+        self.repeats = repeats
+        self.fixture = {}
+        self.sized_latencies = LatencyRegistry()  # 按 "路由@大小" 记录的延迟
+
+    def setup_fixture(self) -> bool:
+        """创建扫描使用的用户和文章（PUT /post 和 POST /comment 使用这篇文章）"""
+        username = f"payload_{uuid.uuid4().hex[:8]}"
+        password = "payload123"
+        response = self.make_request(
+            "POST",
+            "/register",
+            data={"username": username, "password": password, "email": f"{username}@example.com"},
+            description="注册扫描用户",
+            require_auth=False,
+        )
+        user_id = self.extract_id_from_response(response)
+        if not user_id or not self.login_and_get_token(user_id, password):
+            return False
+
+        response = self.make_request(
+            "POST",
+            "/post",
+            data={"title": "请求体大小扫描", "content": "初始内容", "user_id": user_id},
+            description="创建扫描文章",
+        )
+        post_id = self.extract_id_from_response(response)
+        if not post_id:
+            return False
+
+        self.fixture = {"user_id": user_id, "post_id": post_id}
+        return True
+
+    def cleanup_fixture(self):
+        """删除扫描用户和文章"""
+        for kind in ("post", "user"):
+            record_id = self.fixture.get(f"{kind}_id")
+            if record_id:
+                self.make_request("DELETE", f"/{kind}/{record_id}", description=f"删除扫描数据 {kind}")
+
+    def _body(self, endpoint: str, content: str) -> bytes:
+        if endpoint == "create_post":
+            data = {"title": "请求体大小扫描", "content": content, "user_id": self.fixture["user_id"]}
+        elif endpoint == "update_post":
+            data = {"id": self.fixture["post_id"], "title": "请求体大小扫描", "content": content}
+        else:
+            data = {"content": content, "user_id": self.fixture["user_id"], "post_id": self.fixture["post_id"]}
+        return codec.dumps(data)
+
+    def _delete_created(self, route: str, response: requests.Response):
+        """删除扫描中创建的文章或评论（不计时），避免大文本留在数据库中"""
+        record_id = self.extract_id_from_response(response)
+        if not record_id:
+            return
+        try:
+            self.make_request("DELETE", f"{route}/{record_id}", description=f"删除扫描数据 {route}")
+        except requests.exceptions.RequestException:
+            pass
+
+    def _run_size(self, endpoint: str, size: int, body: bytes) -> SizeResult:
+        method, route = SWEEP_ENDPOINTS[endpoint]
+        label = f"{route}@{format_size(size)}"
+        result = SizeResult(endpoint, size)
+        result.body_size = len(body)
+
+        for _ in range(self.repeats):
+            start = time.perf_counter()
+            try:
+                # 请求体已预先编码，make_request 直接发送
+                response = self.make_request(method, route, data=body, description=label)
+            except requests.exceptions.RequestException as e:
+                response = None
+                message = f"请求异常: {type(e).__name__}"
+            elapsed = time.perf_counter() - start
+
+            result.requests += 1
+            result.latency.record(elapsed)
+            self.sized_latencies.record(method, label, elapsed)
+            if response is not None and response.status_code == 200:
+                if method == "POST":
+                    self._delete_created(route, response)
+                continue
+
+            result.errors += 1
+            self.sized_latencies.record_error(method, label)
+            if response is not None:
+                try:
+                    message = f"{response.status_code} {response.json().get('msg', '')}"
+                except ValueError:
+                    message = f"{response.status_code} {response.text[:100]}"
+            result.error_message = result.error_message or message
+
+        color = Fore.RED if result.errors else Fore.GREEN
+        print(
+            f"  {color}{method} {route:<9}{Style.RESET_ALL}{format_size(size):>7}: "
+            f"p50 {result.latency.percentile(50) * 1000:>9.1f}ms, {result.throughput_mb:>8.2f} MB/s, "
+            f"错误 {result.errors}/{result.requests}"
+        )
+        return result
+
+    def run(self) -> Optional[Dict[str, List[SizeResult]]]:
+        """准备数据、按大小扫描并清理，准备失败时返回None"""
+        if not self.check_server_status():
+            self.print_error("服务器未运行！请先启动服务器: go run main.go")
+            return None
+        if not self.setup_fixture():
+            self.print_error("准备扫描数据失败")
+            self.cleanup_fixture()
+            return None
+
+        results = {endpoint: [] for endpoint in SWEEP_ENDPOINTS}
+        print(
+            f"{Fore.MAGENTA}📦 开始请求体大小扫描: {format_size(self.sizes[0])} ~ {format_size(self.sizes[-1])}, "
+            f"每个大小 {self.repeats} 次{Style.RESET_ALL}"
+        )
+        # make_request 按路由模板记录的延迟混合了各个大小，扫描结束后换成按大小记录的延迟
+        fixture_latencies = latency_registry.drain()
+        try:
+            for size in self.sizes:
+                content = make_content(size)
+                for endpoint in SWEEP_ENDPOINTS:
+                    results[endpoint].append(self._run_size(endpoint, size, self._body(endpoint, content)))
+        finally:
+            latency_registry.drain()
+            latency_registry.merge(fixture_latencies)
+            latency_registry.merge(self.sized_latencies)
+            self.cleanup_fixture()
+        return results
+
+
+def print_sweep_report(results: Dict[str, List[SizeResult]]):
+    """打印每个接口的大小-延迟曲线，以及开始失败和明显变慢的大小"""
+    print(f"\n{Fore.CYAN}{'=' * 70}")
+    print("📊 请求体大小扫描报告")
+    print(f"{'=' * 70}{Style.RESET_ALL}")
+
+    for endpoint, sizes in results.items():
+        method, route = SWEEP_ENDPOINTS[endpoint]
+        limits = find_limits(sizes)
+        print(f"\n{Fore.YELLOW}  {method} {route}{Style.RESET_ALL}")
+        print(f"  {'大小':>6}{'p50':>12}{'p99':>12}{'MB/s':>10}{'错误':>6}")
+        for result in sizes:
+            marker = ""
+            if result is limits["rejected"]:
+                marker = f"  {Fore.RED}← 开始失败: {result.error_message}{Style.RESET_ALL}"
+            elif result is limits["slowdown"]:
+                marker = f"  {Fore.MAGENTA}← 明显变慢{Style.RESET_ALL}"
+            print(
+                f"  {format_size(result.size):>8}{result.latency.percentile(50) * 1000:>10.1f}ms"
+                f"{result.latency.percentile(99) * 1000:>10.1f}ms{result.throughput_mb:>10.2f}"
+                f"{result.errors:>8}{marker}"
+            )
+        if not limits["rejected"] and not limits["slowdown"]:
+            print(f"  {Fore.GREEN}✅ 所有大小都成功，吞吐量没有明显下降{Style.RESET_ALL}")
+
+
+def sweep_passed(results: Optional[Dict[str, List[SizeResult]]]) -> bool:
+    """扫描是否完成（失败的大小是要找的拐点，只在报告中标出，不算测试失败）"""
+    return results is not None
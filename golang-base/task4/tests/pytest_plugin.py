@@ -0,0 +1,188 @@
+"""
+pytest 插件
+把各测试套件的 TEST_STEPS 映射为 pytest 测试项，使 pytest 可以选择、并行运行测试套件并统计每一步的耗时：
+
+    uv run pytest tests/ -v --durations=10
+    uv run pytest tests/test_post_api.py -k update --api-fake
+    uv run --with pytest-xdist pytest tests/ -n 4 --dist loadgroup --api-fake
+
+- 每个套件是一个收集器，每个步骤是一个测试项（如 tests/test_post_api.py::PostAPITest::test_update_post）；
+  同一套件的步骤共享一个套件实例，第一个步骤执行前运行 SETUP_STEP，最后一个步骤结束后运行 CLEANUP_STEP
+- 步骤之间有数据依赖：用 -k 等方式只选中部分步骤时，前面未选中的步骤会先静默执行；
+  每个套件标记为同一个 xdist_group，配合 --dist loadgroup 整个套件在同一个工作进程中按顺序执行
+- 步骤抛出异常、返回 False 或有请求的状态码不符合期望时测试失败；
+  套件 KNOWN_ISSUES 中列出的步骤（断言了服务器尚未实现的校验）标记为 xfail
+- 会话级 fixture: api_base_url（被测服务器，GET /health 探测不到时跳过所有API测试）、
+  api_user（已登录的会话用户，文章/评论套件用它作为作者，不再各自注册）
+
+由项目根目录的 conftest.py 加载。
+"""
+
+import os
+import uuid
+from typing import Optional
+
+import pytest
+import requests
+
+from .auth_helper import AuthenticatedAPITest
+from .base_test import BaseAPITest
+from .readiness import readiness_probe
+
+DEFAULT_BASE_URL = "http://localhost:8000/api/v1"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("blog-api", "博客系统API测试")
+    group.addoption(
+        "--api-base-url",
+        default=os.environ.get("API_BASE_URL", DEFAULT_BASE_URL),
+        help=f"被测API的基础URL（默认: 环境变量 API_BASE_URL 或 {DEFAULT_BASE_URL}）",
+    )
+    group.addoption(
+        "--api-ready-timeout",
+        type=float,
+        default=0,
+        help="等待服务器就绪的最长时间（秒），默认只探测一次，不可达时立即跳过API测试",
+    )
+    group.addoption(
+        "--api-fake",
+        action="store_true",
+        help="在每个pytest进程中启动进程内替身服务器，测试指向它（无需Go服务器和MySQL）",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "xdist_group(name): pytest-xdist --dist loadgroup 时同组测试在同一进程中执行")
+    config.addinivalue_line("markers", "api_suite(name): 由测试套件步骤生成的API测试")
+
+
+def pytest_pycollect_makeitem(collector, name, obj):
+    """在 tests/test_*.py 中收集声明了 TEST_STEPS 的测试套件类"""
+    if (
+        isinstance(obj, type)
+        and issubclass(obj, BaseAPITest)
+        and obj.TEST_STEPS
+        and obj.__module__ == collector.obj.__name__
+    ):
+        return SuiteCollector.from_parent(collector, name=name, suite_class=obj)
+    return None
+
+
+class SuiteCollector(pytest.Collector):
+    """一个测试套件：按 TEST_STEPS 顺序生成测试项，并持有共享的套件实例"""
+
+    def __init__(self, *, suite_class, **kwargs):
+        super().__init__(**kwargs)
+        self.suite_class = suite_class
+        self.suite: Optional[BaseAPITest] = None
+        self.setup_failed = False
+        self.completed_steps = set()
+
+    def collect(self):
+        group = self.nodeid
+        for step in self.suite_class.TEST_STEPS:
+            item = pytest.Function.from_parent(self, name=step, callobj=_make_step(self, step))
+            item.add_marker(pytest.mark.xdist_group(name=group))
+            item.add_marker(pytest.mark.api_suite(name=self.name))
+            reason = self.suite_class.KNOWN_ISSUES.get(step)
+            if reason:
+                item.add_marker(pytest.mark.xfail(reason=reason, strict=False))
+            yield item
+
+    def get_suite(self, base_url: str, user: dict) -> BaseAPITest:
+        """第一次使用时创建套件实例并运行 SETUP_STEP"""
+        if self.suite is None:
+            self.suite = self.suite_class(base_url, auto_cleanup=True)
+            if isinstance(self.suite, AuthenticatedAPITest):
+                self.suite.preset_user = user
+            if self.suite_class.SETUP_STEP:
+                self.setup_failed = not getattr(self.suite, self.suite_class.SETUP_STEP)()
+        if self.setup_failed:
+            pytest.fail(f"{self.name}.{self.suite_class.SETUP_STEP} 准备测试数据失败", pytrace=False)
+        return self.suite
+
+    def run_step(self, step: str, base_url: str, user: dict):
+        """执行一个步骤；之前未执行的步骤（被 -k 等取消选择）先静默执行"""
+        suite = self.get_suite(base_url, user)
+        for previous in self.suite_class.TEST_STEPS:
+            if previous == step:
+                break
+            if previous not in self.completed_steps:
+                self.completed_steps.add(previous)
+                try:
+                    getattr(suite, previous)()
+                except Exception:
+                    pass
+
+        self.completed_steps.add(step)
+        failed_before = suite.failed_request_count
+        result = getattr(suite, step)()
+        failed = suite.failed_request_count - failed_before
+        if result is False:
+            pytest.fail(f"{step} 返回失败", pytrace=False)
+        if failed:
+            pytest.fail(f"{step}: {failed} 个请求的状态码不符合期望", pytrace=False)
+
+    def teardown(self):
+        """最后一个步骤结束后清理本套件的数据，会话用户由 api_user fixture 删除"""
+        if self.suite is None:
+            return
+        preset = getattr(self.suite, "preset_user", None)
+        created = getattr(self.suite, "created_user_ids", None)
+        if preset and created and preset["id"] in created:
+            created.remove(preset["id"])
+        if self.suite_class.CLEANUP_STEP:
+            getattr(self.suite, self.suite_class.CLEANUP_STEP)()
+        self.suite = None
+
+
+def _make_step(collector: SuiteCollector, step: str):
+    def run_step(api_base_url, api_user):
+        collector.run_step(step, api_base_url, api_user)
+
+    method = getattr(collector.suite_class, step)
+    run_step.__name__ = step
+    run_step.__doc__ = method.__doc__
+    return run_step
+
+
+@pytest.fixture(scope="session")
+def api_base_url(request):
+    """被测服务器的基础URL；--api-fake 时启动替身服务器，服务器不可达时跳过"""
+    if request.config.getoption("--api-fake"):
+        from .fake_server import start_fake_server
+
+        server = start_fake_server()
+        yield server.base_url
+        server.shutdown()
+        server.server_close()
+        return
+
+    base_url = request.config.getoption("--api-base-url")
+    readiness_probe.timeout = request.config.getoption("--api-ready-timeout")
+    if not readiness_probe.wait_until_ready(base_url):
+        pytest.skip(f"服务器不可达: {base_url}（启动 go run main.go，或使用 --api-fake）")
+    yield base_url
+
+
+@pytest.fixture(scope="session")
+def api_user(api_base_url):
+    """会话级的已登录用户 {"id", "username", "password", "token"}，会话结束时删除"""
+    username = f"pytest_{uuid.uuid4().hex[:8]}"
+    password = "pytest123456"
+    session = requests.Session()
+    response = session.post(
+        f"{api_base_url}/register",
+        json={"username": username, "password": password, "email": f"{username}@example.com"},
+        timeout=30,
+    )
+    assert response.status_code == 200, f"注册会话用户失败: {response.text}"
+    user_id = response.json()["data"]["id"]
+    response = session.post(f"{api_base_url}/login", json={"id": user_id, "password": password}, timeout=30)
+    assert response.status_code == 200, f"会话用户登录失败: {response.text}"
+    token = response.json()["data"]["token"]
+
+    yield {"id": user_id, "username": username, "password": password, "token": token}
+
+    session.delete(f"{api_base_url}/user/{user_id}", headers={"Authorization": f"Bearer {token}"}, timeout=30)
@@ -0,0 +1,208 @@
+"""
+轻量HTTP/1.1客户端
+基于 asyncio streams 的最小keep-alive客户端，只实现博客API需要的部分：
+JSON请求体、Bearer等固定请求头、Content-Length（以及Go的net/http对较大响应使用的chunked）响应体。
+
+与 async_http 提供相同的接口（create_session / send / BufferedResponse），可以作为
+make_request_async 的后端。没有 aiohttp 那样的请求对象、中间件和头部多值字典，每个请求的客户端开销小得多，
+单个进程可以发出多得多的请求；只支持 http://，不支持重定向、压缩和代理。
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from . import codec
+from .response import BufferedResponse
+
+# 单个会话允许的最大并发连接数
+DEFAULT_CONNECTION_LIMIT = 100
+
+# 每个会话缓存的请求头组合数上限（不同的token会产生不同的组合）
+HEADER_CACHE_SIZE = 256
+
+# 不转发给服务器的请求头：由客户端自己生成，或客户端不支持（压缩）
+_SKIPPED_HEADERS = {"host", "content-length", "connection", "accept-encoding", "transfer-encoding"}
+
+
+def is_available() -> bool:
+    """只依赖标准库，始终可用"""
+    return True
+
+
+def _split_url(url: str, _cache: Dict[str, Tuple[str, int, str]] = {}) -> Tuple[str, int, str, str]:
+    """把URL拆成 (主机, 端口, Host头, 路径)，按 scheme://host:port 前缀缓存解析结果"""
+    scheme_end = url.find("://")
+    path_start = url.find("/", scheme_end + 3)
+    prefix = url if path_start < 0 else url[:path_start]
+    target = _cache.get(prefix)
+    if target is None:
+        parts = urlsplit(prefix)
+        if parts.scheme != "http":
+            raise ValueError(f"轻量客户端只支持 http://: {url}")
+        target = _cache[prefix] = (parts.hostname, parts.port or 80, parts.netloc)
+    host, port, netloc = target
+    return host, port, netloc, (url[path_start:] if path_start >= 0 else "/")
+
+
+class _Connection:
+    __slots__ = ("reader", "writer")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class RawHTTPSession:
+    """按 (主机, 端口) 保存空闲连接的会话，必须在运行中的事件循环内创建"""
+
+    def __init__(self, limit: int = DEFAULT_CONNECTION_LIMIT):
+        self.limit = limit
+        self.closed = False
+        self._slots = asyncio.Semaphore(limit)
+        self._idle: Dict[Tuple[str, int], List[_Connection]] = {}
+        self._header_blocks: Dict[tuple, bytes] = {}
+
+    def _header_block(self, netloc: str, headers: Optional[Dict[str, str]]) -> bytes:
+        """把固定的请求头编码一次并缓存（同一会话的请求头组合很少）"""
+        key = (netloc, tuple(headers.items()) if headers else ())
+        block = self._header_blocks.get(key)
+        if block is None:
+            if len(self._header_blocks) >= HEADER_CACHE_SIZE:
+                self._header_blocks.clear()
+            lines = [f"Host: {netloc}"]
+            for name, value in (headers or {}).items():
+                if name.lower() not in _SKIPPED_HEADERS:
+                    lines.append(f"{name}: {value}")
+            block = self._header_blocks[key] = ("\r\n".join(lines) + "\r\n").encode("latin-1")
+        return block
+
+    async def _acquire(self, host: str, port: int) -> Tuple[_Connection, bool]:
+        """取一个空闲连接，没有时新建；返回 (连接, 是否复用)"""
+        idle = self._idle.get((host, port))
+        while idle:
+            connection = idle.pop()
+            if not connection.reader.at_eof():
+                return connection, True
+            connection.close()
+        return await self._connect(host, port), False
+
+    @staticmethod
+    async def _connect(host: str, port: int) -> _Connection:
+        reader, writer = await asyncio.open_connection(host, port)
+        return _Connection(reader, writer)
+
+    def _release(self, host: str, port: int, connection: _Connection):
+        self._idle.setdefault((host, port), []).append(connection)
+
+    async def request(
+        self, method: str, url: str, body: Optional[bytes], headers: Optional[Dict[str, str]]
+    ) -> BufferedResponse:
+        host, port, netloc, path = _split_url(url)
+        head = f"{method} {path} HTTP/1.1\r\n".encode("latin-1") + self._header_block(netloc, headers)
+        if body is not None:
+            head += b"Content-Length: %d\r\n" % len(body)
+        head += b"\r\n"
+
+        async with self._slots:
+            connection, reused = await self._acquire(host, port)
+            try:
+                try:
+                    status, response_headers, content, keep_alive = await self._exchange(connection, head, body)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    if not reused:
+                        raise
+                    # 服务器关闭了空闲的keep-alive连接，换一个新连接重发一次
+                    connection.close()
+                    connection = await self._connect(host, port)
+                    status, response_headers, content, keep_alive = await self._exchange(connection, head, body)
+            except BaseException:
+                connection.close()
+                raise
+            if keep_alive:
+                self._release(host, port, connection)
+            else:
+                connection.close()
+        return BufferedResponse(status, content, response_headers, url)
+
+    @staticmethod
+    async def _exchange(connection: _Connection, head: bytes, body: Optional[bytes]):
+        """发送请求并读取完整响应，返回 (状态码, 响应头, 响应体, 连接是否可复用)"""
+        writer, reader = connection.writer, connection.reader
+        writer.write(head + body if body else head)
+        await writer.drain()
+
+        raw = await reader.readuntil(b"\r\n\r\n")
+        lines = raw[:-4].decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip()] = value.strip()
+        lowered = {name.lower(): value for name, value in headers.items()}
+
+        if "content-length" in lowered:
+            length = int(lowered["content-length"])
+            content = await reader.readexactly(length) if length else b""
+        elif lowered.get("transfer-encoding", "").lower() == "chunked":
+            content = await _read_chunked(reader)
+        else:
+            # 既没有长度也不是chunked：读到连接关闭为止
+            content = await reader.read()
+            return status, headers, content, False
+
+        keep_alive = lowered.get("connection", "").lower() != "close" and not lines[0].startswith("HTTP/1.0")
+        return status, headers, content, keep_alive
+
+    async def close(self):
+        self.closed = True
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+        if size == 0:
+            # 跳过 trailer，直到空行
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+def create_session(limit: int = DEFAULT_CONNECTION_LIMIT) -> RawHTTPSession:
+    """创建会话，必须在运行中的事件循环内调用"""
+    return RawHTTPSession(limit)
+
+
+async def send(
+    session: RawHTTPSession,
+    method: str,
+    url: str,
+    data: Union[Dict, bytes, None] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> BufferedResponse:
+    """发送请求并完整读取响应体，data 以JSON编码（bytes 视为已编码的请求体）
+
+    Raises:
+        ConnectionError: 网络层错误（连接失败、超时、响应格式错误等）
+    """
+    body = None
+    if data is not None:
+        body = data if type(data) is bytes else codec.dumps(data)
+        headers = {"Content-Type": "application/json", **(headers or {})}
+    try:
+        if timeout:
+            return await asyncio.wait_for(session.request(method, url, body, headers), timeout)
+        return await session.request(method, url, body, headers)
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ValueError) as e:
+        raise ConnectionError(f"{method} {url}: {e}") from e
@@ -0,0 +1,100 @@
+"""
+服务器就绪检查
+每个进程对每个API地址只探测一次，结果在所有测试套件之间共享；探测成功后写入环境变量，
+由 run_tests.py 启动的工作进程（--jobs、--workers）直接复用，不再重复探测。
+
+探测请求 GET /health：服务器只 ping 数据库连接，不读写任何表。
+- 200: 就绪
+- 404: 旧版本服务器没有健康检查路由，改为向 POST /login 发送空请求体：博客API在绑定参数时就返回400和
+  {code, msg} 响应外壳（不查库、不计算bcrypt），视为就绪；其他HTTP服务或错误的路径前缀（如 /api/v2）仍返回404，不算就绪
+- 其他状态码（如数据库不可用时的503）或连接失败: 以指数退避重试，直到超时
+"""
+
+import os
+import threading
+import time
+from typing import Dict
+
+import requests
+from colorama import Fore, Style
+
+from .defaults import DEFAULT_READY_TIMEOUT
+
+# 已就绪的API地址列表（空格分隔），子进程从环境变量继承探测结果
+READY_ENV = "BLOG_API_READY"
+
+# 退避参数（秒）：首次重试间隔、最大间隔，以及单次探测请求的超时时间
+INITIAL_BACKOFF = 0.05
+MAX_BACKOFF = 0.5
+PROBE_TIMEOUT = 1.0
+
+
+def _is_api_response(response: requests.Response) -> bool:
+    """响应体是否为博客API的 {code, msg} 响应外壳"""
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and "code" in body and "msg" in body
+
+
+class ReadinessProbe:
+    """以API地址为键缓存探测结果，线程安全"""
+
+    def __init__(self, timeout: float = DEFAULT_READY_TIMEOUT):
+        self.timeout = timeout  # 等待就绪的最长时间（秒），0表示只探测一次
+        self._lock = threading.Lock()
+        self._results: Dict[str, bool] = {}
+
+    @staticmethod
+    def _probe(session: requests.Session, base_url: str) -> bool:
+        try:
+            response = session.get(f"{base_url}/health", timeout=PROBE_TIMEOUT)
+            if response.status_code == 404:
+                response = session.post(f"{base_url}/login", json={}, timeout=PROBE_TIMEOUT)
+                return response.status_code == 400 and _is_api_response(response)
+        except requests.exceptions.RequestException:
+            return False
+        return response.status_code == 200
+
+    def _wait(self, base_url: str) -> bool:
+        deadline = time.monotonic() + self.timeout
+        backoff = INITIAL_BACKOFF
+        waiting = False
+        with requests.Session() as session:
+            while True:
+                if self._probe(session, base_url):
+                    if waiting:
+                        print(f"{Fore.BLUE}ℹ️  服务器已就绪{Style.RESET_ALL}")
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                if not waiting:
+                    waiting = True
+                    print(f"{Fore.YELLOW}⏳ 等待服务器就绪（最多 {self.timeout:g} 秒）: {base_url}{Style.RESET_ALL}")
+                time.sleep(min(backoff, remaining))
+                backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def wait_until_ready(self, base_url: str) -> bool:
+        """服务器是否就绪；同一进程内对同一地址只探测一次（就绪结果也会传给子进程）"""
+        with self._lock:
+            if base_url in self._results:
+                return self._results[base_url]
+            if base_url in os.environ.get(READY_ENV, "").split():
+                self._results[base_url] = True
+                return True
+
+            ready = self._results[base_url] = self._wait(base_url)
+            if ready:
+                os.environ[READY_ENV] = " ".join(filter(None, [os.environ.get(READY_ENV), base_url]))
+            return ready
+
+    def reset(self):
+        """清除缓存的探测结果（服务器重启后重新探测）"""
+        with self._lock:
+            self._results.clear()
+
+
+# 进程内共享的探测实例
+readiness_probe = ReadinessProbe()
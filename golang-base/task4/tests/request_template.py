@@ -0,0 +1,127 @@
+"""
+预编码的请求模板
+压测热循环中的请求体几乎不变（文章标题和正文、评论内容），只有 user_id、post_id 或计数器不同。
+模板在创建时把路由和请求体中不变的部分编码为字节片段，发送时只编码可变字段并拼接，
+不再每次对整个请求体（包括上千字节的markdown正文）做JSON编码。
+
+    template = RequestTemplate("POST", "/comment", {
+        "content": "写得太好了！",
+        "user_id": Slot("user_id"),
+        "post_id": Slot("post_id"),
+    })
+    self.make_request(template.method, template.path(), data=template.render(user_id=1, post_id=2))
+
+路由中的 {name} 同样是可变字段：RequestTemplate("GET", "/post/{post_id}").path(post_id=3)。
+请求头由各HTTP客户端按会话缓存（raw_http 缓存编码后的请求头块），不在模板中处理。
+"""
+
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import codec
+
+_slot_ids = itertools.count()
+
+
+class Slot:
+    """请求体中的可变字段，render 时按名称填入"""
+
+    __slots__ = ("name", "marker")
+
+    def __init__(self, name: str):
+        self.name = name
+        # 编码后以带引号的唯一字符串出现，用于切分静态片段
+        self.marker = f"__request_template_slot_{next(_slot_ids)}__"
+
+
+def _encode_value(value: Any) -> bytes:
+    if type(value) is int:
+        return b"%d" % value
+    return codec.dumps(value)
+
+
+def _replace_slots(node: Any, slots: List[Slot]) -> Any:
+    if isinstance(node, Slot):
+        slots.append(node)
+        return node.marker
+    if isinstance(node, dict):
+        return {key: _replace_slots(value, slots) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_replace_slots(value, slots) for value in node]
+    return node
+
+
+def _split_body(body: Any) -> Tuple[bytes, Tuple[str, ...]]:
+    """把请求体编码为 b'静态片段0%s静态片段1...' 形式的格式串和各 %s 对应的字段名；没有字段时返回编码结果本身"""
+    slots: List[Slot] = []
+    encoded = codec.dumps(_replace_slots(body, slots))
+    if not slots:
+        return encoded, ()
+    encoded = encoded.replace(b"%", b"%%")
+    segments, names = [], []
+    for slot in slots:
+        quoted = codec.dumps(slot.marker)
+        before, found, encoded = encoded.partition(quoted)
+        if not found:
+            raise ValueError(f"请求模板中的字段 {slot.name} 未出现在编码结果中")
+        segments.append(before)
+        names.append(slot.name)
+    segments.append(encoded)
+    return b"%s".join(segments), tuple(names)
+
+
+def _split_route(route: str) -> Tuple[str, Tuple[str, ...]]:
+    """把 /post/{post_id} 转换为 /post/%s 形式的格式串和字段名"""
+    segments, names = [], []
+    rest = route.replace("%", "%%")
+    while "{" in rest:
+        before, _, rest = rest.partition("{")
+        name, _, rest = rest.partition("}")
+        segments.append(before)
+        names.append(name)
+    segments.append(rest)
+    return "%s".join(segments), tuple(names)
+
+
+class RequestTemplate:
+    """方法、路由和请求体预先编码的请求"""
+
+    __slots__ = ("method", "route", "_route_pattern", "_route_fields", "_body_pattern", "_body_fields")
+
+    def __init__(self, method: str, route: str, body: Optional[Dict[str, Any]] = None):
+        self.method = method.upper()
+        self.route = route
+        self._route_pattern, self._route_fields = _split_route(route)
+        if body is None:
+            self._body_pattern, self._body_fields = None, ()
+        else:
+            self._body_pattern, self._body_fields = _split_body(body)
+
+    @property
+    def path_fields(self) -> Tuple[str, ...]:
+        """路由中的字段名"""
+        return self._route_fields
+
+    def path(self, **values) -> str:
+        """填入路由中的字段"""
+        if not self._route_fields:
+            return self.route
+        return self._route_pattern % tuple([values[name] for name in self._route_fields])
+
+    def render(self, **values) -> Optional[bytes]:
+        """填入请求体中的字段，返回编码后的请求体；没有请求体时返回None"""
+        if not self._body_fields:
+            return self._body_pattern
+        return self._body_pattern % tuple([_encode_value(values[name]) for name in self._body_fields])
+
+
+# 按调用方给定的键缓存模板，测试套件每次实例化时复用同一进程内已编码的模板
+_cache: Dict[Any, RequestTemplate] = {}
+
+
+def cached_template(key: Any, method: str, route: str, body: Optional[Dict[str, Any]] = None) -> RequestTemplate:
+    """返回键为 key 的模板，首次调用时按参数创建；同一个键的方法、路由和请求体结构必须一致"""
+    template = _cache.get(key)
+    if template is None:
+        template = _cache[key] = RequestTemplate(method, route, body)
+    return template
@@ -0,0 +1,40 @@
+"""
+已缓冲的HTTP响应对象
+为非requests后端（异步客户端等）提供与requests.Response一致的常用接口
+"""
+
+from typing import Any, Dict, Optional
+
+from . import codec
+
+
+class BufferedResponse:
+    """响应体已完整读取的HTTP响应
+
+    提供 status_code / content / text / headers / json()，
+    使 extract_id_from_response、assert_response_success 等工具方法可以直接复用。
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        content: bytes,
+        headers: Optional[Dict[str, str]] = None,
+        url: str = "",
+    ):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = url
+
+    @property
+    def text(self) -> str:
+        """以UTF-8解码的响应体"""
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        """解析JSON响应体，解析失败时抛出ValueError"""
+        return codec.loads(self.content)
+
+    def __repr__(self):
+        return f"<BufferedResponse [{self.status_code}]>"
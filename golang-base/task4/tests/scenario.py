@@ -0,0 +1,697 @@
+"""
+声明式场景
+用JSON（或YAML）文件描述用户、步骤、数据生成器、权重和断言，编译为执行计划后，
+由同步引擎（--scenario）、线程压测引擎（--load --scenario）或异步压测引擎（--load --scenario --engine async）执行，
+新的流量形态不需要再写一个测试模块。示例见 tests/scenarios/blog_mix.json。
+
+    {
+      "name": "blog_mix",
+      "seed": 42,
+      "users": {"author": {"count": 1}, "reader": {"count": 3, "password": "reader123"}},
+      "setup": [
+        {"name": "create_post", "as": "author", "repeat": 3, "request": "POST /post",
+         "body": {"title": {"$seq": "文章 "}, "content": {"$text": 1000}, "user_id": {"$ref": "user_id"}},
+         "expect": {"schema": "Post"}, "save": {"post_id": "id"}, "cleanup": "DELETE /post/{id}"}
+      ],
+      "traffic": {
+        "requests": 20,
+        "steps": [
+          {"name": "read_post", "weight": 8, "as": "reader", "request": "GET /post/{post_id}",
+           "expect": {"schema": "Post", "max_ms": 500}}
+        ]
+      }
+    }
+
+- users:    每轮迭代注册并登录的用户，按角色分组；注册成功的用户ID保存为变量 <角色>_id
+- setup:    每轮迭代按顺序执行的步骤，repeat 为重复次数
+- traffic:  每轮迭代按 weight 随机抽取 requests 个步骤执行；设置 seed 时每轮的随机序列相同
+- as:       发出请求的角色，每次从该角色的用户中随机选一个，请求携带其token
+- 变量:     路由中的 {name} 和 {"$ref": "name"} 引用变量；user_id 是当前用户的ID，
+            其他变量由 save 保存，保存过多个值时每次随机取一个
+- 数据生成器: {"$ref": "name"} 变量；{"$choice": [...]} 随机取一个；{"$seq": "前缀"} 前缀加进程内递增序号；
+            {"$text": N} N个字符的正文（编译时生成，作为请求模板的静态部分）
+- expect:   status（默认200）、code（响应外壳的code）、schema（User/Post/Comment）、max_ms（延迟上限）
+- save:     {变量名: 响应 data 中的字段路径}，如 {"post_id": "id", "author": "user.id"}
+- cleanup:  删除本步骤创建的数据，{id} 为响应的 data.id；每轮结束时按创建的逆序删除，最后删除用户
+
+编译在加载时完成一次：请求体预编码为 request_template 模板，生成器编译为闭包，字段路径预先拆分，
+权重转换为累积权重；执行时只做变量查找、模板拼接和比较。任一步骤失败则结束本轮，直接进入清理。
+YAML 需要可选依赖 PyYAML，安装方式: uv pip install pyyaml
+"""
+
+import asyncio
+import itertools
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from contextlib import redirect_stdout
+from functools import partial
+from random import Random
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from colorama import Fore, Style
+
+from . import codec
+from .base_test import ASYNC_CLIENT_MODULES, BaseAPITest
+from .defaults import DEFAULT_ASYNC_CLIENT, SCENARIO_DIR
+from .loadgen import CLEANUP_STEP, LoadTestResult
+from .request_template import RequestTemplate, Slot
+from .schema import Comment, LoginResult, Post, SchemaError, User, parse_response
+
+# expect.schema 可选的模型
+SCHEMAS = {"User": User, "Post": Post, "Comment": Comment}
+
+METHODS = ("GET", "POST", "PUT", "DELETE")
+
+DEFAULT_PASSWORD = "scenario123"
+
+# $text 生成正文时循环使用的文本
+_FILLER = "声明式场景生成的正文内容，用于模拟真实的文章和评论长度。Scenario generated content. "
+
+# $seq 的进程内序号
+_sequence = itertools.count(1)
+
+_STEP_KEYS = {"name", "as", "request", "body", "expect", "save", "cleanup"}
+_EXPECT_KEYS = {"status", "code", "schema", "max_ms"}
+
+
+class ScenarioError(ValueError):
+    """场景文件格式错误"""
+
+
+class IterationContext:
+    """一轮迭代的状态：已注册的用户、变量和待清理的数据"""
+
+    __slots__ = ("suffix", "rng", "users", "vars", "created")
+
+    def __init__(self, suffix: str, rng: Random):
+        self.suffix = suffix
+        self.rng = rng
+        self.users: Dict[str, List[dict]] = {}
+        self.vars: Dict[str, list] = {}
+        self.created: List[Tuple[str, str, Optional[str]]] = []  # (路径, 描述, token)
+
+    def lookup(self, name: str, actor: Optional[dict]) -> Any:
+        if name == "user_id":
+            return actor["id"]
+        values = self.vars.get(name)
+        if not values:
+            raise LookupError(f"变量 {name} 尚无可用的值")
+        return values[0] if len(values) == 1 else self.rng.choice(values)
+
+    def save(self, name: str, value: Any):
+        self.vars.setdefault(name, []).append(value)
+
+
+def _text(length: int) -> str:
+    repeats = length // len(_FILLER) + 1
+    return (_FILLER * repeats)[:length]
+
+
+def _compile_generator(kind: str, arg: Any, where: str, refs: set) -> Callable:
+    """数据生成器编译为 (上下文, 当前用户) -> 值 的闭包"""
+    if kind == "$ref":
+        if not isinstance(arg, str):
+            raise ScenarioError(f"{where}: $ref 应为变量名")
+        refs.add(arg)
+        return lambda context, actor: context.lookup(arg, actor)
+    if kind == "$choice":
+        if not isinstance(arg, list) or not arg:
+            raise ScenarioError(f"{where}: $choice 应为非空列表")
+        options = tuple(arg)
+        return lambda context, actor: context.rng.choice(options)
+    if kind == "$seq":
+        if not isinstance(arg, str):
+            raise ScenarioError(f"{where}: $seq 应为前缀字符串")
+        return lambda context, actor: f"{arg}{next(_sequence)}"
+    raise ScenarioError(f"{where}: 未知的数据生成器 {kind}")
+
+
+def _compile_body(body: Any, where: str, refs: set) -> Tuple[Any, Tuple[Tuple[str, Callable], ...]]:
+    """把请求体中的生成器替换为 Slot，返回 (模板请求体, ((Slot名, 生成器), ...))"""
+    generators = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if len(node) == 1:
+                (key, arg), = node.items()
+                if isinstance(key, str) and key.startswith("$"):
+                    if key == "$text":
+                        if type(arg) is not int or arg < 0:
+                            raise ScenarioError(f"{where}: $text 应为非负整数")
+                        return _text(arg)
+                    generator = _compile_generator(key, arg, where, refs)
+                    slot = Slot(f"g{len(generators)}")
+                    generators.append((slot.name, generator))
+                    return slot
+            return {key: walk(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [walk(value) for value in node]
+        return node
+
+    return walk(body), tuple(generators)
+
+
+def _parse_request(text: Any, where: str) -> Tuple[str, str]:
+    method, _, route = text.partition(" ") if isinstance(text, str) else ("", "", "")
+    method = method.upper()
+    if method not in METHODS or not route.startswith("/"):
+        raise ScenarioError(f"{where}: request 应为 \"方法 /路由\"，如 \"GET /post/{{post_id}}\"")
+    return method, route.strip()
+
+
+class Step:
+    """编译后的步骤"""
+
+    __slots__ = (
+        "name", "role", "method", "route", "template", "route_refs", "generators", "auth",
+        "status", "code", "schema", "max_seconds", "saves", "cleanup", "needs_envelope",
+    )
+
+    def __init__(self, name: str, role: str, method: str, route: str, body: Any = None,
+                 expect: Optional[dict] = None, save: Optional[dict] = None, cleanup: Optional[str] = None,
+                 auth: bool = True, where: str = "", refs: Optional[set] = None):
+        refs = set() if refs is None else refs
+        expect = expect or {}
+        if not isinstance(expect, dict) or set(expect) - _EXPECT_KEYS:
+            raise ScenarioError(f"{where}: expect 只能包含 {', '.join(sorted(_EXPECT_KEYS))}")
+        if body is not None and method not in ("POST", "PUT"):
+            raise ScenarioError(f"{where}: {method} 请求不能带请求体")
+
+        self.name = name
+        self.role = role
+        self.method = method
+        self.route = route
+        self.auth = auth
+        template_body, self.generators = _compile_body(body, where, refs) if body is not None else (None, ())
+        self.template = RequestTemplate(method, route, template_body)
+        self.route_refs = self.template.path_fields
+        refs.update(self.route_refs)
+
+        self.status = expect.get("status", 200)
+        self.code = expect.get("code")
+        schema = expect.get("schema")
+        if schema is not None and schema not in SCHEMAS:
+            raise ScenarioError(f"{where}: 未知的 schema {schema}（可选: {', '.join(SCHEMAS)}）")
+        self.schema = SCHEMAS.get(schema)
+        max_ms = expect.get("max_ms")
+        self.max_seconds = max_ms / 1000 if max_ms else None
+
+        if save is not None and not isinstance(save, dict):
+            raise ScenarioError(f"{where}: save 应为 {{变量名: 字段路径}}")
+        self.saves = tuple((name, tuple(path.split("."))) for name, path in (save or {}).items())
+
+        self.cleanup = None
+        if cleanup is not None:
+            cleanup_method, cleanup_route = _parse_request(cleanup, f"{where}.cleanup")
+            self.cleanup = RequestTemplate(cleanup_method, cleanup_route)
+            if cleanup_method != "DELETE" or set(self.cleanup.path_fields) - {"id"}:
+                raise ScenarioError(f"{where}: cleanup 应为 \"DELETE /路由/{{id}}\"")
+
+        self.needs_envelope = bool(self.code is not None or self.schema or self.saves or self.cleanup)
+
+    def prepare(self, context: IterationContext) -> Tuple[dict, str, Optional[bytes], Optional[str]]:
+        """选出当前用户并生成请求，返回 (用户, 路径, 请求体, token)
+
+        Raises:
+            LookupError: 角色没有可用的用户，或引用的变量尚无值
+        """
+        users = context.users.get(self.role)
+        if not users:
+            raise LookupError(f"角色 {self.role} 没有可用的用户")
+        actor = users[0] if len(users) == 1 else context.rng.choice(users)
+        return actor, self.render(context, actor), self.render_body(context, actor), actor.get("token")
+
+    def render(self, context: IterationContext, actor: Optional[dict]) -> str:
+        if not self.route_refs:
+            return self.route
+        return self.template.path(**{name: context.lookup(name, actor) for name in self.route_refs})
+
+    def render_body(self, context: IterationContext, actor: Optional[dict]) -> Optional[bytes]:
+        if not self.generators:
+            return self.template.render()
+        return self.template.render(**{name: generator(context, actor) for name, generator in self.generators})
+
+    def check(self, response, elapsed: float, context: IterationContext, actor: dict) -> Optional[str]:
+        """检查断言并保存变量，返回失败原因，通过时返回None"""
+        if response.status_code != self.status:
+            return f"状态码 {response.status_code}，期望 {self.status}"
+        if self.max_seconds is not None and elapsed > self.max_seconds:
+            return f"耗时 {elapsed * 1000:.1f}ms，超过 {self.max_seconds * 1000:g}ms"
+        if not self.needs_envelope:
+            return None
+        try:
+            envelope = parse_response(response)
+            if self.code is not None and envelope.code != self.code:
+                return f"code {envelope.code}，期望 {self.code}: {envelope.msg}"
+            if self.schema is not None:
+                envelope.entity(self.schema)
+            for name, path in self.saves:
+                value = envelope.data
+                for key in path:
+                    value = value.get(key) if type(value) is dict else None
+                if value is None:
+                    return f"响应中没有字段 {'.'.join(path)}"
+                context.save(name, value)
+            if self.cleanup is not None:
+                if envelope.id is None:
+                    return "响应中没有 data.id，无法登记清理"
+                context.created.append(
+                    (self.cleanup.path(id=envelope.id), f"清理 {self.name} (ID: {envelope.id})", actor.get("token"))
+                )
+            return self.on_success(context, actor, envelope)
+        except SchemaError as e:
+            return str(e)
+
+    def on_success(self, context: IterationContext, actor: dict, envelope) -> Optional[str]:
+        """断言全部通过后调用，注册和登录步骤在这里更新用户列表"""
+        return None
+
+
+class RegisterStep(Step):
+    """注册角色的一个新用户，用户名为 <角色><后缀>_<序号>"""
+
+    __slots__ = ("password",)
+
+    def __init__(self, role: str, password: str):
+        super().__init__(
+            "register", role, "POST", "/register",
+            {"username": Slot("username"), "password": password, "email": Slot("email")},
+            expect={"schema": "User"}, auth=False,
+        )
+        self.password = password
+        self.needs_envelope = True
+
+    def prepare(self, context: IterationContext):
+        username = f"{self.role}{context.suffix}_{len(context.users.get(self.role, ()))}"
+        actor = {"role": self.role, "username": username, "password": self.password}
+        return actor, self.route, self.template.render(username=username, email=f"{username}@example.com"), None
+
+    def on_success(self, context: IterationContext, actor: dict, envelope) -> Optional[str]:
+        actor["id"] = envelope.id
+        context.users.setdefault(self.role, []).append(actor)
+        context.save(f"{self.role}_id", envelope.id)
+        return None
+
+
+class LoginStep(Step):
+    """登录角色中最近注册的用户（注册失败时本轮已经结束）"""
+
+    __slots__ = ()
+
+    def __init__(self, role: str):
+        super().__init__(
+            "login", role, "POST", "/login", {"id": Slot("id"), "password": Slot("password")}, auth=False,
+        )
+        self.needs_envelope = True
+
+    def prepare(self, context: IterationContext):
+        actor = context.users[self.role][-1]
+        return actor, self.route, self.template.render(id=actor["id"], password=actor["password"]), None
+
+    def on_success(self, context: IterationContext, actor: dict, envelope) -> Optional[str]:
+        actor["token"] = envelope.entity(LoginResult).token
+        return None
+
+
+class ScenarioPlan:
+    """编译后的场景：各阶段的步骤和流量的累积权重"""
+
+    def __init__(self, spec: Any, path: str = ""):
+        self.path = path
+        where = os.path.basename(path) or "场景"
+        if not isinstance(spec, dict):
+            raise ScenarioError(f"{where}: 场景应为对象")
+        unknown = set(spec) - {"name", "description", "seed", "users", "setup", "traffic"}
+        if unknown:
+            raise ScenarioError(f"{where}: 未知的字段 {', '.join(sorted(unknown))}")
+        self.name = spec.get("name") or os.path.splitext(where)[0]
+        self.description = spec.get("description", "")
+        self.seed = spec.get("seed")
+
+        users = spec.get("users")
+        if not isinstance(users, dict) or not users:
+            raise ScenarioError(f"{where}: users 应为非空对象 {{角色: {{count, password}}}}")
+        self.roles: List[Tuple[str, int, Step, Step]] = []
+        for role, options in users.items():
+            options = options or {}
+            count = options.get("count", 1)
+            password = options.get("password", DEFAULT_PASSWORD)
+            if type(count) is not int or count < 1 or not isinstance(password, str):
+                raise ScenarioError(f"{where}.users.{role}: count 应为正整数，password 应为字符串")
+            self.roles.append((role, count, RegisterStep(role, password), LoginStep(role)))
+
+        refs = set()
+        defined = {"user_id"} | {f"{role}_id" for role in users}
+        names = {"register", "login", CLEANUP_STEP}
+
+        self.setup: List[Tuple[Step, int]] = []
+        for index, raw in enumerate(spec.get("setup") or ()):
+            step = self._compile_step(raw, f"{where}.setup[{index}]", "repeat", users, names, refs, defined)
+            repeat = raw.get("repeat", 1)
+            if type(repeat) is not int or repeat < 1:
+                raise ScenarioError(f"{where}.setup[{index}]: repeat 应为正整数")
+            self.setup.append((step, repeat))
+
+        traffic = spec.get("traffic") or {}
+        if not isinstance(traffic, dict) or set(traffic) - {"requests", "steps"}:
+            raise ScenarioError(f"{where}.traffic: 应为 {{requests, steps}}")
+        self.requests = traffic.get("requests", 0)
+        if type(self.requests) is not int or self.requests < 0:
+            raise ScenarioError(f"{where}.traffic: requests 应为非负整数")
+        self.traffic: List[Step] = []
+        weights = []
+        for index, raw in enumerate(traffic.get("steps") or ()):
+            step = self._compile_step(raw, f"{where}.traffic[{index}]", "weight", users, names, refs, defined)
+            weight = raw.get("weight", 1)
+            if not isinstance(weight, (int, float)) or weight <= 0:
+                raise ScenarioError(f"{where}.traffic[{index}]: weight 应为正数")
+            self.traffic.append(step)
+            weights.append(weight)
+        if self.requests and not self.traffic:
+            raise ScenarioError(f"{where}.traffic: 设置了 requests 但没有 steps")
+        self.cum_weights = tuple(itertools.accumulate(weights))
+
+        undefined = refs - defined
+        if undefined:
+            raise ScenarioError(f"{where}: 引用了未由 save 定义的变量 {', '.join(sorted(undefined))}")
+
+        # 压测报告的步骤顺序
+        self.step_names = ["register", "login"]
+        self.step_names += [step.name for step, _ in self.setup] + [step.name for step in self.traffic]
+        self.step_names.append(CLEANUP_STEP)
+
+    @staticmethod
+    def _compile_step(raw: Any, where: str, phase_key: str, users: dict, names: set, refs: set, defined: set) -> Step:
+        """phase_key: 该阶段特有的字段（setup 的 repeat、traffic 的 weight）"""
+        if not isinstance(raw, dict):
+            raise ScenarioError(f"{where}: 步骤应为对象")
+        unknown = set(raw) - _STEP_KEYS - {phase_key}
+        if unknown:
+            raise ScenarioError(f"{where}: 未知的字段 {', '.join(sorted(unknown))}")
+        name = raw.get("name")
+        if not isinstance(name, str) or not name:
+            raise ScenarioError(f"{where}: 缺少 name")
+        if name in names:
+            raise ScenarioError(f"{where}: 步骤名 {name} 重复或为保留名称")
+        names.add(name)
+        role = raw.get("as")
+        if role not in users:
+            raise ScenarioError(f"{where}: as 应为 users 中的角色（{', '.join(users)}）")
+        method, route = _parse_request(raw.get("request"), where)
+        step = Step(
+            name, role, method, route, raw.get("body"), raw.get("expect"), raw.get("save"), raw.get("cleanup"),
+            where=where, refs=refs,
+        )
+        defined.update(name for name, _ in step.saves)
+        return step
+
+    def new_context(self, suffix: str) -> IterationContext:
+        return IterationContext(suffix, Random(self.seed))
+
+    def iteration(self, context: IterationContext) -> Iterator[Step]:
+        """一轮迭代依次执行的步骤：注册并登录用户、setup、按权重抽取的流量"""
+        for _, count, register, login in self.roles:
+            for _ in range(count):
+                yield register
+                yield login
+        for step, repeat in self.setup:
+            for _ in range(repeat):
+                yield step
+        if self.requests:
+            yield from context.rng.choices(self.traffic, cum_weights=self.cum_weights, k=self.requests)
+
+    def load_flow(self, base_url: str, suffix: str):
+        """压测引擎（loadgen.VirtualUser）的一轮迭代: (测试实例, (步骤名, 可调用对象)..., 清理函数)"""
+        test = ScenarioAPITest(self, base_url, auto_cleanup=True, username_suffix=suffix)
+        steps = ((step.name, partial(test.run_step, step)) for step in self.iteration(test.context))
+        return test, steps, test.cleanup_test_data
+
+
+def resolve_scenario_path(name: str) -> str:
+    """场景文件路径；不存在时按名称在 tests/scenarios/ 中查找（如 blog_mix）"""
+    if os.path.exists(name):
+        return name
+    for extension in ("", ".json", ".yaml", ".yml"):
+        candidate = os.path.join(SCENARIO_DIR, name + extension)
+        if os.path.exists(candidate):
+            return candidate
+    return name
+
+
+def load_scenario(path: str) -> ScenarioPlan:
+    """读取并编译场景文件（.json；安装 PyYAML 后也支持 .yaml/.yml）
+
+    Raises:
+        OSError: 文件无法读取
+        ScenarioError: 文件不是合法的JSON/YAML，或不符合场景格式
+        RuntimeError: YAML 场景文件但未安装 PyYAML
+    """
+    path = resolve_scenario_path(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError("YAML场景文件需要 PyYAML，请运行: uv pip install pyyaml")
+        try:
+            spec = yaml.safe_load(data)
+        except yaml.YAMLError as e:
+            raise ScenarioError(f"{path}: 无法解析YAML: {e}")
+    else:
+        try:
+            spec = codec.loads(data)
+        except ValueError as e:
+            raise ScenarioError(f"{path}: 无法解析JSON: {e}")
+    return ScenarioPlan(spec, path)
+
+
+class ScenarioAPITest(BaseAPITest):
+    """按场景计划发出请求的测试套件
+
+    每个步骤以当前用户的token作为 make_request 的 token 参数发出，不切换会话身份，
+    同步（run_step）和异步（run_step_async）接口共用同一份计划和迭代状态。
+    """
+
+    def __init__(
+        self,
+        plan: ScenarioPlan,
+        base_url: str = "http://localhost:8000/api/v1",
+        auto_cleanup: bool = True,
+        username_suffix: Optional[str] = None,
+    ):
+        super().__init__(base_url, auto_cleanup)
+        self.plan = plan
+        self.passed = Counter()  # 步骤名 -> 通过次数
+        self.failed = Counter()  # 步骤名 -> 失败次数
+        # 未指定后缀时随机生成，避免与之前运行遗留的用户重名
+        self.start_iteration(f"_{uuid.uuid4().hex[:6]}" if username_suffix is None else username_suffix)
+
+    def start_iteration(self, username_suffix: str):
+        """开始新的一轮迭代（异步压测中同一个实例重复使用）"""
+        self.username_suffix = username_suffix
+        self.context = self.plan.new_context(username_suffix)
+
+    def _prepare(self, step: Step):
+        try:
+            return step.prepare(self.context)
+        except LookupError as e:
+            self.failed[step.name] += 1
+            self.print_error(f"{step.name}: {e}")
+            return None
+
+    def _finish(self, step: Step, response, elapsed: float, actor: dict) -> bool:
+        error = step.check(response, elapsed, self.context, actor)
+        if error is not None:
+            self.failed[step.name] += 1
+            self.print_error(f"{step.name}: {error}")
+            return False
+        self.passed[step.name] += 1
+        return True
+
+    def run_step(self, step: Step) -> bool:
+        """执行一个步骤，返回是否通过所有断言"""
+        prepared = self._prepare(step)
+        if prepared is None:
+            return False
+        actor, path, body, token = prepared
+        start = time.perf_counter()
+        response = self.make_request(
+            step.method, path, data=body, expected_status=step.status,
+            description=step.name, require_auth=step.auth, token=token,
+        )
+        return self._finish(step, response, time.perf_counter() - start, actor)
+
+    async def run_step_async(self, step: Step) -> bool:
+        """run_step 的异步版本"""
+        prepared = self._prepare(step)
+        if prepared is None:
+            return False
+        actor, path, body, token = prepared
+        start = time.perf_counter()
+        response = await self.make_request_async(
+            step.method, path, data=body, expected_status=step.status,
+            description=step.name, require_auth=step.auth, token=token,
+        )
+        return self._finish(step, response, time.perf_counter() - start, actor)
+
+    def _cleanup_jobs(self) -> Tuple[List[Tuple[str, str, str]], int]:
+        """本轮要删除的数据: 先按创建的逆序删除，再由每个用户删除自己
+
+        Returns:
+            ([(路径, 描述, token), ...], 没有token无法删除的用户数)
+        """
+        context = self.context
+        jobs = list(reversed(context.created))
+        skipped = 0
+        for users in context.users.values():
+            for user in users:
+                if user.get("token"):
+                    jobs.append((f"/user/{user['id']}", f"删除用户 {user['username']}", user["token"]))
+                else:
+                    skipped += 1
+        context.created.clear()
+        context.users.clear()
+        return jobs, skipped
+
+    def cleanup_test_data(self) -> bool:
+        """删除本轮创建的数据和用户"""
+        jobs, failed = self._cleanup_jobs()
+        for path, description, token in jobs:
+            try:
+                ok = self.make_request("DELETE", path, description=description, token=token).status_code == 200
+            except requests.exceptions.RequestException:
+                ok = False
+            failed += not ok
+        if failed:
+            self.print_warning(f"{failed} 条数据未能删除")
+        return failed == 0
+
+    async def cleanup_test_data_async(self) -> bool:
+        """cleanup_test_data 的异步版本"""
+        jobs, failed = self._cleanup_jobs()
+        for path, description, token in jobs:
+            try:
+                response = await self.make_request_async("DELETE", path, description=description, token=token)
+                ok = response.status_code == 200
+            except (ConnectionError, requests.exceptions.ConnectionError):
+                ok = False
+            failed += not ok
+        if failed:
+            self.print_warning(f"{failed} 条数据未能删除")
+        return failed == 0
+
+    def print_step_summary(self):
+        """打印每个步骤的通过/失败次数"""
+        print(f"\n{Fore.CYAN}📊 场景步骤统计{Style.RESET_ALL}")
+        for name in self.plan.step_names:
+            passed, failed = self.passed[name], self.failed[name]
+            if passed or failed:
+                color = Fore.RED if failed else Fore.GREEN
+                print(f"  {color}{name:<28}{Style.RESET_ALL}通过 {passed:>6}   失败 {failed:>6}")
+
+    def run_test_suite(self, include_cleanup: bool = None):
+        """执行一轮场景，逐步输出"""
+        self.print_test_header(f"场景: {self.plan.name}")
+        if self.plan.description:
+            self.print_info(self.plan.description)
+
+        run_cleanup = include_cleanup if include_cleanup is not None else self.auto_cleanup
+
+        if not self.check_server_status():
+            self.print_error("服务器未运行！请先启动服务器: go run main.go")
+            return False
+
+        success = True
+        try:
+            for number, step in enumerate(self.plan.iteration(self.context), 1):
+                self.print_step(number, f"{step.name} ({step.method} {step.route})")
+                if not self.run_step(step):
+                    success = False
+                    self.print_warning("后续步骤依赖本步骤的结果，结束本轮")
+                    break
+        except requests.exceptions.RequestException:
+            success = False
+        finally:
+            if run_cleanup:
+                success &= self.cleanup_test_data()
+            else:
+                self.print_warning("测试数据未自动清理，可以使用 --auto-cleanup 在结束后删除")
+
+        self.print_step_summary()
+        if success:
+            self.print_success(f"🎉 场景 {self.plan.name} 执行成功")
+        return success
+
+
+async def _timed_step(test: ScenarioAPITest, result: LoadTestResult, step_name: str, coroutine) -> bool:
+    """执行一个步骤协程并记录统计，与 loadgen.VirtualUser._run_step 的口径一致"""
+    requests_before = test.request_count
+    failed_before = test.failed_request_count
+    start = time.perf_counter()
+    try:
+        ok = (await coroutine) is not False
+    except Exception:
+        ok = False
+    elapsed = time.perf_counter() - start
+
+    failed = test.failed_request_count - failed_before
+    ok = ok and failed == 0
+    result.steps[step_name].record(elapsed, ok, test.request_count - requests_before, failed)
+    return ok
+
+
+async def _async_virtual_user(
+    plan: ScenarioPlan, base_url: str, vu_id: int, run_tag: str, deadline: float, client: str, result: LoadTestResult
+):
+    """在截止时间前重复执行场景，同一个测试实例（和异步会话）在各轮之间复用"""
+    test = ScenarioAPITest(plan, base_url, auto_cleanup=True, username_suffix="")
+    test.async_client = client
+    iteration = 0
+    try:
+        while time.monotonic() < deadline:
+            test.start_iteration(f"_{run_tag}_{vu_id}_{iteration}")
+            for step in plan.iteration(test.context):
+                # 后续步骤依赖前面步骤创建的数据，任一步骤失败则结束本轮
+                if not await _timed_step(test, result, step.name, test.run_step_async(step)):
+                    break
+            await _timed_step(test, result, CLEANUP_STEP, test.cleanup_test_data_async())
+            result.iterations += 1
+            iteration += 1
+    finally:
+        await test.close_async_session()
+
+
+def run_async_load_test(
+    plan: ScenarioPlan, base_url: str, users: int, duration: float, client: str = DEFAULT_ASYNC_CLIENT
+) -> Optional[LoadTestResult]:
+    """异步压测引擎：users 个虚拟用户作为协程在同一个事件循环中重复执行场景
+
+    与线程引擎（loadgen.run_load_test）返回同样的结果，客户端不可用时返回None。
+    """
+    if not ASYNC_CLIENT_MODULES[client].is_available():
+        print(f"{Fore.RED}❌ aiohttp 客户端需要安装可选依赖，请运行: uv sync --extra async，或使用 --http-client raw{Style.RESET_ALL}")
+        return None
+
+    run_tag = uuid.uuid4().hex[:6]
+    result = LoadTestResult(users, duration, step_names=plan.step_names)
+    print(
+        f"{Fore.MAGENTA}🚀 开始压测: 场景 {plan.name}, {users} 个虚拟用户（协程，客户端 {client}）, "
+        f"持续 {duration:g} 秒 (批次: {run_tag}){Style.RESET_ALL}"
+    )
+    sys.stdout.flush()
+
+    async def run_users(deadline: float):
+        await asyncio.gather(
+            *(_async_virtual_user(plan, base_url, vu_id, run_tag, deadline, client, result) for vu_id in range(users))
+        )
+
+    start = time.monotonic()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        asyncio.run(run_users(start + duration))
+    result.elapsed = time.monotonic() - start
+    return result
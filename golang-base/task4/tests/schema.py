@@ -0,0 +1,231 @@
+"""
+响应结构校验
+对应 api/api.go 的 Resp{code,msg,data} 响应外壳，以及 model/user.go 中 User、Post、Comment 的JSON字段。
+
+每个响应只解析一次：parse_response 把解析结果缓存在响应对象上，assert_response_success、
+extract_id_from_response 和测试步骤再次读取同一响应时直接复用，负载模式下不再重复解码响应体。
+各模型的字段校验器在定义类时编译为 (字段名, 允许的类型) 元组，校验时只遍历一次并比较类型。
+
+    envelope = parse_response(response)
+    if envelope.ok:
+        post = envelope.entity(Post)
+        print(post.id, post.title, post.user.id)
+"""
+
+from typing import Any, Dict, Optional, Tuple, Type
+
+from . import codec
+
+# api.go 中的 CodeSuccess / CodeFailed
+CODE_SUCCESS = 0
+CODE_FAILED = 1
+
+_MISSING = object()
+_NONE_TYPE = type(None)
+
+
+class SchemaError(ValueError):
+    """响应体不是合法的JSON，或不符合响应外壳/模型的字段定义"""
+
+
+def _type_names(types: tuple) -> str:
+    return "/".join("null" if t is _NONE_TYPE else t.__name__ for t in types)
+
+
+def _raw_getter(name: str):
+    return lambda self: self.raw.get(name)
+
+
+def _nested_getter(name: str):
+    attr = f"_{name}"
+    return lambda self: getattr(self, attr, None)
+
+
+class Field:
+    """模型字段：required 对应Go结构体中没有 omitempty 的字段"""
+
+    def __init__(self, name: str, types, required: bool = False):
+        self.name = name
+        self.types = types if isinstance(types, tuple) else (types,)
+        self.required = required
+
+
+class Entity:
+    """模型基类：子类声明 FIELDS，定义类时编译校验器"""
+
+    FIELDS: Tuple[Field, ...] = ()
+    __slots__ = ("raw",)
+
+    _required: Tuple[Tuple[str, tuple], ...] = ()
+    _optional: Tuple[Tuple[str, tuple], ...] = ()
+    _nested: Tuple[Tuple[str, Type["Entity"], bool], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        required, optional, nested = [], [], []
+        for field in cls.FIELDS:
+            entity_types = [t for t in field.types if isinstance(t, type) and issubclass(t, Entity)]
+            if entity_types:
+                nested.append((field.name, entity_types[0], field.required))
+            else:
+                (required if field.required else optional).append((field.name, field.types))
+        cls._required = tuple(required)
+        cls._optional = tuple(optional)
+        cls._nested = tuple(nested)
+        # 嵌套字段返回已校验的模型实例；其他字段直接读原始字典，omitempty 的字段不出现时为None
+        nested_names = {name for name, _, _ in nested}
+        for field in cls.FIELDS:
+            getter = _nested_getter(field.name) if field.name in nested_names else _raw_getter(field.name)
+            setattr(cls, field.name, property(getter))
+
+    def __init__(self, raw: Dict[str, Any]):
+        self.raw = raw
+
+    @classmethod
+    def validate(cls, data: Any, path: str = "data") -> "Entity":
+        """校验字段类型并返回类型化视图，嵌套模型一并校验"""
+        if type(data) is not dict:
+            raise SchemaError(f"{path} 应为对象，实际为 {type(data).__name__}")
+        for name, types in cls._required:
+            value = data.get(name, _MISSING)
+            if value is _MISSING:
+                raise SchemaError(f"{path}.{name} 缺失")
+            if type(value) not in types:
+                raise SchemaError(f"{path}.{name} 类型应为 {_type_names(types)}，实际为 {type(value).__name__}")
+        for name, types in cls._optional:
+            value = data.get(name, _MISSING)
+            if value is not _MISSING and type(value) not in types:
+                raise SchemaError(f"{path}.{name} 类型应为 {_type_names(types)}，实际为 {type(value).__name__}")
+        entity = cls(data)
+        for name, model, required in cls._nested:
+            value = data.get(name, _MISSING)
+            if value is _MISSING:
+                if required:
+                    raise SchemaError(f"{path}.{name} 缺失")
+                continue
+            setattr(entity, f"_{name}", model.validate(value, f"{path}.{name}"))
+        return entity
+
+    def __repr__(self):
+        return f"<{type(self).__name__} id={self.raw.get('id')}>"
+
+
+# model.CommonModel：gorm 的 ID 和时间戳字段没有 omitempty，总会出现
+COMMON_FIELDS = (
+    Field("id", int, required=True),
+    Field("created_at", str, required=True),
+    Field("updated_at", str, required=True),
+    Field("deleted_at", (str, _NONE_TYPE), required=True),
+)
+
+
+class User(Entity):
+    """model.User"""
+
+    __slots__ = ()
+    FIELDS = COMMON_FIELDS + (
+        Field("username", str),
+        Field("password", str),
+        Field("email", str),
+    )
+
+
+class Post(Entity):
+    """model.Post；未预加载时 user 是零值用户"""
+
+    __slots__ = ("_user",)
+    FIELDS = COMMON_FIELDS + (
+        Field("title", str),
+        Field("content", str),
+        Field("user_id", int),
+        Field("user", User, required=True),
+    )
+
+
+class Comment(Entity):
+    """model.Comment；未预加载时 user、post 是零值"""
+
+    __slots__ = ("_user", "_post")
+    FIELDS = COMMON_FIELDS + (
+        Field("content", str),
+        Field("user_id", int),
+        Field("post_id", int),
+        Field("user", User, required=True),
+        Field("post", Post, required=True),
+    )
+
+
+class LoginResult(Entity):
+    """POST /login 返回的 gin.H{"user", "token"}"""
+
+    __slots__ = ("_user",)
+    FIELDS = (
+        Field("token", str, required=True),
+        Field("user", User, required=True),
+    )
+
+
+class Envelope:
+    """已校验的 Resp{code,msg,data}；RespBase 没有 data 字段，此时 data 为 None"""
+
+    __slots__ = ("status_code", "code", "msg", "data", "_entities")
+
+    def __init__(self, status_code: int, code: int, msg: str, data: Any):
+        self.status_code = status_code
+        self.code = code
+        self.msg = msg
+        self.data = data
+        self._entities: Dict[type, Entity] = {}
+
+    @property
+    def ok(self) -> bool:
+        return self.code == CODE_SUCCESS
+
+    @property
+    def id(self) -> Optional[int]:
+        """data.id，不存在时为None"""
+        if type(self.data) is dict:
+            value = self.data.get("id")
+            if type(value) is int:
+                return value
+        return None
+
+    def entity(self, model: Type[Entity]) -> Entity:
+        """以 model 校验 data 并返回类型化视图，同一模型只校验一次"""
+        entity = self._entities.get(model)
+        if entity is None:
+            entity = self._entities[model] = model.validate(self.data)
+        return entity
+
+    def __repr__(self):
+        return f"<Envelope [{self.status_code}] code={self.code} msg={self.msg!r}>"
+
+
+def parse_envelope(payload: Any, status_code: int = 0) -> Envelope:
+    """校验已解码的响应外壳"""
+    if type(payload) is not dict:
+        raise SchemaError(f"响应应为对象，实际为 {type(payload).__name__}")
+    code = payload.get("code", _MISSING)
+    msg = payload.get("msg", _MISSING)
+    if type(code) is not int:
+        raise SchemaError("响应缺少整数字段 code")
+    if type(msg) is not str:
+        raise SchemaError("响应缺少字符串字段 msg")
+    return Envelope(status_code, code, msg, payload.get("data"))
+
+
+def parse_response(response) -> Envelope:
+    """解析并校验响应外壳，结果（包括失败）缓存在响应对象上
+
+    支持 requests.Response 和 BufferedResponse。
+    """
+    cached = getattr(response, "_envelope", None)
+    if cached is None:
+        try:
+            cached = parse_envelope(codec.loads(response.content), response.status_code)
+        except ValueError as e:
+            cached = e if isinstance(e, SchemaError) else SchemaError(f"无法解析JSON响应: {e}")
+        response._envelope = cached
+    if isinstance(cached, SchemaError):
+        raise cached
+    return cached
@@ -0,0 +1,356 @@
+"""
+批量造数工具
+通过API并发创建用户、文章和评论，用于在接近真实规模的数据表上测试Gin接口的性能
+
+    python -m tests.seed --users 1000 --posts-per-user 10 --comments-per-post 10 --workers 32
+
+创建的ID按类型排序后以区间（起始ID, 个数）的形式写入gzip压缩的JSON文件，
+自增ID基本连续，百万级的ID通常只占几十字节；后续运行可以用 load_manifest 读取复用。
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import threading
+import time
+import uuid
+from array import array
+from typing import Callable, Iterator, List, Optional
+
+import requests
+from colorama import Fore, Style, init
+
+from . import codec
+from .metrics import latency_registry, print_latency_report
+
+
+DEFAULT_BASE_URL = "http://localhost:8000/api/v1"
+DEFAULT_OUTPUT = "seed_ids.json.gz"
+SEED_PASSWORD = "seed123456"
+MANIFEST_VERSION = 1
+
+# 进度输出间隔（秒）
+PROGRESS_INTERVAL = 2.0
+
+POST_CONTENT = (
+    "Go语言以其简洁、高效和强大的并发特性，成为了现代Web开发的热门选择。"
+    "本文介绍使用Gin框架和GORM构建RESTful API的常见做法，包括路由分组、"
+    "中间件、参数校验、JWT认证以及数据库事务的处理。"
+)
+
+
+class PhaseResult:
+    """单个造数阶段（用户/文章/评论）的结果"""
+
+    def __init__(self, name: str, total: int):
+        self.name = name
+        self.total = total
+        self.ids = array("Q", bytes(8 * total))  # 按创建序号保存ID，失败的位置为0
+        self.created = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.created / self.elapsed if self.elapsed else 0.0
+
+
+def encode_runs(ids) -> List[List[int]]:
+    """把ID集合编码为 [起始ID, 个数] 区间列表"""
+    runs: List[List[int]] = []
+    for value in sorted(i for i in ids if i):
+        if runs and runs[-1][0] + runs[-1][1] == value:
+            runs[-1][1] += 1
+        elif not runs or runs[-1][0] + runs[-1][1] < value:
+            runs.append([value, 1])
+    return runs
+
+
+def expand_runs(runs: List[List[int]]) -> Iterator[int]:
+    """encode_runs 的逆操作"""
+    for start, length in runs:
+        yield from range(start, start + length)
+
+
+class SeedManifest:
+    """造数结果文件"""
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    @property
+    def password(self) -> str:
+        """所有造数用户共用的密码"""
+        return self.data["password"]
+
+    def count(self, kind: str) -> int:
+        return sum(length for _, length in self.data["ids"][kind])
+
+    def ids(self, kind: str) -> Iterator[int]:
+        """按ID顺序遍历某类数据，kind 为 users、posts 或 comments"""
+        return expand_runs(self.data["ids"][kind])
+
+
+def load_manifest(path: str) -> SeedManifest:
+    """读取造数结果文件"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"不支持的造数文件版本: {data.get('version')}")
+    return SeedManifest(data)
+
+
+class Seeder:
+    """并发造数：每个工作线程使用独立的 requests.Session 复用连接"""
+
+    def __init__(self, base_url: str, workers: int):
+        self.base_url = base_url
+        self.workers = workers
+        self.run_tag = uuid.uuid4().hex[:6]
+        self.token: Optional[str] = None
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update({"Content-Type": "application/json", "Accept": "application/json"})
+        if self.token:
+            session.headers["Authorization"] = f"Bearer {self.token}"
+        return session
+
+    def _post(self, endpoint: str, data: dict) -> Optional[int]:
+        """发送创建请求，成功时返回新记录的ID"""
+        start = time.perf_counter()
+        try:
+            response = self._session().post(f"{self.base_url}{endpoint}", data=codec.dumps(data), timeout=30)
+        except requests.exceptions.RequestException:
+            latency_registry.record_error("POST", endpoint)
+            return None
+        latency_registry.record("POST", endpoint, time.perf_counter() - start)
+        if response.status_code != 200:
+            latency_registry.record_error("POST", endpoint)
+            return None
+        try:
+            return codec.loads(response.content)["data"]["id"]
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _run_phase(self, name: str, total: int, create: Callable[[int], Optional[int]]) -> PhaseResult:
+        """用工作线程从共享计数器领取序号并创建记录，主线程定期输出进度"""
+        result = PhaseResult(name, total)
+        lock = threading.Lock()
+        finished = threading.Event()
+        next_index = [0]
+        running = [min(self.workers, total)]
+        errors = []  # create 抛出的异常，只保留第一条用于输出
+
+        def work():
+            while True:
+                with lock:
+                    index = next_index[0]
+                    if index >= total:
+                        return
+                    next_index[0] += 1
+                try:
+                    record_id = create(index)
+                except Exception as e:
+                    record_id = None
+                    with lock:
+                        if not errors:
+                            errors.append(f"{type(e).__name__}: {str(e)}")
+                with lock:
+                    if record_id:
+                        result.ids[index] = record_id
+                        result.created += 1
+                    else:
+                        result.failed += 1
+
+        def worker():
+            # 所有工作线程退出后结束等待，不依赖计数恰好达到 total
+            try:
+                work()
+            finally:
+                with lock:
+                    running[0] -= 1
+                    if running[0] == 0:
+                        finished.set()
+
+        print(f"{Fore.YELLOW}📋 创建{name}: {total} 条{Style.RESET_ALL}")
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=worker, name=f"seed-{i}", daemon=True)
+            for i in range(running[0])
+        ]
+        for thread in threads:
+            thread.start()
+        if not threads:
+            finished.set()
+        while not finished.wait(PROGRESS_INTERVAL):
+            done = result.created + result.failed
+            rate = result.created / (time.perf_counter() - start)
+            print(f"  ⏳ {done}/{total} ({done / total:.0%}), {rate:.0f} 条/s, 失败 {result.failed}")
+        for thread in threads:
+            thread.join()
+        result.elapsed = time.perf_counter() - start
+        if errors:
+            print(f"{Fore.RED}  ❌ 创建{name}时发生异常: {errors[0]}{Style.RESET_ALL}")
+
+        color = Fore.RED if result.failed else Fore.GREEN
+        print(
+            f"{color}  ✅ 完成 {result.created}/{total}, 失败 {result.failed}, "
+            f"耗时 {result.elapsed:.1f}s, {result.throughput:.0f} 条/s{Style.RESET_ALL}"
+        )
+        return result
+
+    def seed_users(self, count: int) -> PhaseResult:
+        def create(i: int):
+            username = f"seed_{self.run_tag}_{i}"
+            return self._post(
+                "/register",
+                {"username": username, "password": SEED_PASSWORD, "email": f"{username}@example.com"},
+            )
+
+        return self._run_phase("用户", count, create)
+
+    def login(self, user_id: int) -> bool:
+        """以一个造数用户登录，创建文章和评论的接口不校验作者是否为当前用户"""
+        try:
+            response = self._session().post(
+                f"{self.base_url}/login", json={"id": user_id, "password": SEED_PASSWORD}, timeout=30
+            )
+            self.token = response.json()["data"]["token"]
+            return True
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError):
+            return False
+
+    def seed_posts(self, user_ids: List[int], per_user: int) -> PhaseResult:
+        def create(i: int):
+            return self._post(
+                "/post",
+                {
+                    "title": f"种子文章 {self.run_tag}-{i}",
+                    "content": POST_CONTENT,
+                    "user_id": user_ids[i // per_user],
+                },
+            )
+
+        return self._run_phase("文章", len(user_ids) * per_user, create)
+
+    def seed_comments(self, post_ids: List[int], user_ids: List[int], per_post: int) -> PhaseResult:
+        def create(i: int):
+            return self._post(
+                "/comment",
+                {
+                    "content": f"种子评论 {self.run_tag}-{i}",
+                    "user_id": user_ids[i % len(user_ids)],
+                    "post_id": post_ids[i // per_post],
+                },
+            )
+
+        return self._run_phase("评论", len(post_ids) * per_post, create)
+
+
+def run_seed(
+    base_url: str,
+    users: int,
+    posts_per_user: int,
+    comments_per_post: int,
+    workers: int,
+    output: str,
+) -> bool:
+    """按扇出配置造数并写出ID文件，返回是否全部成功"""
+    seeder = Seeder(base_url, workers)
+    print(
+        f"{Fore.MAGENTA}🌱 开始造数: {users} 用户 × {posts_per_user} 文章 × {comments_per_post} 评论, "
+        f"{workers} 个工作线程 (批次: {seeder.run_tag}){Style.RESET_ALL}"
+    )
+    phases = [seeder.seed_users(users)]
+    user_ids = [i for i in phases[0].ids if i]
+    if not user_ids:
+        print(f"{Fore.RED}❌ 没有成功创建任何用户，请检查服务器状态{Style.RESET_ALL}")
+        return False
+
+    if posts_per_user or comments_per_post:
+        if not seeder.login(user_ids[0]):
+            print(f"{Fore.RED}❌ 造数用户登录失败{Style.RESET_ALL}")
+            return False
+
+    post_ids: List[int] = []
+    if posts_per_user:
+        phases.append(seeder.seed_posts(user_ids, posts_per_user))
+        post_ids = [i for i in phases[-1].ids if i]
+    if comments_per_post and post_ids:
+        phases.append(seeder.seed_comments(post_ids, user_ids, comments_per_post))
+
+    kinds = {"用户": "users", "文章": "posts", "评论": "comments"}
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "base_url": base_url,
+        "run_tag": seeder.run_tag,
+        "password": SEED_PASSWORD,
+        "fanout": {"users": users, "posts_per_user": posts_per_user, "comments_per_post": comments_per_post},
+        "ids": {kind: [] for kind in kinds.values()},
+    }
+    for phase in phases:
+        manifest["ids"][kinds[phase.name]] = encode_runs(phase.ids)
+    with gzip.open(output, "wt", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+
+    print_seed_report(phases)
+    print_latency_report()
+    print(f"\n{Fore.BLUE}ℹ️  已写入ID文件: {output}{Style.RESET_ALL}")
+    return all(phase.failed == 0 for phase in phases)
+
+
+def print_seed_report(phases: List[PhaseResult]):
+    """打印每个阶段的插入吞吐量"""
+    print(f"\n{Fore.CYAN}{'=' * 60}")
+    print("📊 造数报告")
+    print(f"{'=' * 60}{Style.RESET_ALL}")
+    print(f"  {'类型':<6}{'成功':>10}{'失败':>8}{'耗时':>10}{'吞吐(条/s)':>12}")
+    for phase in phases:
+        print(
+            f"  {phase.name:<6}{phase.created:>12}{phase.failed:>10}"
+            f"{phase.elapsed:>11.1f}s{phase.throughput:>14.0f}"
+        )
+    created = sum(phase.created for phase in phases)
+    elapsed = sum(phase.elapsed for phase in phases) or 1e-9
+    print(f"  合计 {created} 条, 平均 {created / elapsed:.0f} 条/s")
+
+
+def main():
+    init(autoreset=True)
+    parser = argparse.ArgumentParser(description="通过API批量创建用户、文章和评论")
+    parser.add_argument("--users", type=int, default=100, metavar="N", help="用户数（默认: 100）")
+    parser.add_argument("--posts-per-user", type=int, default=10, metavar="N", help="每个用户的文章数（默认: 10）")
+    parser.add_argument(
+        "--comments-per-post", type=int, default=10, metavar="N", help="每篇文章的评论数（默认: 10）"
+    )
+    parser.add_argument("--workers", type=int, default=16, metavar="N", help="并发工作线程数（默认: 16）")
+    parser.add_argument(
+        "--output", default=DEFAULT_OUTPUT, metavar="FILE", help=f"ID文件路径（默认: {DEFAULT_OUTPUT}）"
+    )
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help=f"API基础URL (默认: {DEFAULT_BASE_URL})")
+    parser.add_argument("--fake", action="store_true", help="向进程内替身服务器造数（用于验证工具本身）")
+    args = parser.parse_args()
+
+    if args.users < 1 or args.workers < 1:
+        parser.error("--users 和 --workers 必须大于等于 1")
+    if args.posts_per_user < 0 or args.comments_per_post < 0:
+        parser.error("--posts-per-user 和 --comments-per-post 不能为负数")
+
+    if args.fake:
+        from .fake_server import start_fake_server
+
+        args.base_url = start_fake_server().base_url
+
+    success = run_seed(
+        args.base_url, args.users, args.posts_per_user, args.comments_per_post, args.workers, args.output
+    )
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
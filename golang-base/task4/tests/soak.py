@@ -0,0 +1,243 @@
+"""
+长稳测试（soak）模块
+以少量虚拟用户持续数小时重放综合测试流程，按固定间隔采样：
+
+- 该时间窗口内的请求数、错误数和延迟分位数
+- 服务器进程（本机运行时）的RSS内存和打开的文件描述符数，读取自 /proc/<pid>
+
+结束后检查各指标是否持续单调增长：gin handler 或 GORM 连接处理中的泄漏
+通常只有在长时间运行后才会显现。
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import redirect_stdout
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from colorama import Fore, Style
+
+from .defaults import DEFAULT_SAMPLE_INTERVAL
+from .loadgen import LoadTestResult, VirtualUser
+from .metrics import LatencyRegistry, latency_registry
+
+
+# 趋势判定：Mann-Kendall tau 不低于该值且首尾增长超过 DRIFT_MIN_GROWTH 时视为持续增长
+DRIFT_TAU = 0.7
+DRIFT_MIN_GROWTH = 0.1
+
+# 样本数少于该值时不做趋势判定
+DRIFT_MIN_SAMPLES = 6
+
+# 前若干个样本视为预热（连接池建立、缓存填充），不参与趋势判定
+WARMUP_SAMPLES = 1
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+def find_listening_pid(port: int) -> Optional[int]:
+    """通过 /proc/net/tcp 找到监听指定端口的本机进程（仅Linux，需要有权限读取其fd目录）"""
+    inodes = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    local_port = int(fields[1].rsplit(":", 1)[1], 16)
+                    if local_port == port and fields[3] == "0A":  # 0A = LISTEN
+                        inodes.add(fields[9])
+        except (OSError, StopIteration, IndexError, ValueError):
+            continue
+    if not inodes:
+        return None
+
+    targets = {f"socket:[{inode}]" for inode in inodes}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        fd_dir = f"/proc/{pid}/fd"
+        try:
+            for fd in os.listdir(fd_dir):
+                if os.readlink(os.path.join(fd_dir, fd)) in targets:
+                    return int(pid)
+        except OSError:
+            continue
+    return None
+
+
+def sample_process(pid: int) -> Optional[tuple]:
+    """读取进程的 (RSS字节数, 打开的文件描述符数)，进程不存在或无权限时返回None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+        fds = len(os.listdir(f"/proc/{pid}/fd"))
+    except (OSError, StopIteration, ValueError):
+        return None
+    return rss, fds
+
+
+class SoakSample:
+    """一个采样窗口的数据"""
+
+    def __init__(self, elapsed: float, window: LatencyRegistry, process: Optional[tuple]):
+        histogram = window.combined()
+        self.elapsed = elapsed  # 距开始的秒数
+        self.requests = histogram.count
+        self.errors = histogram.errors
+        self.p50_ms = histogram.percentile(50) * 1000
+        self.p99_ms = histogram.percentile(99) * 1000
+        self.rss = process[0] if process else None
+        self.fds = process[1] if process else None
+
+
+def mann_kendall_tau(values: List[float]) -> float:
+    """Mann-Kendall 趋势系数，1表示严格单调递增，-1表示严格单调递减"""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    s = sum(
+        (values[j] > values[i]) - (values[j] < values[i])
+        for i in range(n - 1)
+        for j in range(i + 1, n)
+    )
+    return s / (n * (n - 1) / 2)
+
+
+def detect_drift(name: str, values: List[float]) -> Optional[str]:
+    """检查序列是否持续增长，是则返回描述"""
+    values = [v for v in values[WARMUP_SAMPLES:] if v is not None]
+    if len(values) < DRIFT_MIN_SAMPLES or not values[0]:
+        return None
+    tau = mann_kendall_tau(values)
+    growth = values[-1] / values[0] - 1
+    if tau >= DRIFT_TAU and growth >= DRIFT_MIN_GROWTH:
+        return f"{name} 持续增长: {values[0]:g} → {values[-1]:g} (+{growth:.0%}, tau={tau:.2f})"
+    return None
+
+
+class SoakTest:
+    """长稳测试运行器"""
+
+    def __init__(
+        self,
+        base_url: str,
+        hours: float,
+        users: int,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        server_pid: Optional[int] = None,
+    ):
+        self.base_url = base_url
+        self.duration = hours * 3600
+        self.users = users
+        self.interval = interval
+        self.server_pid = server_pid
+        self.samples: List[SoakSample] = []
+        self.result = LoadTestResult(users, self.duration)
+        self.total = LatencyRegistry()
+
+    def _resolve_server_pid(self) -> Optional[int]:
+        if self.server_pid:
+            return self.server_pid
+        address = urlsplit(self.base_url)
+        if address.hostname in LOCAL_HOSTS and address.port:
+            return find_listening_pid(address.port)
+        return None
+
+    def _print_sample(self, console, sample: SoakSample):
+        rss = f"{sample.rss / 1024 / 1024:>9.1f}MB" if sample.rss is not None else f"{'-':>11}"
+        fds = f"{sample.fds:>8}" if sample.fds is not None else f"{'-':>8}"
+        color = Fore.RED if sample.errors else ""
+        print(
+            f"  {color}{sample.elapsed / 60:>7.1f}m{sample.requests:>9}{sample.errors:>7}"
+            f"{sample.p50_ms:>9.1f}ms{sample.p99_ms:>9.1f}ms{rss}{fds}{Style.RESET_ALL}",
+            file=console,
+            flush=True,
+        )
+
+    def run(self) -> List[str]:
+        """运行长稳测试，返回检测到的持续增长问题"""
+        pid = self._resolve_server_pid()
+        run_tag = uuid.uuid4().hex[:6]
+        virtual_users = [VirtualUser(i, run_tag, self.base_url, self.duration) for i in range(self.users)]
+
+        print(
+            f"{Fore.MAGENTA}🕒 开始长稳测试: {self.users} 个虚拟用户, 持续 {self.duration / 3600:g} 小时, "
+            f"每 {self.interval:g} 秒采样 (批次: {run_tag}){Style.RESET_ALL}"
+        )
+        if pid:
+            print(f"{Fore.BLUE}ℹ️  监控服务器进程 PID {pid} 的内存和文件描述符{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.YELLOW}⚠️  未找到本机服务器进程，只采样延迟（可用 --server-pid 指定）{Style.RESET_ALL}")
+        print(f"\n  {'时间':>6}{'请求数':>6}{'错误':>5}{'p50':>11}{'p99':>11}{'RSS':>11}{'fd':>8}")
+
+        console = sys.stdout
+        latency_registry.drain()
+        start = time.monotonic()
+        deadline = start + self.duration
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            threads = [
+                threading.Thread(target=vu.run, args=(deadline,), name=f"soak-{vu.vu_id}", daemon=True)
+                for vu in virtual_users
+            ]
+            for thread in threads:
+                thread.start()
+
+            next_sample = start + self.interval
+            while any(thread.is_alive() for thread in threads):
+                # 等到下一个采样时刻，虚拟用户全部结束时提前采样最后一个窗口
+                for thread in threads:
+                    thread.join(max(0.0, next_sample - time.monotonic()))
+                if time.monotonic() < next_sample and any(thread.is_alive() for thread in threads):
+                    continue
+                next_sample += self.interval
+                self._take_sample(console, start, pid)
+        self.result.elapsed = time.monotonic() - start
+
+        for vu in virtual_users:
+            self.result.merge(vu.result)
+        # 把整个运行的数据放回全局注册表，供延迟报告和基准结果库使用
+        latency_registry.merge(self.total)
+        return self.find_drift()
+
+    def _take_sample(self, console, start: float, pid: Optional[int]):
+        window = latency_registry.drain()
+        self.total.merge(window)
+        sample = SoakSample(time.monotonic() - start, window, sample_process(pid) if pid else None)
+        self.samples.append(sample)
+        self._print_sample(console, sample)
+
+    def find_drift(self) -> List[str]:
+        """检查 RSS、文件描述符数和p99延迟是否持续增长"""
+        series = [
+            ("服务器RSS(字节)", [s.rss for s in self.samples]),
+            ("服务器打开的文件描述符", [s.fds for s in self.samples]),
+            ("p99延迟(ms)", [round(s.p99_ms, 2) for s in self.samples if s.requests]),
+        ]
+        issues = []
+        for name, values in series:
+            issue = detect_drift(name, values)
+            if issue:
+                issues.append(issue)
+        return issues
+
+
+def print_soak_report(soak: SoakTest, issues: List[str]):
+    """打印长稳测试结论"""
+    result = soak.result
+    print(f"\n{Fore.CYAN}{'=' * 70}")
+    print("📊 长稳测试报告")
+    print(f"{'=' * 70}{Style.RESET_ALL}")
+    print(
+        f"  实际时长: {result.elapsed / 3600:.2f} 小时   完成迭代: {result.iterations}   "
+        f"总请求数: {result.total_requests}   失败请求: {result.total_failed_requests}   "
+        f"采样数: {len(soak.samples)}"
+    )
+    if len(soak.samples) - WARMUP_SAMPLES < DRIFT_MIN_SAMPLES:
+        print(f"{Fore.YELLOW}⚠️  采样数不足 {DRIFT_MIN_SAMPLES + WARMUP_SAMPLES} 个，未做趋势判定{Style.RESET_ALL}")
+    elif issues:
+        for issue in issues:
+            print(f"{Fore.RED}❌ {issue}{Style.RESET_ALL}")
+    else:
+        print(f"{Fore.GREEN}✅ 未发现内存、文件描述符或延迟的持续增长{Style.RESET_ALL}")
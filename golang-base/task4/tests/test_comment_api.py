@@ -4,12 +4,34 @@
 """
 
 from .auth_helper import AuthenticatedAPITest
+from .schema import Comment, parse_response
 import json
 
 
 class CommentAPITest(AuthenticatedAPITest):
     """评论API测试类"""
 
+    SETUP_STEP = "setup_test_data"
+    TEST_STEPS = (
+        "test_create_comment",
+        "test_create_multiple_comments",
+        "test_create_long_comment",
+        "test_create_invalid_comment",
+        "test_get_comment",
+        "test_get_nonexistent_comment",
+        "test_invalid_comment_id",
+        "test_update_comment",
+        "test_verify_comment_update",
+        "test_special_characters_comment",
+        "test_comment_on_nonexistent_post",
+        "test_edge_cases",
+        "test_missing_validation",
+    )
+    CLEANUP_STEP = "cleanup"
+    KNOWN_ISSUES = {
+        "test_missing_validation": "api/comment.go 只校验字段非空，只有空格或超长的评论会被接受",
+    }
+
     def __init__(self, base_url: str = "http://localhost:8000/api/v1", auto_cleanup: bool = True):
         super().__init__(base_url, auto_cleanup)
         self.created_user_ids = []  # 记录创建的用户ID
@@ -291,8 +313,7 @@ class CommentAPITest(AuthenticatedAPITest):
 
         # 检查评论内容是否已更新
         try:
-            data = response.json()
-            content = data.get("data", {}).get("content", "")
+            content = parse_response(response).entity(Comment).content or ""
             if "更新后的评论内容" in content:
                 self.print_success("评论更新验证成功")
             else:
@@ -370,7 +391,7 @@ HTML标签测试: <script>alert('test')</script> <b>加粗</b> <i>斜体</i>
             "POST",
             "/comment",
             data=comment_data,
-            expected_status=500,  # 期望失败
+            expected_status=400,  # 外键约束失败，创建接口返回400
             description="对不存在文章的评论",
         )
 
@@ -485,6 +506,37 @@ HTML标签测试: <script>alert('test')</script> <b>加粗</b> <i>斜体</i>
                 "data": {"content": "", "user_id": user_id, "post_id": post_id},
                 "expected_status": 400,
             },
+            {
+                "name": "不存在的用户ID",
+                "data": {"content": "测试评论", "user_id": 99999, "post_id": post_id},
+                "expected_status": 400,  # 外键约束失败，创建接口返回400
+            },
+            {
+                "name": "不存在的文章ID",
+                "data": {"content": "测试评论", "user_id": user_id, "post_id": 99999},
+                "expected_status": 400,
+            },
+            {
+                "name": "单字符评论",
+                "data": {"content": "好", "user_id": user_id, "post_id": post_id},
+                "expected_status": 200,
+            },
+        ]
+
+        self._create_cases(edge_cases)
+
+    def test_missing_validation(self):
+        """测试服务器尚未校验的评论数据（期望被拒绝，见 KNOWN_ISSUES）"""
+        self.print_step(15, "缺少校验的评论数据测试")
+
+        if not self.created_user_ids or not self.created_post_ids:
+            self.print_warning("缺少测试数据")
+            return
+
+        self.print_warning("服务器目前不校验以下字段，这些案例预期失败")
+        user_id = self.created_user_ids[0]
+        post_id = self.created_post_ids[0]
+        cases = [
             {
                 "name": "只有空格的评论",
                 "data": {"content": "   ", "user_id": user_id, "post_id": post_id},
@@ -499,24 +551,12 @@ HTML标签测试: <script>alert('test')</script> <b>加粗</b> <i>斜体</i>
                 },
                 "expected_status": 400,
             },
-            {
-                "name": "不存在的用户ID",
-                "data": {"content": "测试评论", "user_id": 99999, "post_id": post_id},
-                "expected_status": 500,
-            },
-            {
-                "name": "不存在的文章ID",
-                "data": {"content": "测试评论", "user_id": user_id, "post_id": 99999},
-                "expected_status": 500,
-            },
-            {
-                "name": "单字符评论",
-                "data": {"content": "好", "user_id": user_id, "post_id": post_id},
-                "expected_status": 200,
-            },
         ]
+        self._create_cases(cases)
 
-        for case in edge_cases:
+    def _create_cases(self, cases):
+        """逐个发送创建评论的案例，创建成功的评论记录ID用于清理"""
+        for case in cases:
             print(f"\\n  🧪 测试案例: {case['name']}")
             response = self.make_request(
                 "POST",
@@ -534,7 +574,7 @@ HTML标签测试: <script>alert('test')</script> <b>加粗</b> <i>斜体</i>
 
     def cleanup(self):
         """清理测试数据"""
-        self.print_step(15, "清理测试数据")
+        self.print_step(16, "清理测试数据")
 
         # 清理评论
         for comment_id in self.created_comment_ids[:]:
@@ -615,18 +655,8 @@ HTML标签测试: <script>alert('test')</script> <b>加粗</b> <i>斜体</i>
                 return False
 
             # 运行基础测试（不包括删除测试）
-            self.test_create_comment()
-            self.test_create_multiple_comments()
-            self.test_create_long_comment()
-            self.test_create_invalid_comment()
-            self.test_get_comment()
-            self.test_get_nonexistent_comment()
-            self.test_invalid_comment_id()
-            self.test_update_comment()
-            self.test_verify_comment_update()
-            self.test_special_characters_comment()
-            self.test_comment_on_nonexistent_post()
-            self.test_edge_cases()
+            for step in self.TEST_STEPS:
+                getattr(self, step)()
 
             self.print_test_header("评论 API 基础测试完成")
             self.print_success("基础测试已执行完成")
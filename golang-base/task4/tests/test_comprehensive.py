@@ -3,26 +3,84 @@
 模拟完整的博客系统工作流程，包括用户互动场景
 """
 
+from . import codec
 from .auth_helper import AuthenticatedAPITest
-import json
+from .metrics import latency_registry, print_latency_report
+from .request_template import RequestTemplate, Slot, cached_template
+from .schema import LoginResult, parse_response
+from .token_cache import token_cache
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
+
+
+def comment_template(content: str) -> RequestTemplate:
+    """评论内容固定、只有 user_id 和 post_id 变化的 POST /comment 模板"""
+    return cached_template(
+        ("comment", content),
+        "POST",
+        "/comment",
+        {"content": content, "user_id": Slot("user_id"), "post_id": Slot("post_id")},
+    )
 
 
 class ComprehensiveAPITest(AuthenticatedAPITest):
     """综合API测试类"""
 
-    def __init__(self, base_url: str = "http://localhost:8000/api/v1", auto_cleanup: bool = True):
+    # 清理阶段的最大并发请求数（不超过 requests 默认的连接池大小10）
+    CLEANUP_CONCURRENCY = 8
+
+    # 每个场景返回是否成功
+    TEST_STEPS = (
+        "create_test_users",
+        "test_user_authentication",
+        "create_blog_posts",
+        "simulate_user_interactions",
+        "test_content_updates",
+        "test_data_retrieval",
+        "test_error_scenarios",
+    )
+    CLEANUP_STEP = "cleanup_test_data"
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000/api/v1",
+        auto_cleanup: bool = True,
+        username_suffix: Optional[str] = None,
+    ):
         super().__init__(base_url, auto_cleanup)
+        # 用户名/邮箱后缀，避免与其他套件或之前的运行（软删除的用户仍占用唯一约束）冲突；
+        # 压测时每个虚拟用户使用不同后缀
+        self.username_suffix = f"_{uuid.uuid4().hex[:6]}" if username_suffix is None else username_suffix
         self.test_users = []  # 存储测试用户信息
         self.test_posts = []  # 存储测试文章信息
         self.test_comments = []  # 存储测试评论信息
 
+    def find_user(self, key: str):
+        """按角色名（alice/bob/charlie）查找测试用户"""
+        return next((u for u in self.test_users if u["key"] == key), None)
+
+    def user_token(self, key: str):
+        """获取指定角色的JWT token，不切换当前身份"""
+        user = self.find_user(key)
+        if user and "token" not in user:
+            # 本实例尚未登录该用户时，尝试使用整个运行共享的token缓存
+            cached = token_cache.get(self.base_url, user["id"], user["username"])
+            if cached:
+                user["token"] = cached
+        return user.get("token") if user else None
+
     def switch_user(self, username: str):
-        """切换到指定用户的JWT token"""
-        user = next((u for u in self.test_users if u["username"] == username), None)
-        if user and "token" in user:
+        """切换到指定用户的JWT token
+
+        Args:
+            username: 角色名（alice/bob/charlie），不含后缀
+        """
+        user = self.find_user(username)
+        if self.user_token(username):
             self.set_jwt_token(user["token"])
-            self.print_info(f"切换到用户: {username}")
+            self.print_info(f"切换到用户: {user['username']}")
             return True
         else:
             self.print_error(f"无法切换到用户 {username} (用户不存在或无token)")
@@ -54,18 +112,21 @@ class ComprehensiveAPITest(AuthenticatedAPITest):
         ]
 
         for user_data in users_data:
-            print(f"\\n  👤 创建用户: {user_data['username']} ({user_data['role']})")
+            username = f"{user_data['username']}{self.username_suffix}"
+            local_part, domain = user_data["email"].split("@")
+            email = f"{local_part}{self.username_suffix}@{domain}"
+            print(f"\\n  👤 创建用户: {username} ({user_data['role']})")
 
             response = self.make_request(
                 "POST",
                 "/register",
                 data={
-                    "username": user_data["username"],
+                    "username": username,
                     "password": user_data["password"],
-                    "email": user_data["email"],
+                    "email": email,
                 },
                 expected_status=200,
-                description=f"注册用户 {user_data['username']}",
+                description=f"注册用户 {username}",
                 require_auth=False,
             )
 
@@ -74,14 +135,15 @@ class ComprehensiveAPITest(AuthenticatedAPITest):
                 if user_id:
                     user_info = {
                         "id": user_id,
-                        "username": user_data["username"],
+                        "key": user_data["username"],
+                        "username": username,
                         "password": user_data["password"],
-                        "email": user_data["email"],
+                        "email": email,
                         "role": user_data["role"],
                     }
                     self.test_users.append(user_info)
                     self.print_success(
-                        f"用户 {user_data['username']} 创建成功 (ID: {user_id})"
+                        f"用户 {username} 创建成功 (ID: {user_id})"
                     )
 
         return len(self.test_users) >= 3
@@ -106,10 +168,10 @@ class ComprehensiveAPITest(AuthenticatedAPITest):
             # 提取JWT token
             if login_response.status_code == 200:
                 try:
-                    data = login_response.json()
-                    token = data.get("data", {}).get("token")
+                    token = parse_response(login_response).entity(LoginResult).token
                     if token:
                         user["token"] = token
+                        token_cache.put(self.base_url, user["id"], token)
                         self.print_success(f"用户 {user['username']} 获取到JWT token")
                     else:
                         self.print_error(f"用户 {user['username']} 登录响应中未找到token")
@@ -126,6 +188,8 @@ class ComprehensiveAPITest(AuthenticatedAPITest):
                 require_auth=False,
             )
 
+        return all(user.get("token") for user in self.test_users)
+
     def create_blog_posts(self):
         """创建博客文章"""
         self.print_step(3, "创建博客文章")
@@ -135,7 +199,7 @@ class ComprehensiveAPITest(AuthenticatedAPITest):
             return False
 
         # Alice 作为主要博客作者
-        alice = next((u for u in self.test_users if u["username"] == "alice"), None)
+        alice = self.find_user("alice")
         if not alice:
             self.print_error("找不到用户 Alice")
             return False
@@ -313,14 +377,21 @@ EXPLAIN SELECT * FROM users WHERE email = 'test@example.com';
         for i, post_data in enumerate(posts_data, 1):
             print(f"\\n  📝 创建文章 {i}: {post_data['title']}")
 
-            response = self.make_request(
+            # 标题和正文在首次创建时编码一次，之后的迭代只填入 user_id
+            template = cached_template(
+                ("post", post_data["title"]),
                 "POST",
                 "/post",
-                data={
+                {
                     "title": post_data["title"],
                     "content": post_data["content"],
-                    "user_id": post_data["author"]["id"],
+                    "user_id": Slot("user_id"),
                 },
+            )
+            response = self.make_request(
+                template.method,
+                template.path(),
+                data=template.render(user_id=post_data["author"]["id"]),
                 expected_status=200,
                 description=f"创建文章: {post_data['title']}",
             )
@@ -348,8 +419,8 @@ EXPLAIN SELECT * FROM users WHERE email = 'test@example.com';
             return False
 
         # Bob 作为活跃读者，对所有文章发表评论
-        bob = next((u for u in self.test_users if u["username"] == "bob"), None)
-        charlie = next((u for u in self.test_users if u["username"] == "charlie"), None)
+        bob = self.find_user("bob")
+        charlie = self.find_user("charlie")
 
         if not bob or not charlie:
             self.print_error("找不到测试用户")
@@ -380,14 +451,11 @@ EXPLAIN SELECT * FROM users WHERE email = 'test@example.com';
                 bob_comments[i] if i < len(bob_comments) else "很有用的文章，学习了！"
             )
 
+            template = comment_template(comment_content)
             response = self.make_request(
-                "POST",
-                "/comment",
-                data={
-                    "content": comment_content,
-                    "user_id": bob["id"],
-                    "post_id": post["id"],
-                },
+                template.method,
+                template.path(),
+                data=template.render(user_id=bob["id"], post_id=post["id"]),
                 expected_status=200,
                 description=f"Bob 评论文章: {post['title'][:20]}...",
             )
@@ -415,14 +483,11 @@ EXPLAIN SELECT * FROM users WHERE email = 'test@example.com';
                 charlie_comments[i] if i < len(charlie_comments) else "不错！"
             )
 
+            template = comment_template(comment_content)
             response = self.make_request(
-                "POST",
-                "/comment",
-                data={
-                    "content": comment_content,
-                    "user_id": charlie["id"],
-                    "post_id": post["id"],
-                },
+                template.method,
+                template.path(),
+                data=template.render(user_id=charlie["id"], post_id=post["id"]),
                 expected_status=200,
                 description=f"Charlie 评论文章: {post['title'][:20]}...",
             )
@@ -450,7 +515,7 @@ EXPLAIN SELECT * FROM users WHERE email = 'test@example.com';
             return False
 
         # Alice 更新她的第一篇文章
-        alice = next((u for u in self.test_users if u["username"] == "alice"), None)
+        alice = self.find_user("alice")
         first_post = self.test_posts[0]
 
         print("\\n  ✏️ Alice 更新文章内容")
@@ -503,7 +568,7 @@ Go语言在微服务架构中表现出色：
         # Bob 更新他的一条评论
         if self.test_comments:
             bob_comment = next(
-                (c for c in self.test_comments if c["author"]["username"] == "bob"),
+                (c for c in self.test_comments if c["author"]["key"] == "bob"),
                 None,
             )
             if bob_comment:
@@ -592,9 +657,9 @@ Go语言在微服务架构中表现出色：
                     "POST",
                     "/register",
                     {
-                        "username": "alice",
+                        "username": f"alice{self.username_suffix}",
                         "password": "test123",
-                        "email": "alice2@example.com",
+                        "email": f"alice2{self.username_suffix}@example.com",
                     },
                 ),
                 "expected_status": 400,
@@ -643,84 +708,125 @@ Go语言在微服务架构中表现出色：
             "评论统计": {
                 "总评论数": len(self.test_comments),
                 "Bob的评论": len(
-                    [c for c in self.test_comments if c["author"]["username"] == "bob"]
+                    [c for c in self.test_comments if c["author"]["key"] == "bob"]
                 ),
                 "Charlie的评论": len(
                     [
                         c
                         for c in self.test_comments
-                        if c["author"]["username"] == "charlie"
+                        if c["author"]["key"] == "charlie"
                     ]
                 ),
             },
+            "接口延迟": latency_registry.summary(),
         }
 
         print("\\n📊 测试报告:")
-        print(json.dumps(report, ensure_ascii=False, indent=2))
+        print(codec.dumps_pretty(report))
+        print_latency_report()
 
         return report
 
+    def _delete_grouped(self, label: str, items: list, owner_key, endpoint, describe):
+        """按所有者分组并发删除，成功删除的条目从 items 中移除
+
+        每个所有者只取一次token，请求通过 make_request 的 token 参数携带身份，
+        不切换会话的当前用户，因此不同所有者的删除可以并发执行。
+
+        Returns:
+            (删除成功数, 失败数)
+        """
+        groups = {}
+        for item in items:
+            groups.setdefault(owner_key(item), []).append(item)
+
+        jobs = []
+        failed = 0
+        for key, group in groups.items():
+            token = self.user_token(key)
+            if not token:
+                self.print_error(f"无法切换到用户 {key} 删除{label}")
+                failed += len(group)
+                continue
+            jobs.extend((item, token) for item in group)
+
+        if not jobs:
+            return 0, failed
+
+        deleted = 0
+        with ThreadPoolExecutor(max_workers=min(self.CLEANUP_CONCURRENCY, len(jobs))) as executor:
+            futures = {
+                executor.submit(
+                    self.make_request,
+                    "DELETE",
+                    endpoint(item),
+                    expected_status=200,
+                    description=describe(item),
+                    token=token,
+                ): item
+                for item, token in jobs
+            }
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    ok = future.result().status_code == 200
+                except Exception as e:
+                    self.print_error(f"清理{label}失败: {str(e)}")
+                    ok = False
+                if ok:
+                    items.remove(item)
+                    deleted += 1
+                else:
+                    failed += 1
+        return deleted, failed
+
     def cleanup_test_data(self):
-        """清理测试数据"""
+        """清理测试数据
+
+        按 评论 → 文章 → 用户 的顺序分阶段清理，每个阶段内按所有者分组并发删除。
+        """
         self.print_step(9, "清理测试数据")
+        start = time.perf_counter()
 
-        # 清理评论 - 需要切换到评论作者的身份
+        # 清理评论 - 使用评论作者的token
         print("\\n  🗑️ 清理评论数据")
-        for comment in self.test_comments[:]:
-            try:
-                # 切换到评论作者的token
-                author_username = comment["author"]["username"]
-                if self.switch_user(author_username):
-                    response = self.make_request(
-                        "DELETE",
-                        f"/comment/{comment['id']}",
-                        expected_status=200,
-                        description=f"删除评论 ID: {comment['id']}",
-                    )
-                    if response.status_code == 200:
-                        self.test_comments.remove(comment)
-                else:
-                    self.print_error(f"无法切换到用户 {author_username} 删除评论")
-            except Exception as e:
-                self.print_error(f"清理评论失败: {str(e)}")
+        comments, comments_failed = self._delete_grouped(
+            "评论",
+            self.test_comments,
+            lambda comment: comment["author"]["key"],
+            lambda comment: f"/comment/{comment['id']}",
+            lambda comment: f"删除评论 ID: {comment['id']}",
+        )
 
-        # 清理文章 - 切换到Alice（文章作者）
+        # 清理文章 - 使用文章作者的token
         print("\\n  🗑️ 清理文章数据")
-        if self.switch_user("alice"):
-            for post in self.test_posts[:]:
-                try:
-                    response = self.make_request(
-                        "DELETE",
-                        f"/post/{post['id']}",
-                        expected_status=200,
-                        description=f"删除文章: {post['title'][:30]}...",
-                    )
-                    if response.status_code == 200:
-                        self.test_posts.remove(post)
-                except Exception as e:
-                    self.print_error(f"清理文章失败: {str(e)}")
-        else:
-            self.print_error("无法切换到Alice用户删除文章")
+        posts, posts_failed = self._delete_grouped(
+            "文章",
+            self.test_posts,
+            lambda post: post["author"]["key"],
+            lambda post: f"/post/{post['id']}",
+            lambda post: f"删除文章: {post['title'][:30]}...",
+        )
 
         # 清理用户 - 每个用户删除自己
         print("\\n  🗑️ 清理用户数据")
-        for user in self.test_users[:]:
-            try:
-                # 切换到要删除的用户自己的token
-                if self.switch_user(user["username"]):
-                    response = self.make_request(
-                        "DELETE",
-                        f"/user/{user['id']}",
-                        expected_status=200,
-                        description=f"删除用户: {user['username']}",
-                    )
-                    if response.status_code == 200:
-                        self.test_users.remove(user)
-                else:
-                    self.print_error(f"无法切换到用户 {user['username']} 进行删除")
-            except Exception as e:
-                self.print_error(f"清理用户失败: {str(e)}")
-    
+        users, users_failed = self._delete_grouped(
+            "用户",
+            self.test_users,
+            lambda user: user["key"],
+            lambda user: f"/user/{user['id']}",
+            lambda user: f"删除用户: {user['username']}",
+        )
+
+        elapsed = time.perf_counter() - start
+        failed = comments_failed + posts_failed + users_failed
+        self.print_info(
+            f"清理完成: 删除 {comments} 条评论、{posts} 篇文章、{users} 个用户，耗时 {elapsed:.2f}s"
+        )
+        if failed:
+            self.print_warning(f"{failed} 条数据未能删除")
+        return failed == 0
+
     def run_cleanup_tests(self):
         """运行删除相关测试"""
         self.print_test_header("综合删除测试")
@@ -753,13 +859,8 @@ Go语言在微服务架构中表现出色：
         try:
             # 执行测试流程（不包括删除操作）
             success = True
-            success &= self.create_test_users()
-            success &= self.test_user_authentication()
-            success &= self.create_blog_posts()
-            success &= self.simulate_user_interactions()
-            success &= self.test_content_updates()
-            success &= self.test_data_retrieval()
-            success &= self.test_error_scenarios()
+            for step in self.TEST_STEPS:
+                success &= getattr(self, step)()
 
             # 生成测试报告
             self.generate_test_report()
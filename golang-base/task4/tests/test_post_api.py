@@ -4,12 +4,32 @@
 """
 
 from .auth_helper import AuthenticatedAPITest
+from .schema import Post, parse_response
 import json
 
 
 class PostAPITest(AuthenticatedAPITest):
     """文章API测试类"""
 
+    SETUP_STEP = "setup_test_user"
+    TEST_STEPS = (
+        "test_create_post",
+        "test_create_multiple_posts",
+        "test_create_invalid_post",
+        "test_get_post",
+        "test_get_nonexistent_post",
+        "test_invalid_post_id",
+        "test_update_post",
+        "test_verify_post_update",
+        "test_create_long_content_post",
+        "test_edge_cases",
+        "test_missing_validation",
+    )
+    CLEANUP_STEP = "cleanup"
+    KNOWN_ISSUES = {
+        "test_missing_validation": "api/post.go 只校验字段非空，标题长度不受限制（title 为 longtext 列），超长标题会被接受",
+    }
+
     def __init__(self, base_url: str = "http://localhost:8000/api/v1", auto_cleanup: bool = True):
         super().__init__(base_url, auto_cleanup)
         self.created_user_ids = []  # 记录创建的用户ID
@@ -212,8 +232,7 @@ class PostAPITest(AuthenticatedAPITest):
 
         # 检查文章标题是否已更新
         try:
-            data = response.json()
-            title = data.get("data", {}).get("title", "")
+            title = parse_response(response).entity(Post).title or ""
             if "已更新" in title:
                 self.print_success("文章更新验证成功")
             else:
@@ -427,19 +446,10 @@ func ProcessLongText(content string) error {
                 },
                 "expected_status": 400,
             },
-            {
-                "name": "超长标题",
-                "data": {
-                    "title": "标" * 1000,
-                    "content": "正常内容",
-                    "user_id": user_id,
-                },
-                "expected_status": 400,
-            },
             {
                 "name": "不存在的用户ID",
                 "data": {"title": "测试标题", "content": "测试内容", "user_id": 99999},
-                "expected_status": 500,
+                "expected_status": 400,  # 外键约束失败，创建接口返回400
             },
             {
                 "name": "特殊字符标题",
@@ -452,7 +462,33 @@ func ProcessLongText(content string) error {
             },
         ]
 
-        for case in edge_cases:
+        self._create_cases(edge_cases)
+
+    def test_missing_validation(self):
+        """测试服务器尚未校验的文章数据（期望被拒绝，见 KNOWN_ISSUES）"""
+        self.print_step(13, "缺少校验的文章数据测试")
+
+        if not self.created_user_ids:
+            self.print_warning("没有可用的用户进行测试")
+            return
+
+        self.print_warning("服务器目前不校验以下字段，这些案例预期失败")
+        cases = [
+            {
+                "name": "超长标题",
+                "data": {
+                    "title": "标" * 1000,
+                    "content": "正常内容",
+                    "user_id": self.created_user_ids[0],
+                },
+                "expected_status": 400,
+            },
+        ]
+        self._create_cases(cases)
+
+    def _create_cases(self, cases):
+        """逐个发送创建文章的案例，创建成功的文章记录ID用于清理"""
+        for case in cases:
             print(f"\\n  🧪 测试案例: {case['name']}")
             response = self.make_request(
                 "POST",
@@ -470,7 +506,7 @@ func ProcessLongText(content string) error {
 
     def cleanup(self):
         """清理测试数据"""
-        self.print_step(13, "清理测试数据")
+        self.print_step(14, "清理测试数据")
 
         # 清理文章
         for post_id in self.created_post_ids[:]:
@@ -537,16 +573,8 @@ func ProcessLongText(content string) error {
                 return False
 
             # 运行基础测试（不包括删除测试）
-            self.test_create_post()
-            self.test_create_multiple_posts()
-            self.test_create_invalid_post()
-            self.test_get_post()
-            self.test_get_nonexistent_post()
-            self.test_invalid_post_id()
-            self.test_update_post()
-            self.test_verify_post_update()
-            self.test_create_long_content_post()
-            self.test_edge_cases()
+            for step in self.TEST_STEPS:
+                getattr(self, step)()
 
             self.print_test_header("文章 API 基础测试完成")
             self.print_success("基础测试已执行完成")
@@ -4,12 +4,35 @@
 """
 
 from .base_test import BaseAPITest
+from .schema import LoginResult, User, parse_response
+from .token_cache import token_cache
 import json
+import uuid
 
 
 class UserAPITest(BaseAPITest):
     """用户API测试类"""
 
+    # 登录获取JWT token后才能进行需要认证的测试
+    TEST_STEPS = (
+        "test_user_registration",
+        "test_duplicate_registration",
+        "test_multiple_user_registration",
+        "test_user_login",
+        "test_get_user",
+        "test_get_nonexistent_user",
+        "test_invalid_user_id",
+        "test_wrong_password_login",
+        "test_update_user",
+        "test_verify_update",
+        "test_edge_cases",
+        "test_missing_validation",
+    )
+    CLEANUP_STEP = "cleanup"
+    KNOWN_ISSUES = {
+        "test_missing_validation": "api/user.go 的注册接口只校验邮箱格式，空用户名和空密码的注册会被接受",
+    }
+
     def __init__(self, base_url: str = "http://localhost:8000/api/v1", auto_cleanup: bool = True):
         super().__init__(base_url, auto_cleanup)
         self.created_user_ids = []  # 记录创建的用户ID用于清理
@@ -163,10 +186,10 @@ class UserAPITest(BaseAPITest):
         # 提取JWT token并设置到session中
         if response.status_code == 200:
             try:
-                data = response.json()
-                token = data.get("data", {}).get("token")
+                token = parse_response(response).entity(LoginResult).token
                 if token:
                     self.set_jwt_token(token)
+                    token_cache.put(self.base_url, user_id, token)
                     self.print_success("JWT token已设置，后续请求将使用此token进行认证")
                 else:
                     self.print_warning("登录响应中未找到token")
@@ -241,8 +264,7 @@ class UserAPITest(BaseAPITest):
 
         # 检查用户名是否已更新
         try:
-            data = response.json()
-            if data.get("data", {}).get("username") == "updated_testuser":
+            if parse_response(response).entity(User).username == "updated_testuser":
                 self.print_success("用户信息更新验证成功")
             else:
                 self.print_error("用户信息更新验证失败")
@@ -321,48 +343,63 @@ class UserAPITest(BaseAPITest):
         """测试边界情况"""
         self.print_step(13, "边界情况测试")
 
+        # 每个案例使用不重复的用户名和邮箱，状态码只取决于被测的字段
+        tag = uuid.uuid4().hex[:6]
         edge_cases = [
             {
-                "name": "空用户名",
+                "name": "无效邮箱格式",
                 "data": {
-                    "username": "",
+                    "username": f"edge_email_{tag}",
                     "password": "test123",
-                    "email": "test@example.com",
+                    "email": "invalid-email",
                 },
                 "expected_status": 400,
             },
             {
-                "name": "空密码",
+                "name": "超长用户名",
                 "data": {
-                    "username": "testuser",
-                    "password": "",
-                    "email": "test@example.com",
+                    "username": "a" * 1000,
+                    "password": "test123",
+                    "email": f"edge_long_{tag}@example.com",
                 },
                 "expected_status": 400,
             },
+        ]
+        self._register_cases(edge_cases)
+
+    def test_missing_validation(self):
+        """测试服务器尚未校验的注册数据（期望被拒绝，见 KNOWN_ISSUES）"""
+        self.print_step(14, "缺少校验的注册数据测试")
+        self.print_warning("服务器目前不校验以下字段，这些案例预期失败")
+
+        tag = uuid.uuid4().hex[:6]
+        cases = [
             {
-                "name": "无效邮箱格式",
+                "name": "空用户名",
                 "data": {
-                    "username": "testuser",
+                    "username": "",
                     "password": "test123",
-                    "email": "invalid-email",
+                    "email": f"edge_empty_name_{tag}@example.com",
                 },
                 "expected_status": 400,
             },
             {
-                "name": "超长用户名",
+                "name": "空密码",
                 "data": {
-                    "username": "a" * 1000,
-                    "password": "test123",
-                    "email": "test@example.com",
+                    "username": f"edge_empty_password_{tag}",
+                    "password": "",
+                    "email": f"edge_empty_password_{tag}@example.com",
                 },
                 "expected_status": 400,
             },
         ]
+        self._register_cases(cases)
 
-        for case in edge_cases:
+    def _register_cases(self, cases):
+        """逐个发送注册案例，被接受的用户记录ID用于清理"""
+        for case in cases:
             print(f"\n  🧪 测试案例: {case['name']}")
-            self.make_request(
+            response = self.make_request(
                 "POST",
                 "/register",
                 data=case["data"],
@@ -370,10 +407,14 @@ class UserAPITest(BaseAPITest):
                 description=case["name"],
                 require_auth=False,
             )
+            if response.status_code == 200:
+                user_id = self.extract_id_from_response(response)
+                if user_id:
+                    self.created_user_ids.append(user_id)
 
     def cleanup(self):
         """清理测试数据"""
-        self.print_step(14, "清理测试数据")
+        self.print_step(15, "清理测试数据")
 
         for user_id in self.created_user_ids[:]:
             try:
@@ -420,21 +461,8 @@ class UserAPITest(BaseAPITest):
 
         try:
             # 运行基础测试（不包括删除测试）
-            self.test_user_registration()
-            self.test_duplicate_registration()
-            self.test_multiple_user_registration()
-            
-            # 登录获取JWT token后再进行需要认证的测试
-            self.test_user_login()
-            
-            # 现在可以进行需要认证的测试
-            self.test_get_user()
-            self.test_get_nonexistent_user()
-            self.test_invalid_user_id()
-            self.test_wrong_password_login()
-            self.test_update_user()
-            self.test_verify_update()
-            self.test_edge_cases()
+            for step in self.TEST_STEPS:
+                getattr(self, step)()
 
             self.print_test_header("用户 API 基础测试完成")
             self.print_success("基础测试已执行完成")
@@ -0,0 +1,144 @@
+"""
+JWT token 缓存
+同一次运行的所有测试套件共享，并持久化到磁盘供后续运行复用
+
+服务器的 Login 接口以 bcrypt DefaultCost 校验密码，每次登录都要消耗数十毫秒CPU，
+切换身份等重新认证的场景在缓存命中时直接复用尚未过期的 token，跳过重复登录。
+"""
+
+import atexit
+import base64
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+# 默认缓存文件位于项目根目录（已加入 .gitignore）
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".jwt_token_cache.json"
+)
+
+# 距离过期不足该秒数的 token 视为已过期，避免请求途中失效
+EXPIRY_MARGIN = 60
+
+
+def decode_jwt_claims(token: str) -> Optional[dict]:
+    """解析JWT payload（不验证签名）"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload).decode("utf-8"))
+    except (IndexError, ValueError):
+        return None
+
+
+class TokenCache:
+    """以 (API地址, 用户ID) 为键的 token 缓存，线程安全"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}  # key -> {"token": str, "exp": int}
+        self._evicted = set()  # 本进程移除的键，写回时同样从文件中删除
+        self._loaded = False
+        self._dirty = False
+
+    @staticmethod
+    def _key(base_url: str, user_id) -> str:
+        return f"{base_url}#{user_id}"
+
+    def _read_file(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._entries.update(self._read_file())
+            self._loaded = True
+
+    def get(self, base_url: str, user_id, username: str) -> Optional[str]:
+        """获取未过期的 token，不存在或即将过期时返回None
+
+        只返回 username 声明与期望用户名一致的 token：重建数据库或换用新的替身服务器后，
+        同一ID可能属于另一个用户，此时旧 token 视为失效并移除。
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._ensure_loaded()
+            key = self._key(base_url, user_id)
+            entry = self._entries.get(key)
+            if not entry or entry["exp"] - EXPIRY_MARGIN <= time.time():
+                return None
+            if (decode_jwt_claims(entry["token"]) or {}).get("username") != username:
+                del self._entries[key]
+                self._evicted.add(key)
+                self._dirty = True
+                return None
+            return entry["token"]
+
+    def put(self, base_url: str, user_id, token: str):
+        """缓存 token，过期时间取自 token 的 exp 声明"""
+        if not self.enabled:
+            return
+        claims = decode_jwt_claims(token) or {}
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            return  # 无法判断有效期的 token 不缓存
+        with self._lock:
+            self._ensure_loaded()
+            key = self._key(base_url, user_id)
+            self._entries[key] = {"token": token, "exp": int(exp)}
+            self._evicted.discard(key)
+            self._dirty = True
+
+    def evict(self, base_url: str, user_id):
+        """移除 token（用户被删除或 token 被服务器拒绝时调用）"""
+        with self._lock:
+            self._ensure_loaded()
+            key = self._key(base_url, user_id)
+            if self._entries.pop(key, None) is not None:
+                self._evicted.add(key)
+                self._dirty = True
+
+    def evict_token(self, base_url: str, token: str):
+        """按 token 本身移除（从 id 声明中取得用户ID）"""
+        claims = decode_jwt_claims(token) or {}
+        if "id" in claims:
+            self.evict(base_url, claims["id"])
+
+    def save(self):
+        """写回磁盘：与文件中其他进程写入的条目合并，并丢弃已过期的条目"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            merged = self._read_file()
+            merged.update(self._entries)
+            now = time.time()
+            merged = {
+                k: v for k, v in merged.items()
+                if k not in self._evicted and v.get("exp", 0) > now
+            }
+
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(merged, f)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError:
+                pass  # 缓存写入失败不影响测试
+
+
+# 进程内共享的缓存实例
+token_cache = TokenCache()
+atexit.register(token_cache.save)